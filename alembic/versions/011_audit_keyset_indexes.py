@@ -0,0 +1,39 @@
+"""Composite audit-log indexes for keyset pagination and filters.
+
+Replaces the single-column user_id / created_at indexes, which the new
+(…, created_at, id) indexes cover. Built concurrently on PostgreSQL so the
+live table stays writable.
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "011"
+down_revision = "010"
+branch_labels = None
+depends_on = None
+
+_INDEXES = {
+    "ix_auditlog_created_at_id": ["created_at", "id"],
+    "ix_auditlog_user_id_created_at_id": ["user_id", "created_at", "id"],
+    "ix_auditlog_action_created_at_id": ["action", "created_at", "id"],
+    "ix_auditlog_resource_created_at_id": ["resource_type", "resource_id", "created_at", "id"],
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns in _INDEXES.items():
+            op.create_index(name, "auditlog", columns, postgresql_concurrently=True)
+        op.drop_index("ix_auditlog_user_id", table_name="auditlog", postgresql_concurrently=True)
+        op.drop_index("ix_auditlog_created_at", table_name="auditlog", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_auditlog_user_id", "auditlog", ["user_id"], postgresql_concurrently=True)
+        op.create_index("ix_auditlog_created_at", "auditlog", ["created_at"], postgresql_concurrently=True)
+        for name in _INDEXES:
+            op.drop_index(name, table_name="auditlog", postgresql_concurrently=True)
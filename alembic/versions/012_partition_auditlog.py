@@ -0,0 +1,95 @@
+"""Range-partition auditlog by month on created_at
+
+The table is rebuilt as ``PARTITION BY RANGE (created_at)`` with one
+partition per month (``auditlog_YYYY_MM``), from the oldest row to three
+months ahead, plus ``auditlog_default`` as a safety net. The primary key
+becomes (id, created_at) since it must contain the partition key; ids keep
+coming from the existing sequence. The retention job
+(``app.services.audit_retention_service``) creates later months and archives
+and drops expired ones.
+
+Existing rows are copied in one statement, which locks the audit log for the
+duration; run it in a maintenance window on large installations.
+Other databases keep the plain table.
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "012"
+down_revision = "011"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = "id, user_id, action, resource_type, resource_id, detail, created_at"
+
+_INDEXES = {
+    "ix_auditlog_created_at_id": "created_at, id",
+    "ix_auditlog_user_id_created_at_id": "user_id, created_at, id",
+    "ix_auditlog_action_created_at_id": "action, created_at, id",
+    "ix_auditlog_resource_created_at_id": "resource_type, resource_id, created_at, id",
+}
+
+_TABLE_BODY = """
+    id INTEGER NOT NULL DEFAULT nextval('auditlog_id_seq'),
+    user_id INTEGER REFERENCES "user" (id) ON DELETE SET NULL,
+    action VARCHAR NOT NULL,
+    resource_type VARCHAR,
+    resource_id INTEGER,
+    detail VARCHAR,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+"""
+
+
+def _set_aside_old_table() -> None:
+    op.execute("ALTER TABLE auditlog RENAME TO auditlog_old")
+    op.execute("ALTER TABLE auditlog_old RENAME CONSTRAINT auditlog_pkey TO auditlog_old_pkey")
+    op.execute("ALTER TABLE auditlog_old RENAME CONSTRAINT auditlog_user_id_fkey TO auditlog_old_user_id_fkey")
+    for name in _INDEXES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_old")
+
+
+def _copy_rows_and_drop_old_table() -> None:
+    op.execute(f"INSERT INTO auditlog ({_COLUMNS}) SELECT {_COLUMNS} FROM auditlog_old")
+    for name, columns in _INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON auditlog ({columns})")
+    # The sequence is owned by the old table's id column; move it before the drop.
+    op.execute("ALTER SEQUENCE auditlog_id_seq OWNED BY auditlog.id")
+    op.execute("DROP TABLE auditlog_old")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    _set_aside_old_table()
+    op.execute(f"CREATE TABLE auditlog ({_TABLE_BODY}, PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at)")
+    op.execute("""
+        DO $$
+        DECLARE month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', COALESCE((SELECT min(created_at) FROM auditlog_old), now() AT TIME ZONE 'UTC')),
+                    date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF auditlog FOR VALUES FROM (%L) TO (%L)',
+                    'auditlog_' || to_char(month, 'YYYY_MM'), month, (month + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE auditlog_default PARTITION OF auditlog DEFAULT")
+    _copy_rows_and_drop_old_table()
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    _set_aside_old_table()
+    op.execute(f"CREATE TABLE auditlog ({_TABLE_BODY}, PRIMARY KEY (id))")
+    _copy_rows_and_drop_old_table()
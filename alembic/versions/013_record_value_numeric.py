@@ -0,0 +1,107 @@
+"""Materialized numeric score on record
+
+Adds ``record.value_numeric``, the ranking value of ``value_raw`` as
+normalized as ``app.core.scoring.score_value`` did at this revision (TIME_*
+values in seconds), with an (activity_id, value_numeric) index, and backfills
+existing rows in batches. Leaderboards rank on this column instead of
+re-parsing strings. The parsing is copied here so later changes to the app
+cannot alter what this backfill writes.
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+"""
+import math
+import re
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "013"
+down_revision = "012"
+branch_labels = None
+depends_on = None
+
+_BATCH_SIZE = 5000
+
+_IS_UINT = re.compile(r"^\d+$")
+_IS_DECIMAL = re.compile(r"^\d*\.?\d+$")
+
+
+def _parse_time_to_seconds(value: str | None) -> float | None:
+    if value is None:
+        return None
+    text = str(value).strip().replace(",", ".")
+    if text == "":
+        return None
+
+    parts = text.split(":")
+    if len(parts) > 3:
+        return None
+
+    minutes = 0
+    if len(parts) == 1:
+        seconds_str = parts[0].strip()
+    elif len(parts) == 2:
+        m = parts[0].strip()
+        if not _IS_UINT.match(m):
+            return None
+        minutes = int(m)
+        seconds_str = parts[1].strip()
+    else:
+        # mm:ss:cc — the third colon group is a decimal fraction of the second.
+        m, s, frac = parts[0].strip(), parts[1].strip(), parts[2].strip()
+        if not (_IS_UINT.match(m) and _IS_UINT.match(s) and _IS_UINT.match(frac)):
+            return None
+        minutes = int(m)
+        seconds_str = f"{s}.{frac}"
+
+    if not _IS_DECIMAL.match(seconds_str):
+        return None
+    seconds = float(seconds_str)
+    if seconds < 0:
+        return None
+    if len(parts) >= 2 and seconds >= 60:
+        return None
+
+    return round(minutes * 60 + seconds, 2)
+
+
+def _score_value(value_raw: str | None, evaluation_type: str) -> float | None:
+    if evaluation_type == "TIME_LOW":
+        return _parse_time_to_seconds(value_raw)
+    try:
+        numeric = float(value_raw)
+    except (ValueError, TypeError):
+        return None
+    return numeric if math.isfinite(numeric) else None
+
+
+def _backfill() -> None:
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(sa.text(
+            "SELECT r.id, r.value_raw, a.evaluation_type FROM record r"
+            " JOIN activity a ON a.id = r.activity_id"
+            " WHERE r.id > :last_id ORDER BY r.id LIMIT :limit"
+        ), {"last_id": last_id, "limit": _BATCH_SIZE}).all()
+        if not rows:
+            return
+        updates = [
+            {"id": row.id, "value": _score_value(row.value_raw, row.evaluation_type)}
+            for row in rows
+        ]
+        conn.execute(sa.text("UPDATE record SET value_numeric = :value WHERE id = :id"), updates)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column("record", sa.Column("value_numeric", sa.Float(), nullable=True))
+    _backfill()
+    op.create_index("ix_record_activity_id_value_numeric", "record", ["activity_id", "value_numeric"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_record_activity_id_value_numeric", table_name="record")
+    op.drop_column("record", "value_numeric")
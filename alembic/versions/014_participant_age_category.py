@@ -0,0 +1,52 @@
+"""Persisted age category of each participant
+
+Adds ``participant.age_category_id`` (ON DELETE SET NULL, indexed): the first
+age category of the event, by id, whose range holds the participant's age.
+The services keep it current when categories or ages change; existing
+participants are assigned here with one UPDATE per event that has categories.
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "014"
+down_revision = "013"
+branch_labels = None
+depends_on = None
+
+
+def _backfill() -> None:
+    conn = op.get_bind()
+    categories = conn.execute(sa.text(
+        "SELECT id, event_id, min_age, max_age FROM age_category ORDER BY event_id, id"
+    )).all()
+    by_event: dict[int, list] = {}
+    for category in categories:
+        by_event.setdefault(category.event_id, []).append(category)
+    for event_id, event_categories in by_event.items():
+        whens = " ".join(
+            f"WHEN age BETWEEN {c.min_age} AND {c.max_age} THEN {c.id}" for c in event_categories
+        )
+        conn.execute(sa.text(
+            f"UPDATE participant SET age_category_id = CASE {whens} ELSE NULL END"
+            ' WHERE group_id IN (SELECT id FROM "group" WHERE event_id = :event_id)'
+        ), {"event_id": event_id})
+
+
+def upgrade() -> None:
+    op.add_column("participant", sa.Column("age_category_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "participant_age_category_id_fkey", "participant", "age_category",
+        ["age_category_id"], ["id"], ondelete="SET NULL",
+    )
+    op.create_index("ix_participant_age_category_id", "participant", ["age_category_id"])
+    _backfill()
+
+
+def downgrade() -> None:
+    op.drop_index("ix_participant_age_category_id", table_name="participant")
+    op.drop_constraint("participant_age_category_id_fkey", "participant", type_="foreignkey")
+    op.drop_column("participant", "age_category_id")
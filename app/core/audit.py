@@ -1,5 +1,64 @@
+"""Audit-log writer.
+
+``AUDIT_MODE=transaction`` (default) writes audit rows inside the caller's
+transaction, so they commit or roll back with the change they describe.
+
+``AUDIT_MODE=buffered`` keeps the caller's transaction to its own rows: entries
+wait in ``session.info`` until the session commits (a rollback discards them),
+then join a process-wide buffer that a background thread flushes in multi-row
+INSERTs every ``AUDIT_FLUSH_INTERVAL`` seconds or once ``AUDIT_BATCH_SIZE``
+entries are waiting. ``shutdown`` (called from the app lifespan) flushes what
+is left; entries still buffered when a worker is killed are lost. While the
+database is unreachable the buffer holds at most ``AUDIT_MAX_BUFFERED``
+entries; newer ones are dropped and counted as ``audit.overflow``.
+"""
+
+import logging
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import event, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session
+
+from app.config import settings
+from app.core import metrics
 from app.models.audit_log import AuditLog
 
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "audit_pending"
+
+_buffer: list[dict] = []
+_buffer_lock = threading.Lock()
+_wake = threading.Event()
+_stop = threading.Event()
+_flusher: threading.Thread | None = None
+_flush_lock = threading.Lock()  # one flush at a time keeps rows in commit order
+
+
+def _buffered() -> bool:
+    return settings.AUDIT_MODE == "buffered"
+
+
+def _row(
+    user_id: int | None,
+    action: str,
+    resource_type: str | None = None,
+    resource_id: int | None = None,
+    detail: str | None = None,
+    created_at: datetime | None = None,
+) -> dict:
+    return {
+        "user_id": user_id,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "detail": detail,
+        "created_at": created_at or datetime.now(timezone.utc),
+    }
+
 
 def log_action(
     session,
@@ -9,6 +68,9 @@ def log_action(
     resource_id: int | None = None,
     detail: str | None = None,
 ) -> None:
+    if _buffered():
+        _session_pending(session).append(_row(user_id, action, resource_type, resource_id, detail))
+        return
     entry = AuditLog(
         user_id=user_id,
         action=action,
@@ -18,3 +80,157 @@ def log_action(
     )
     session.add(entry)
     # caller must commit
+
+
+def log_actions(session, entries: list[dict]) -> None:
+    """Write many audit rows in a single multi-row INSERT.
+
+    Each entry takes the keyword arguments of ``log_action``. Rows are sent
+    immediately as part of the caller's transaction (or buffered, see the
+    module docstring); caller must commit.
+    """
+    if not entries:
+        return
+    now = datetime.now(timezone.utc)
+    rows = [
+        _row(e.get("user_id"), e["action"], e.get("resource_type"), e.get("resource_id"), e.get("detail"), now)
+        for e in entries
+    ]
+    if _buffered():
+        _session_pending(session).extend(rows)
+        return
+    session.execute(insert(AuditLog), rows)
+
+
+# ── Buffered mode ────────────────────────────────────────────────────────────
+
+
+def _session_pending(session) -> list[dict]:
+    if not session.in_transaction():
+        session.begin()  # so that a rollback fires the discard hook even before any SQL ran
+    return session.info.setdefault(_PENDING_KEY, [])
+
+
+def _trim_buffer_locked() -> int:
+    """Drop the newest entries beyond ``AUDIT_MAX_BUFFERED``; caller holds ``_buffer_lock``."""
+    overflow = len(_buffer) - settings.AUDIT_MAX_BUFFERED
+    if overflow <= 0:
+        return 0
+    del _buffer[settings.AUDIT_MAX_BUFFERED:]
+    return overflow
+
+
+def _count_overflow(overflow: int) -> None:
+    if overflow:
+        logger.warning("Audit buffer full; dropped %s entries", overflow)
+        metrics.increment("audit.overflow", overflow)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _enqueue_committed(session) -> None:
+    rows = session.info.pop(_PENDING_KEY, None)
+    if not rows:
+        return
+    with _buffer_lock:
+        _buffer.extend(rows)
+        overflow = _trim_buffer_locked()
+        size = len(_buffer)
+    _count_overflow(overflow)
+    metrics.increment("audit.buffered", max(len(rows) - overflow, 0))
+    metrics.set_gauge("audit.pending", size)
+    if size >= settings.AUDIT_BATCH_SIZE:
+        _wake.set()
+
+
+@event.listens_for(OrmSession, "after_soft_rollback")
+def _discard_rolled_back(session, previous_transaction) -> None:
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def _insert_rows(bind, rows: list[dict]) -> tuple[int, int]:
+    """Insert ``rows`` in batches; returns (written, dropped).
+
+    A batch rejected by a constraint is retried row by row and the offending
+    rows are dropped. Any other failure (database down) puts the unwritten
+    rows back at the head of the buffer for the next flush.
+    """
+    written = dropped = 0
+    for start in range(0, len(rows), settings.AUDIT_BATCH_SIZE):
+        batch = rows[start:start + settings.AUDIT_BATCH_SIZE]
+        try:
+            with Session(bind) as session:
+                session.execute(insert(AuditLog), batch)
+                session.commit()
+            written += len(batch)
+            continue
+        except IntegrityError:
+            logger.warning("Audit batch of %s rows rejected; retrying row by row", len(batch))
+        except Exception:
+            logger.warning("Audit flush failed; keeping %s entries buffered", len(rows) - start)
+            with _buffer_lock:
+                _buffer[:0] = rows[start:]
+                overflow = _trim_buffer_locked()
+            _count_overflow(overflow)
+            return written, dropped
+        for row in batch:
+            try:
+                with Session(bind) as session:
+                    session.execute(insert(AuditLog), [row])
+                    session.commit()
+                written += 1
+            except Exception:
+                logger.warning("Dropping audit entry %s that cannot be written", row["action"])
+                dropped += 1
+    return written, dropped
+
+
+def flush(bind=None) -> int:
+    """Write every buffered entry now; returns how many were written."""
+    if bind is None:
+        from app.database import engine as bind
+    with _flush_lock:
+        with _buffer_lock:
+            rows = _buffer[:]
+            _buffer.clear()
+        if not rows:
+            return 0
+        written, dropped = _insert_rows(bind, rows)
+        with _buffer_lock:
+            metrics.set_gauge("audit.pending", len(_buffer))
+    metrics.increment("audit.flushed", written)
+    if dropped:
+        metrics.increment("audit.dropped", dropped)
+    return written
+
+
+def _run_flusher() -> None:
+    while not _stop.is_set():
+        _wake.wait(settings.AUDIT_FLUSH_INTERVAL)
+        _wake.clear()
+        try:
+            flush()
+        except Exception:
+            logger.exception("Audit flush failed")
+
+
+def start() -> None:
+    """Start the background flusher in buffered mode; a no-op otherwise."""
+    global _flusher
+    if not _buffered() or _flusher is not None:
+        return
+    _stop.clear()
+    _flusher = threading.Thread(target=_run_flusher, name="audit-flusher", daemon=True)
+    _flusher.start()
+
+
+def shutdown() -> None:
+    """Stop the flusher and write whatever is still buffered."""
+    global _flusher
+    if _flusher is not None:
+        _stop.set()
+        _wake.set()
+        _flusher.join(timeout=settings.AUDIT_FLUSH_INTERVAL + 5)
+        _flusher = None
+    if _buffer:
+        flush()
@@ -1,24 +1,152 @@
-"""Unified authorization helpers for evaluator visibility restrictions."""
+"""Unified authorization helpers for evaluator visibility restrictions.
 
+An evaluator's scope — the events whose pool they are in and the groups they
+are assigned to — is computed once and cached per process, tagged with a
+per-user revision kept in Redis (process-local without Redis). Services that
+change evaluator assignments call ``invalidate_scope`` after committing, which
+bumps the revision and makes every replica recompute on its next check.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+
+from cachetools import TTLCache
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.exceptions import ForbiddenException
+from app.core.redis_client import async_redis_client, redis_client
+from app.database import primary_session
 from app.models.event_evaluator import EventEvaluator
 from app.models.group import Group
 from app.models.group_evaluator import GroupEvaluator
 from app.models.user import User, UserRole
 
+logger = logging.getLogger(__name__)
+
+_SCOPE_TTL = 300
+
+_scopes: TTLCache = TTLCache(maxsize=10_000, ttl=_SCOPE_TTL)
+_scopes_lock = threading.Lock()
+_local_revisions: dict[int, int] = {}
+
+
+@dataclass(frozen=True)
+class AuthScope:
+    """Events and groups a (non-admin) user may touch."""
+
+    event_ids: frozenset[int] = frozenset()
+    group_events: dict[int, int] = field(default_factory=dict)  # group id -> event id
+
+    def has_group(self, group_id: int) -> bool:
+        return group_id in self.group_events
+
+    def group_ids(self, event_id: int | None = None) -> list[int]:
+        return sorted(g for g, e in self.group_events.items() if event_id is None or e == event_id)
+
 
 def is_admin(user: User) -> bool:
     return user.role in (UserRole.ADMIN, UserRole.SUPER_ADMIN)
 
 
+def _revision_key(user_id: int) -> str:
+    return f"authz:{user_id}:rev"
+
+
+def _scope_revision(user_id: int) -> int | None:
+    if not redis_client:
+        with _scopes_lock:
+            return _local_revisions.get(user_id, 0)
+    try:
+        return int(redis_client.get(_revision_key(user_id)) or 0)
+    except Exception:
+        logger.warning("Failed to read authorization scope revision for user %s", user_id)
+        return None
+
+
+async def _scope_revision_async(user_id: int) -> int | None:
+    if not async_redis_client:
+        with _scopes_lock:
+            return _local_revisions.get(user_id, 0)
+    try:
+        return int(await async_redis_client.get(_revision_key(user_id)) or 0)
+    except Exception:
+        logger.warning("Failed to read authorization scope revision for user %s", user_id)
+        return None
+
+
+def invalidate_scope(*user_ids: int) -> None:
+    """Drop the cached scopes of these users everywhere; call after the change is committed."""
+    if not user_ids:
+        return
+    with _scopes_lock:
+        for user_id in user_ids:
+            _scopes.pop(user_id, None)
+            if not redis_client:
+                _local_revisions[user_id] = _local_revisions.get(user_id, 0) + 1
+    if redis_client:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.incr(_revision_key(user_id))
+            pipe.execute()
+        except Exception:
+            logger.warning("Failed to bump authorization scope revision for users %s", user_ids)
+
+
+def _cached_scope(user_id: int, revision: int | None) -> AuthScope | None:
+    with _scopes_lock:
+        cached = _scopes.get(user_id)
+    if cached is not None and revision is not None and cached[0] == revision:
+        return cached[1]
+    return None
+
+
+def _store_scope(user_id: int, revision: int | None, scope: AuthScope) -> None:
+    if revision is not None:
+        with _scopes_lock:
+            _scopes[user_id] = (revision, scope)
+
+
+def _load_scope(session: Session, user_id: int) -> AuthScope:
+    with primary_session(session) as primary:
+        event_ids = primary.exec(select(EventEvaluator.event_id).where(EventEvaluator.user_id == user_id)).all()
+        group_rows = primary.exec(
+            select(GroupEvaluator.group_id, Group.event_id)
+            .join(Group, GroupEvaluator.group_id == Group.id)
+            .where(GroupEvaluator.user_id == user_id)
+        ).all()
+    return AuthScope(event_ids=frozenset(event_ids), group_events=dict(group_rows))
+
+
+def get_scope(session: Session, user: User) -> AuthScope:
+    """The user's current evaluator scope, from cache when its revision is unchanged."""
+    # Read the revision first: a change committed while we load can only make
+    # the cached entry look older than it is, never newer.
+    revision = _scope_revision(user.id)
+    scope = _cached_scope(user.id, revision)
+    if scope is None:
+        scope = _load_scope(session, user.id)
+        _store_scope(user.id, revision, scope)
+    return scope
+
+
+async def get_scope_async(session: AsyncSession, user: User) -> AuthScope:
+    """``get_scope`` for the asyncio request path; shares the per-process cache."""
+    revision = await _scope_revision_async(user.id)
+    scope = _cached_scope(user.id, revision)
+    if scope is None:
+        scope = await session.run_sync(_load_scope, user.id)
+        _store_scope(user.id, revision, scope)
+    return scope
+
+
 def require_event_access(session: Session, user: User, event_id: int) -> None:
     """Raise ForbiddenException if evaluator is not in the event pool."""
     if is_admin(user):
         return
-    pool = session.get(EventEvaluator, (event_id, user.id))
-    if not pool:
+    if event_id not in get_scope(session, user).event_ids:
         raise ForbiddenException("You do not have access to this event")
 
 
@@ -26,9 +154,4 @@ def get_visible_group_ids(session: Session, user: User, event_id: int) -> list[i
     """Return group IDs visible to the user, or None if admin (all visible)."""
     if is_admin(user):
         return None  # all groups visible
-    group_ids = session.exec(
-        select(GroupEvaluator.group_id)
-        .join(Group, GroupEvaluator.group_id == Group.id)
-        .where(GroupEvaluator.user_id == user.id, Group.event_id == event_id)
-    ).all()
-    return list(group_ids)
+    return get_scope(session, user).group_ids(event_id)
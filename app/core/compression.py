@@ -0,0 +1,34 @@
+"""Incremental gzip encoding for streamed responses."""
+
+import zlib
+from collections.abc import Iterable, Iterator
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Whether an ``Accept-Encoding`` header allows a gzip-encoded body."""
+    if not accept_encoding:
+        return False
+    for coding in accept_encoding.split(","):
+        name, *params = (part.strip() for part in coding.split(";"))
+        if name.lower() not in ("gzip", "x-gzip"):
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def gzip_stream(chunks: Iterable[str], encoding: str = "utf-8") -> Iterator[bytes]:
+    """Gzip text chunks one at a time, flushing after each so bytes leave early."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip header + trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode(encoding))
+        data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -1,18 +1,18 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.orm import make_transient_to_detached
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.security import decode_access_token
-from app.database import get_session
+from app.core.user_cache import cache_user, cache_user_async, get_cached_user, get_cached_user_async
+from app.database import get_async_session, get_session
 from app.models.user import User, UserRole
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session),
-) -> User:
+def _token_subject(token: str) -> str:
     email = decode_access_token(token)
     if email is None:
         raise HTTPException(
@@ -20,12 +20,26 @@ def get_current_user(
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return email
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    session: Session = Depends(get_session),
+) -> User:
+    email = _token_subject(token)
+    cached = get_cached_user(email)
+    if cached is not None:
+        # Attach without a SELECT; password_hash stays unloaded until accessed.
+        make_transient_to_detached(cached)
+        return session.merge(cached, load=False)
     user = session.exec(select(User).where(User.email == email)).first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
+    cache_user(user)
     return user
 
 
@@ -38,6 +52,30 @@ def get_current_active_user(user: User = Depends(get_current_user)) -> User:
     return user
 
 
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_async_session),
+) -> User:
+    """``get_current_user`` for ``async def`` routes; the user is attached to their AsyncSession."""
+    email = _token_subject(token)
+    cached = await get_cached_user_async(email)
+    if cached is not None:
+        make_transient_to_detached(cached)
+        return await session.merge(cached, load=False)
+    user = (await session.exec(select(User).where(User.email == email))).first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+    await cache_user_async(user)
+    return user
+
+
+async def get_current_active_user_async(user: User = Depends(get_current_user_async)) -> User:
+    return get_current_active_user(user)
+
+
 def get_current_admin(user: User = Depends(get_current_active_user)) -> User:
     if user.role not in (UserRole.ADMIN, UserRole.SUPER_ADMIN):
         raise HTTPException(
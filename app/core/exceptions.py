@@ -51,6 +51,13 @@ class ValidationException(AppException):
         super().__init__(message=message, status_code=400)
 
 
+class ServiceUnavailableException(AppException):
+    """Raised when a bounded resource is saturated; the caller may retry later."""
+
+    def __init__(self, message: str = "Service temporarily unavailable. Please try again."):
+        super().__init__(message=message, status_code=503)
+
+
 # ── Audit Action Enum ─────────────────────────────────────────────────────────
 
 
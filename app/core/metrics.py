@@ -0,0 +1,37 @@
+"""Process-local counters and gauges exposed on ``GET /admin/metrics``.
+
+Every uvicorn worker keeps its own numbers; scrape each replica and sum the
+results for fleet-wide totals.
+"""
+
+import threading
+from collections import Counter
+
+_counters: Counter[str] = Counter()
+_gauges: dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def increment(name: str, amount: int = 1) -> None:
+    with _lock:
+        _counters[name] += amount
+
+
+def set_gauge(name: str, value: int) -> None:
+    with _lock:
+        _gauges[name] = value
+
+
+def adjust_gauge(name: str, delta: int) -> None:
+    with _lock:
+        _gauges[name] = _gauges.get(name, 0) + delta
+
+
+def snapshot() -> dict[str, int]:
+    with _lock:
+        return dict(sorted(_counters.items()))
+
+
+def gauges() -> dict[str, int]:
+    with _lock:
+        return dict(sorted(_gauges.items()))
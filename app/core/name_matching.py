@@ -0,0 +1,198 @@
+"""Fuzzy matching of OCR'd names against a participant roster.
+
+Names are deaccented, lower-cased and reduced to sorted word tokens, so
+"Nováková Jana" and "jana novakova" compare equal. Similarity is the Dice
+coefficient of padded character trigrams, looked up through a trigram
+inverted index so a query only scores roster names it shares a trigram with.
+
+Rows are then assigned to roster entries one-to-one, maximising the total
+similarity. Each row keeps only candidates within ``CANDIDATE_MARGIN`` of its
+best score; the Hungarian algorithm runs per connected component of that
+candidate graph, which keeps its cubic step small.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from app.core.text import deaccent
+
+MIN_SIMILARITY = 0.35
+CANDIDATE_MARGIN = 0.25
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(name: str) -> str:
+    """'Nováková  Jana' -> 'jana novakova'."""
+    tokens = _NON_WORD.split(deaccent(name).lower())
+    return " ".join(sorted(t for t in tokens if t))
+
+
+def trigrams(normalized: str) -> frozenset[str]:
+    """Padded character trigrams of every token, as in PostgreSQL's pg_trgm."""
+    grams: set[str] = set()
+    for token in normalized.split():
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+@dataclass(frozen=True, slots=True)
+class NameMatch:
+    row: int            # index into the queried names
+    key: int            # roster key, e.g. participant id
+    name: str           # roster display name
+    confidence: float   # similarity in [0, 1]
+
+
+class NameIndex:
+    """Trigram index over a roster of ``(key, display_name)`` pairs."""
+
+    def __init__(self, roster: Iterable[tuple[int, str]]):
+        self._keys: list[int] = []
+        self._names: list[str] = []
+        self._grams: list[frozenset[str]] = []
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        for key, name in roster:
+            i = len(self._keys)
+            grams = trigrams(normalize_name(name))
+            self._keys.append(key)
+            self._names.append(name)
+            self._grams.append(grams)
+            for gram in grams:
+                self._postings[gram].append(i)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def candidates(self, name: str, min_similarity: float = MIN_SIMILARITY) -> dict[int, float]:
+        """Roster positions similar to ``name`` with their Dice similarity."""
+        grams = trigrams(normalize_name(name))
+        if not grams:
+            return {}
+        shared: dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for i in self._postings.get(gram, ()):
+                shared[i] += 1
+        scores = {}
+        for i, count in shared.items():
+            score = 2 * count / (len(grams) + len(self._grams[i]))
+            if score >= min_similarity:
+                scores[i] = score
+        if scores:
+            floor = max(scores.values()) - CANDIDATE_MARGIN
+            scores = {i: s for i, s in scores.items() if s >= floor}
+        return scores
+
+    def match(self, names: list[str], min_similarity: float = MIN_SIMILARITY) -> list[NameMatch]:
+        """Best one-to-one assignment of ``names`` to roster entries, ordered by row.
+
+        Rows without a candidate above ``min_similarity`` (or that lose their
+        only candidates to better rows) are left out.
+        """
+        edges = [self.candidates(name, min_similarity) for name in names]
+        matches = [
+            NameMatch(row=r, key=self._keys[c], name=self._names[c], confidence=round(edges[r][c], 3))
+            for rows, cols in _components(edges)
+            for r, c in _assign(rows, cols, edges)
+        ]
+        matches.sort(key=lambda m: m.row)
+        return matches
+
+
+def _components(edges: list[dict[int, float]]) -> list[tuple[list[int], list[int]]]:
+    """Connected components of the row/column candidate graph."""
+    parent: dict[tuple[str, int], tuple[str, int]] = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for r, cols in enumerate(edges):
+        for c in cols:
+            a, b = find(("r", r)), find(("c", c))
+            if a != b:
+                parent[a] = b
+
+    groups: dict[tuple[str, int], tuple[list[int], list[int]]] = {}
+    for node in list(parent):
+        rows, cols = groups.setdefault(find(node), ([], []))
+        (rows if node[0] == "r" else cols).append(node[1])
+    return list(groups.values())
+
+
+def _assign(rows: list[int], cols: list[int], edges: list[dict[int, float]]) -> list[tuple[int, int]]:
+    if len(rows) == 1:
+        r = rows[0]
+        return [(r, max(cols, key=lambda c: edges[r][c]))]
+    if len(cols) == 1:
+        c = cols[0]
+        return [(max(rows, key=lambda r: edges[r][c]), c)]
+
+    # Square cost matrix; padding rows/columns and non-edges cost 1 (score 0).
+    size = max(len(rows), len(cols))
+    cost = [[1.0] * size for _ in range(size)]
+    for i, r in enumerate(rows):
+        for j, c in enumerate(cols):
+            if c in edges[r]:
+                cost[i][j] = 1.0 - edges[r][c]
+    pairs = []
+    for i, j in enumerate(_hungarian(cost)):
+        if i < len(rows) and j < len(cols) and cols[j] in edges[rows[i]]:
+            pairs.append((rows[i], cols[j]))
+    return pairs
+
+
+def _hungarian(cost: list[list[float]]) -> list[int]:
+    """Column assigned to each row of a square cost matrix, minimising the total cost."""
+    n = len(cost)
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (n + 1)
+    p = [0] * (n + 1)    # p[j]: row (1-based) assigned to column j
+    way = [0] * (n + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (n + 1)
+        used = [False] * (n + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            ui0 = u[i0]
+            delta = inf
+            j1 = 0
+            for j in range(1, n + 1):
+                if not used[j]:
+                    cur = row[j - 1] - ui0 - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(n + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    assignment = [0] * n
+    for j in range(1, n + 1):
+        assignment[p[j] - 1] = j - 1
+    return assignment
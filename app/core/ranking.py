@@ -0,0 +1,74 @@
+"""Ranking kernel for one leaderboard bucket.
+
+Takes a bucket's ``value_numeric`` scores and participant ids and returns the
+leaderboard order together with "1224" competition ranks: best score first,
+unrankable (``None``) scores tied last, ties listed by participant id. That
+is the order ``BucketRanking`` keeps and ``_ranked_records`` returns from
+SQL, so every leaderboard path lists tied participants alike.
+
+Large buckets are ranked with NumPy: one float array, a single ``lexsort``
+and a running maximum for the ranks. NumPy is optional; without it, and for
+buckets too small to amortize building the arrays, a pure-Python path gives
+identical results.
+"""
+
+from collections.abc import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# Below this many entries the NumPy array setup costs more than it saves.
+VECTORIZE_MIN_SIZE = 64
+
+
+def _rank_python(
+    values: Sequence[float | None], ids: Sequence[int], lower_is_better: bool,
+) -> tuple[list[int], list[int]]:
+    sign = 1.0 if lower_is_better else -1.0
+    keys = [(1, 0.0) if v is None else (0, sign * v) for v in values]
+    order = sorted(range(len(keys)), key=lambda i: (keys[i], ids[i]))
+    ranks: list[int] = []
+    rank = 0
+    prev_key = None
+    for position, i in enumerate(order, start=1):
+        if keys[i] != prev_key:
+            rank = position
+            prev_key = keys[i]
+        ranks.append(rank)
+    return order, ranks
+
+
+def _rank_numpy(
+    values: Sequence[float | None], ids: Sequence[int], lower_is_better: bool,
+) -> tuple[list[int], list[int]]:
+    scores = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    unranked = np.isnan(scores)
+    keys = np.where(unranked, 0.0, scores if lower_is_better else -scores)
+    # lexsort's last key is the primary one: rankable first, then score, then id.
+    order = np.lexsort((np.asarray(ids, dtype=np.int64), keys, unranked))
+    sorted_keys, sorted_unranked = keys[order], unranked[order]
+    new_score = np.empty(len(order), dtype=bool)
+    new_score[0] = True
+    new_score[1:] = (sorted_keys[1:] != sorted_keys[:-1]) | (sorted_unranked[1:] != sorted_unranked[:-1])
+    positions = np.arange(1, len(order) + 1)
+    ranks = np.maximum.accumulate(np.where(new_score, positions, 0))
+    return order.tolist(), ranks.tolist()
+
+
+def rank_scores(
+    values: Sequence[float | None], ids: Sequence[int], lower_is_better: bool,
+) -> tuple[list[int], list[int]]:
+    """Rank one bucket; returns ``(order, ranks)``.
+
+    ``order`` lists indices into ``values``/``ids`` in leaderboard order and
+    ``ranks[k]`` is the competition rank of ``order[k]``.
+    """
+    if len(values) != len(ids):
+        raise ValueError("values and ids must have the same length")
+    if not values:
+        return [], []
+    if np is not None and len(values) >= VECTORIZE_MIN_SIZE:
+        return _rank_numpy(values, ids, lower_is_better)
+    return _rank_python(values, ids, lower_is_better)
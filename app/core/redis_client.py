@@ -1,4 +1,5 @@
 import redis
+import redis.asyncio
 
 from app.config import settings
 
@@ -7,3 +8,10 @@ redis_client: redis.Redis | None = (
     if settings.REDIS_URL
     else None
 )
+
+# Same server for ``async def`` request paths, so they never block the event loop.
+async_redis_client: redis.asyncio.Redis | None = (
+    redis.asyncio.from_url(settings.REDIS_URL, decode_responses=True)
+    if settings.REDIS_URL
+    else None
+)
@@ -0,0 +1,26 @@
+"""Numeric form of raw record values, used for ranking.
+
+``Record.value_raw`` keeps what the evaluator entered; ``Record.value_numeric``
+holds this normalization of it, computed once when the record is written.
+TIME_* values go through ``parse_time_to_seconds`` so "1:23.4" ranks as
+83.4 s; everything else must parse as a finite number. Values that do not
+normalize are stored as NULL and rank last, tied with each other.
+"""
+
+import math
+
+from app.core.time_format import parse_time_to_seconds
+from app.models.activity import EvaluationType
+
+LOWER_IS_BETTER = frozenset({EvaluationType.NUMERIC_LOW, EvaluationType.TIME_LOW})
+
+
+def score_value(value_raw: str | None, evaluation_type: EvaluationType) -> float | None:
+    """``value_raw`` as a number to rank by, or ``None`` if it cannot be ranked."""
+    if evaluation_type == EvaluationType.TIME_LOW:
+        return parse_time_to_seconds(value_raw)
+    try:
+        numeric = float(value_raw)
+    except (ValueError, TypeError):
+        return None
+    return numeric if math.isfinite(numeric) else None
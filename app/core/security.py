@@ -1,19 +1,82 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.config import settings
+from app.core import metrics
+from app.core.exceptions import ServiceUnavailableException
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_desired_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_desired_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt is deliberately slow; a login storm must not take every request
+# thread with it. Hashing runs on its own small pool, and callers beyond
+# PASSWORD_HASH_MAX_PENDING are turned away with a 503 instead of queueing.
+# Request handlers await the pool from the event loop, so a pending hash
+# holds no threadpool slot; the sync helpers are for background jobs.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_pending = 0
+_hash_pending_lock = threading.Lock()
+
+
+def _claim_hash_slot() -> None:
+    global _hash_pending
+    with _hash_pending_lock:
+        if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            metrics.increment("auth.hash_rejected")
+            raise ServiceUnavailableException("Server is busy signing users in. Please try again in a moment.")
+        _hash_pending += 1
+        metrics.set_gauge("auth.hash_pending", _hash_pending)
+
+
+def _release_hash_slot() -> None:
+    global _hash_pending
+    with _hash_pending_lock:
+        _hash_pending -= 1
+        metrics.set_gauge("auth.hash_pending", _hash_pending)
+    metrics.increment("auth.hash_operations")
+
+
+def _run_hashing(fn, *args):
+    _claim_hash_slot()
+    try:
+        return _hash_executor.submit(fn, *args).result()
+    finally:
+        _release_hash_slot()
+
+
+async def _run_hashing_async(fn, *args):
+    _claim_hash_slot()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _release_hash_slot()
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return _run_hashing(pwd_context.hash, password)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing_async(pwd_context.hash, password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run_hashing(pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify a password; on success also return a new hash if the stored one uses an outdated cost."""
+    return await _run_hashing_async(pwd_context.verify_and_update, plain_password, hashed_password)
 
 
 def create_access_token(subject: str) -> str:
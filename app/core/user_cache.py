@@ -0,0 +1,129 @@
+"""Short-lived cache of authenticated user principals.
+
+``get_current_user`` runs on every authenticated request; caching the user
+row by token subject (email) saves the lookup query. Entries live in Redis so
+an invalidation reaches every replica at once, or in process memory when Redis
+is not configured. Services that change a user's role, status or credentials
+must call ``invalidate_user``.
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime
+
+from cachetools import TTLCache
+
+from app.core.redis_client import async_redis_client, redis_client
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+_USER_TTL = 60
+
+_local_users: TTLCache = TTLCache(maxsize=10_000, ttl=_USER_TTL)
+_local_users_lock = threading.Lock()
+
+
+def _user_key(email: str) -> str:
+    return f"auth:user:{email}"
+
+
+def _user_from_data(data: dict) -> User:
+    return User(
+        id=data["id"],
+        email=data["email"],
+        full_name=data["full_name"],
+        role=UserRole(data["role"]),
+        is_active=data["is_active"],
+        created_at=datetime.fromisoformat(data["created_at"]),
+    )
+
+
+def _user_data(user: User) -> dict:
+    return {
+        "id": user.id,
+        "email": user.email,
+        "full_name": user.full_name,
+        "role": UserRole(user.role).value,
+        "is_active": user.is_active,
+        "created_at": user.created_at.isoformat(),
+    }
+
+
+def get_cached_user(email: str) -> User | None:
+    """Transient ``User`` built from the cache (without ``password_hash``), or None."""
+    data = None
+    if redis_client:
+        try:
+            raw = redis_client.get(_user_key(email))
+            data = json.loads(raw) if raw else None
+        except Exception:
+            logger.warning("Failed to read cached user principal")
+    else:
+        with _local_users_lock:
+            data = _local_users.get(email)
+    return _user_from_data(data) if data is not None else None
+
+
+def cache_user(user: User) -> None:
+    data = _user_data(user)
+    if redis_client:
+        try:
+            redis_client.setex(_user_key(user.email), _USER_TTL, json.dumps(data))
+        except Exception:
+            logger.warning("Failed to cache user principal")
+        return
+    with _local_users_lock:
+        _local_users[user.email] = data
+
+
+async def get_cached_user_async(email: str) -> User | None:
+    """``get_cached_user`` over the asyncio Redis client."""
+    data = None
+    if async_redis_client:
+        try:
+            raw = await async_redis_client.get(_user_key(email))
+            data = json.loads(raw) if raw else None
+        except Exception:
+            logger.warning("Failed to read cached user principal")
+    else:
+        with _local_users_lock:
+            data = _local_users.get(email)
+    return _user_from_data(data) if data is not None else None
+
+
+async def cache_user_async(user: User) -> None:
+    data = _user_data(user)
+    if async_redis_client:
+        try:
+            await async_redis_client.setex(_user_key(user.email), _USER_TTL, json.dumps(data))
+        except Exception:
+            logger.warning("Failed to cache user principal")
+        return
+    with _local_users_lock:
+        _local_users[user.email] = data
+
+
+def invalidate_user(email: str) -> None:
+    """Forget a cached principal so the next request re-reads the user row."""
+    if redis_client:
+        try:
+            redis_client.delete(_user_key(email))
+        except Exception:
+            logger.warning("Failed to invalidate cached user principal")
+        return
+    with _local_users_lock:
+        _local_users.pop(email, None)
+
+
+async def invalidate_user_async(email: str) -> None:
+    """``invalidate_user`` over the asyncio Redis client."""
+    if async_redis_client:
+        try:
+            await async_redis_client.delete(_user_key(email))
+        except Exception:
+            logger.warning("Failed to invalidate cached user principal")
+        return
+    with _local_users_lock:
+        _local_users.pop(email, None)
@@ -1,10 +1,141 @@
-from collections.abc import Generator
+import logging
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator, Iterator
+from contextlib import contextmanager
 
+from cachetools import TTLCache
+from fastapi import Depends, Request
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
+from app.core import metrics
+from app.core.redis_client import redis_client
+from app.core.security import decode_access_token
 
-engine = create_engine(settings.DATABASE_URL, echo=False)
+logger = logging.getLogger(__name__)
+
+_LAG_CHECK_INTERVAL = 1.0
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+# Async drivers used for the sync URL's dialect by ``async_engine``.
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+class _PoolWaitTiming:
+    """Pool mixin that reports how long requests wait for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.increment("db.pool_timeouts")
+            raise
+        finally:
+            metrics.increment("db.pool_wait_ms", int((time.perf_counter() - start) * 1000))
+
+
+class _InstrumentedQueuePool(_PoolWaitTiming, QueuePool):
+    pass
+
+
+class _InstrumentedAsyncQueuePool(_PoolWaitTiming, AsyncAdaptedQueuePool):
+    pass
+
+
+def async_url(url: str) -> str:
+    """``url`` with its driver swapped for the asyncio one (asyncpg, aiosqlite)."""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None or parsed.drivername == driver:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def engine_options(url: str) -> dict:
+    """``create_engine`` keyword arguments for ``url`` built from the DB_* settings.
+
+    Pool and timeout settings only apply to PostgreSQL; SQLite (tests, local
+    tooling) keeps SQLAlchemy's defaults. In PgBouncer mode (transaction
+    pooling) nothing is sent as a startup parameter and server-side prepared
+    statements are disabled, since neither survives a server connection switch.
+    """
+    driver = make_url(url).drivername
+    if not driver.startswith("postgresql"):
+        return {}
+
+    options: dict = {
+        "poolclass": _InstrumentedAsyncQueuePool if driver == "postgresql+asyncpg" else _InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    connect_args: dict = {}
+    if driver == "postgresql+asyncpg":
+        if settings.DB_PGBOUNCER:
+            connect_args.update(statement_cache_size=0, prepared_statement_cache_size=0)
+        if settings.DB_STATEMENT_TIMEOUT_MS and not settings.DB_PGBOUNCER:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    elif settings.DB_STATEMENT_TIMEOUT_MS and not settings.DB_PGBOUNCER:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def instrument_engine(engine, label: str = "primary") -> None:
+    """Attach pool gauges and, behind PgBouncer, a per-transaction statement timeout."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    pool = sync_engine.pool
+    if isinstance(pool, QueuePool):
+        gauge = f"db.{label}.pool_checked_out"
+
+        @event.listens_for(pool, "checkout")
+        def _on_checkout(*_args):
+            metrics.increment(f"db.{label}.pool_checkouts")
+            metrics.adjust_gauge(gauge, 1)
+
+        @event.listens_for(pool, "checkin")
+        def _on_checkin(*_args):
+            metrics.adjust_gauge(gauge, -1)
+
+    if settings.DB_STATEMENT_TIMEOUT_MS and settings.DB_PGBOUNCER and sync_engine.dialect.name == "postgresql":
+        # Session-level SETs leak across clients under transaction pooling; SET LOCAL does not.
+        @event.listens_for(sync_engine, "begin")
+        def _set_statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+
+
+engine = create_engine(settings.DATABASE_URL, echo=False, **engine_options(settings.DATABASE_URL))
+instrument_engine(engine)
+
+replica_engine = (
+    create_engine(settings.DATABASE_REPLICA_URL, echo=False, **engine_options(settings.DATABASE_REPLICA_URL))
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+if replica_engine is not None:
+    instrument_engine(replica_engine, label="replica")
+
+
+# Asyncio twin of ``engine`` for the hot request paths (records, leaderboard,
+# my-groups); everything else, tests' fixtures and Alembic stay on the sync engine.
+_async_database_url = async_url(settings.DATABASE_URL)
+async_engine = create_async_engine(_async_database_url, echo=False, **engine_options(_async_database_url))
+instrument_engine(async_engine, label="primary_async")
 
 
 def init_db() -> None:
@@ -14,3 +145,120 @@ def init_db() -> None:
 def get_session() -> Generator[Session]:
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession]:
+    """Primary ``AsyncSession``; objects stay loaded after commit since lazy loads cannot run."""
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+# ── Read replica ─────────────────────────────────────────────────────────────
+
+# Users who wrote recently, when Redis is not configured.
+_local_writers: TTLCache = TTLCache(maxsize=10_000, ttl=settings.DB_READ_YOUR_WRITES_SECONDS)
+_local_writers_lock = threading.Lock()
+
+_replica_state = {"checked_at": float("-inf"), "healthy": False}
+_replica_state_lock = threading.Lock()
+
+
+def _writer_key(subject: str) -> str:
+    return f"db:recent-writer:{subject}"
+
+
+def _request_subject(request: Request) -> str | None:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return decode_access_token(token)
+
+
+def mark_recent_write(request: Request) -> None:
+    """Pin the requesting user's reads to the primary for DB_READ_YOUR_WRITES_SECONDS."""
+    if replica_engine is None:
+        return
+    subject = _request_subject(request)
+    if subject is None:
+        return
+    if redis_client:
+        try:
+            redis_client.setex(_writer_key(subject), settings.DB_READ_YOUR_WRITES_SECONDS, 1)
+        except Exception:
+            logger.warning("Failed to record recent write for read-your-writes routing")
+        return
+    with _local_writers_lock:
+        _local_writers[subject] = True
+
+
+def _wrote_recently(subject: str) -> bool:
+    if redis_client:
+        try:
+            return bool(redis_client.exists(_writer_key(subject)))
+        except Exception:
+            logger.warning("Failed to read recent-write marker; reading from the primary")
+            return True
+    with _local_writers_lock:
+        return subject in _local_writers
+
+
+def _replica_lag_seconds() -> float | None:
+    """Replication lag of the replica, or None when it cannot be measured."""
+    try:
+        with replica_engine.connect() as conn:
+            lag = conn.execute(_REPLICA_LAG_SQL).scalar()
+        return float(lag) if lag is not None else None
+    except Exception:
+        logger.warning("Read replica lag check failed")
+        return None
+
+
+def _replica_healthy() -> bool:
+    """Whether the replica is reachable and within DB_REPLICA_MAX_LAG_SECONDS; checked at most once a second."""
+    with _replica_state_lock:
+        if time.monotonic() - _replica_state["checked_at"] < _LAG_CHECK_INTERVAL:
+            return _replica_state["healthy"]
+        _replica_state["checked_at"] = time.monotonic()  # other threads reuse the last answer meanwhile
+    lag = _replica_lag_seconds()
+    healthy = lag is not None and lag <= settings.DB_REPLICA_MAX_LAG_SECONDS
+    with _replica_state_lock:
+        _replica_state["healthy"] = healthy
+    return healthy
+
+
+def get_read_session(request: Request, session: Session = Depends(get_session)) -> Generator[Session]:
+    """Session for read-only endpoints: the replica when it is current, else the primary.
+
+    Users who wrote within DB_READ_YOUR_WRITES_SECONDS keep reading from the
+    primary so they see their own changes. Anything cached under a revision
+    counter must still be loaded through ``primary_session``.
+    """
+    if replica_engine is None:
+        yield session
+        return
+    subject = _request_subject(request)
+    if subject is not None and _wrote_recently(subject):
+        metrics.increment("db.reads_primary_sticky")
+        yield session
+        return
+    if not _replica_healthy():
+        metrics.increment("db.reads_primary_lag")
+        yield session
+        return
+    metrics.increment("db.reads_replica")
+    with Session(replica_engine, info={"replica": True}) as replica:
+        yield replica
+
+
+@contextmanager
+def primary_session(session: Session) -> Iterator[Session]:
+    """``session`` itself, or a short-lived primary session if it reads from the replica.
+
+    Used where results are cached under revision counters: a lagging replica
+    would otherwise store old data under a current revision.
+    """
+    if not session.info.get("replica"):
+        yield session
+        return
+    with Session(engine) as primary:
+        yield primary
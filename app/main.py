@@ -9,19 +9,22 @@ load_dotenv()
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from datetime import datetime, timedelta, timezone
 
+from app.core import audit as audit_log
 from app.core.exceptions import AppException
 
 from sqlmodel import Session, delete, select, text
 
 from app.config import settings as app_settings
 from app.core.limiter import limiter
-from app.core.redis_client import redis_client
-from app.database import engine
+from app.core.redis_client import async_redis_client, redis_client
+from app.database import async_engine, engine, mark_recent_write
 from app.routers import activities, admin, analytics, audit, auth, diplomas, events, groups, participants, records
+from app.services import audit_retention_service, import_service, leaderboard_stream_service, ocr_service
 
 logger = logging.getLogger(__name__)
 
@@ -100,17 +103,28 @@ async def lifespan(app: FastAPI):
     except Exception:
         logger.warning("Failed to bootstrap super admin", exc_info=True)
 
+    audit_log.start()
+    audit_retention_service.start()
+
     yield
 
     # Shutdown: cleanup
+    await leaderboard_stream_service.shutdown()
+    ocr_service.shutdown()
+    import_service.shutdown()
+    audit_retention_service.shutdown()
+    audit_log.shutdown()
+
     try:
         engine.dispose()
+        await async_engine.dispose()
         logger.info("Database connections closed")
     except Exception:
         logger.warning("Error disposing database engine")
 
     try:
         redis_client.close()
+        await async_redis_client.aclose()
         logger.info("Redis connection closed")
     except Exception:
         logger.warning("Error closing Redis connection")
@@ -148,6 +162,14 @@ async def security_headers_middleware(request: Request, call_next):
     return response
 
 
+@app.middleware("http")
+async def read_your_writes_middleware(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        await run_in_threadpool(mark_recent_write, request)
+    return response
+
+
 @app.middleware("http")
 async def request_logging_middleware(request: Request, call_next):
     request_id = str(uuid.uuid4())[:8]
@@ -1,15 +1,23 @@
 from datetime import datetime, timezone
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
 class AuditLog(SQLModel, table=True):
     __tablename__ = "auditlog"
+    # Keyset pagination walks (created_at, id) newest first, optionally within one filter.
+    __table_args__ = (
+        Index("ix_auditlog_created_at_id", "created_at", "id"),
+        Index("ix_auditlog_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_auditlog_action_created_at_id", "action", "created_at", "id"),
+        Index("ix_auditlog_resource_created_at_id", "resource_type", "resource_id", "created_at", "id"),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
-    user_id: int | None = Field(default=None, foreign_key="user.id", index=True)
+    user_id: int | None = Field(default=None, foreign_key="user.id")
     action: str
     resource_type: str | None = None
     resource_id: int | None = None
     detail: str | None = None
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
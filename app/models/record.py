@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -13,10 +13,12 @@ if TYPE_CHECKING:
 class Record(SQLModel, table=True):
     __table_args__ = (
         UniqueConstraint("participant_id", "activity_id", name="uq_record_participant_activity"),
+        Index("ix_record_activity_id_value_numeric", "activity_id", "value_numeric"),
     )
 
     id: int | None = Field(default=None, primary_key=True)
     value_raw: str
+    value_numeric: float | None = Field(default=None)  # app.core.scoring.score_value(value_raw)
     participant_id: int = Field(foreign_key="participant.id", index=True)
     activity_id: int = Field(foreign_key="activity.id", index=True)
     evaluator_id: int | None = Field(default=None, foreign_key="user.id", index=True)
@@ -1,11 +1,15 @@
+import os
+
 from fastapi import APIRouter, Depends, Query, Request, status
 from sqlmodel import Session
 
+from app.core import metrics
 from app.core.dependencies import get_current_admin, get_current_super_admin
 from app.core.limiter import limiter
 from app.database import get_session
 from app.models.user import User
 from app.schemas.auth import CreateInvitationRequest, InvitationRead, UserRead, UserUpdate
+from app.schemas.metrics import MetricsRead
 from app.services import admin_service
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -77,3 +81,8 @@ def revoke_invitation(
     admin: User = Depends(get_current_admin),
 ):
     admin_service.revoke_invitation(session, invitation_id, admin)
+
+
+@router.get("/metrics", response_model=MetricsRead)
+def get_metrics(_admin: User = Depends(get_current_admin)):
+    return MetricsRead(worker_pid=os.getpid(), counters=metrics.snapshot(), gauges=metrics.gauges())
@@ -1,26 +1,54 @@
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from fastapi.responses import StreamingResponse
 from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.authorization import require_event_access
+from app.core.compression import accepts_gzip, gzip_stream
 from app.core.dependencies import get_current_active_user, get_current_admin
 from app.core.limiter import limiter
-from app.database import get_session
+from app.database import get_read_session, get_session
 from app.models.user import User
-from app.schemas.leaderboard import LeaderboardResponse
-from app.services import leaderboard_service
+from app.schemas.leaderboard import LeaderboardChanges, LeaderboardResponse
+from app.services import leaderboard_service, leaderboard_stream_service
 
 router = APIRouter(tags=["analytics"])
 
 
-@router.get("/events/{event_id}/leaderboard", response_model=LeaderboardResponse)
-def get_leaderboard(
+@router.get("/events/{event_id}/leaderboard", response_model=LeaderboardResponse | LeaderboardChanges)
+async def get_leaderboard(
+    event_id: int,
+    activity_id: int | None = None,
+    gender: str | None = Query(default=None, max_length=20),
+    age_category: str | None = Query(default=None, max_length=255),
+    top: int | None = Query(default=None, ge=1, le=1000),
+    since: int | None = Query(default=None, ge=0),
+    session: Session = Depends(get_read_session),
+    user: User = Depends(get_current_active_user),
+):
+    await run_in_threadpool(require_event_access, session, user, event_id)
+    slice_ = leaderboard_service.LeaderboardFilter(
+        activity_id=activity_id, gender=gender, age_category=age_category, top=top,
+    )
+    if since is not None:
+        return await leaderboard_service.get_leaderboard_changes_async(session, event_id, since, slice_)
+    if slice_ != leaderboard_service.LeaderboardFilter():
+        return await leaderboard_service.get_leaderboard_slice_async(session, event_id, slice_)
+    return await leaderboard_service.get_leaderboard_async(session, event_id)
+
+
+@router.get("/events/{event_id}/leaderboard/stream")
+async def stream_leaderboard(
     event_id: int,
     session: Session = Depends(get_session),
     user: User = Depends(get_current_active_user),
 ):
-    require_event_access(session, user, event_id)
-    return leaderboard_service.get_leaderboard(session, event_id)
+    await run_in_threadpool(require_event_access, session, user, event_id)
+    events = await leaderboard_stream_service.open_stream(session, event_id)
+    return StreamingResponse(
+        events, media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/events/{event_id}/export-csv")
@@ -28,12 +56,15 @@ def get_leaderboard(
 def export_csv(
     request: Request,
     event_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     _admin: User = Depends(get_current_admin),
 ):
-    csv_content = leaderboard_service.export_csv(session, event_id)
-    return StreamingResponse(
-        iter([csv_content]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=event_{event_id}_results.csv"},
-    )
+    chunks = leaderboard_service.export_csv(session, event_id)
+    headers = {
+        "Content-Disposition": f"attachment; filename=event_{event_id}_results.csv",
+        "Vary": "Accept-Encoding",
+    }
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(gzip_stream(chunks), media_type="text/csv", headers=headers)
+    return StreamingResponse(chunks, media_type="text/csv", headers=headers)
@@ -1,31 +1,35 @@
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, Query
-from sqlmodel import Session, func, select
+from sqlmodel import Session
 
 from app.core.dependencies import get_current_admin
-from app.database import get_session
-from app.models.audit_log import AuditLog
+from app.database import get_read_session
 from app.models.user import User
-from app.schemas.audit import AuditLogRead, PaginatedAuditLogs
+from app.schemas.audit import PaginatedAuditLogs
+from app.services import audit_service
+from app.services.audit_service import AuditLogFilter, CountMode
 
 router = APIRouter(tags=["audit"])
 
 
 @router.get("/admin/audit-logs", response_model=PaginatedAuditLogs)
 def get_audit_logs(
+    cursor: str | None = Query(default=None, max_length=200),
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=50, ge=1, le=1000),
-    session: Session = Depends(get_session),
+    user_id: int | None = None,
+    action: str | None = Query(default=None, max_length=100),
+    resource_type: str | None = Query(default=None, max_length=100),
+    resource_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    count: CountMode = CountMode.ESTIMATED,
+    session: Session = Depends(get_read_session),
     _admin: User = Depends(get_current_admin),
 ):
-
-    total = session.exec(select(func.count(AuditLog.id))).one()
-    logs = session.exec(
-        select(AuditLog).order_by(AuditLog.created_at.desc()).offset(skip).limit(limit)
-    ).all()
-
-    return PaginatedAuditLogs(
-        total=total,
-        skip=skip,
-        limit=limit,
-        items=[AuditLogRead.model_validate(log) for log in logs],
+    filter_ = AuditLogFilter(
+        user_id=user_id, action=action, resource_type=resource_type,
+        resource_id=resource_id, since=since, until=until,
     )
+    return audit_service.list_audit_logs(session, filter_, limit, cursor=cursor, skip=skip, count=count)
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, Request, status
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.dependencies import get_current_user
 from app.core.limiter import limiter
-from app.database import get_session
+from app.database import get_async_session, get_session
 from app.models.user import User
 from app.schemas.auth import (
     AcceptInvitationRequest,
@@ -21,14 +22,14 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
 @limiter.limit("5/minute")
-def register(request: Request, body: RegisterRequest, session: Session = Depends(get_session)):
-    return auth_service.register(session, body)
+async def register(request: Request, body: RegisterRequest, session: AsyncSession = Depends(get_async_session)):
+    return await auth_service.register_async(session, body)
 
 
 @router.post("/login", response_model=TokenResponse)
 @limiter.limit("10/minute")
-def login(request: Request, body: LoginRequest, session: Session = Depends(get_session)):
-    return auth_service.login(session, body)
+async def login(request: Request, body: LoginRequest, session: AsyncSession = Depends(get_async_session)):
+    return await auth_service.login_async(session, body)
 
 
 @router.get("/me", response_model=UserRead)
@@ -44,8 +45,10 @@ def validate_invitation(request: Request, token: str, session: Session = Depends
 
 @router.post("/accept-invitation", response_model=TokenResponse)
 @limiter.limit("5/minute")
-def accept_invitation(request: Request, body: AcceptInvitationRequest, session: Session = Depends(get_session)):
-    return auth_service.accept_invitation(session, body)
+async def accept_invitation(
+    request: Request, body: AcceptInvitationRequest, session: AsyncSession = Depends(get_async_session),
+):
+    return await auth_service.accept_invitation_async(session, body)
 
 
 @router.post("/forgot-password")
@@ -56,5 +59,7 @@ def forgot_password(request: Request, body: ForgotPasswordRequest, session: Sess
 
 @router.post("/reset-password")
 @limiter.limit("5/minute")
-def reset_password(request: Request, body: ResetPasswordRequest, session: Session = Depends(get_session)):
-    return auth_service.reset_password(session, body)
+async def reset_password(
+    request: Request, body: ResetPasswordRequest, session: AsyncSession = Depends(get_async_session),
+):
+    return await auth_service.reset_password_async(session, body)
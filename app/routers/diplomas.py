@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, status
 from sqlmodel import Session
 
 from app.core.dependencies import get_current_active_user, get_current_admin
-from app.database import get_session
+from app.database import get_read_session, get_session
 from app.models.user import User
 from app.schemas.diploma import DiplomaTemplateCreate, DiplomaTemplateRead, DiplomaTemplateUpdate
 from app.services import diploma_service
@@ -13,7 +13,7 @@ router = APIRouter(tags=["diplomas"])
 @router.get("/events/{event_id}/diplomas", response_model=list[DiplomaTemplateRead])
 def list_diploma_templates(
     event_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     _user: User = Depends(get_current_active_user),
 ):
     return diploma_service.list_diploma_templates(session, event_id)
@@ -33,7 +33,7 @@ def create_diploma_template(
 def get_diploma_template(
     event_id: int,
     template_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     _user: User = Depends(get_current_active_user),
 ):
     return diploma_service.get_diploma_template(session, event_id, template_id)
@@ -3,7 +3,7 @@ from sqlmodel import Session
 
 from app.core.dependencies import get_current_active_user, get_current_admin
 from app.core.limiter import limiter
-from app.database import get_session
+from app.database import get_read_session, get_session
 from app.models.user import User
 from app.schemas.age_category import AgeCategoryCreate, AgeCategoryRead, AgeCategoryUpdate
 from app.schemas.event import (
@@ -17,14 +17,15 @@ from app.schemas.event import (
     ManualEventCreate,
 )
 from app.schemas.group import EvaluatorRead, GroupCreate, GroupDetailRead
-from app.services import event_service
+from app.schemas.import_job import ImportJobRead
+from app.services import event_service, import_service
 
 router = APIRouter(prefix="/events", tags=["events"])
 
 
 @router.get("", response_model=list[EventRead])
 def list_events(
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     user: User = Depends(get_current_active_user),
 ):
     return event_service.list_events(session, user)
@@ -44,7 +45,7 @@ def create_event_manual(
 @router.get("/{event_id}", response_model=EventDetailRead)
 def get_event(
     event_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     user: User = Depends(get_current_active_user),
 ):
     return event_service.get_event_detail(session, event_id, user)
@@ -80,7 +81,7 @@ def preview_csv(
     return event_service.preview_csv(file)
 
 
-@router.post("/import", response_model=ImportSummary, status_code=status.HTTP_201_CREATED)
+@router.post("/import", response_model=ImportJobRead, status_code=status.HTTP_202_ACCEPTED)
 @limiter.limit("10/minute")
 def import_event(
     request: Request,
@@ -91,7 +92,15 @@ def import_event(
     session: Session = Depends(get_session),
     admin: User = Depends(get_current_admin),
 ):
-    return event_service.import_event(session, event_name, file, column_mapping, admin, bootstrap=bootstrap)
+    return import_service.submit_import(session, event_name, file, column_mapping, admin, bootstrap=bootstrap)
+
+
+@router.get("/import-jobs/{job_id}", response_model=ImportJobRead)
+def get_import_job(
+    job_id: str,
+    admin: User = Depends(get_current_admin),
+):
+    return import_service.get_job(admin, job_id)
 
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -109,7 +118,7 @@ def delete_event(
 @router.get("/{event_id}/evaluators", response_model=list[EvaluatorRead])
 def list_event_evaluators(
     event_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     _admin: User = Depends(get_current_admin),
 ):
     return event_service.list_event_evaluators(session, event_id)
@@ -157,7 +166,7 @@ def bootstrap_evaluators(
 @router.get("/{event_id}/age-categories", response_model=list[AgeCategoryRead])
 def list_age_categories(
     event_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     _user: User = Depends(get_current_active_user),
 ):
     return event_service.list_age_categories(session, event_id)
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, status
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.dependencies import get_current_active_user, get_current_admin
-from app.database import get_session
+from app.core.dependencies import get_current_active_user, get_current_active_user_async, get_current_admin
+from app.database import get_async_session, get_read_session, get_session
 from app.models.user import User
 from app.schemas.group import AssignEvaluatorRequest, EvaluatorRead, GroupUpdate, MyGroupRead
 from app.services import group_service
@@ -11,11 +12,11 @@ router = APIRouter(prefix="/groups", tags=["groups"])
 
 
 @router.get("/my-groups", response_model=list[MyGroupRead])
-def my_groups(
-    session: Session = Depends(get_session),
-    user: User = Depends(get_current_active_user),
+async def my_groups(
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(get_current_active_user_async),
 ):
-    return group_service.my_groups(session, user)
+    return await group_service.my_groups_async(session, user)
 
 
 @router.patch("/{group_id}", response_model=MyGroupRead)
@@ -61,7 +62,7 @@ def remove_evaluator(
 @router.get("/{group_id}/evaluators", response_model=list[EvaluatorRead])
 def list_group_evaluators(
     group_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     user: User = Depends(get_current_active_user),
 ):
     return group_service.list_group_evaluators(session, group_id, user)
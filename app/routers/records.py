@@ -1,19 +1,22 @@
 from fastapi import APIRouter, Depends, File, Form, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.dependencies import get_current_active_user
+from app.core.dependencies import get_current_active_user, get_current_active_user_async
 from app.core.limiter import limiter
-from app.database import get_session
+from app.database import get_async_session, get_read_session, get_session
 from app.models.user import User
 from app.schemas.activity import BulkRecordCreate, RecordCreate, RecordRead
-from app.services import record_service
+from app.schemas.ocr import OcrJobRead
+from app.services import ocr_service, record_service
 
 router = APIRouter(tags=["records"])
 
 
-@router.post("/records/process-image")
+@router.post("/records/process-image", response_model=OcrJobRead, status_code=status.HTTP_202_ACCEPTED)
 @limiter.limit("20/minute")
-async def process_image(
+def process_image(
     request: Request,
     file: UploadFile = File(...),
     activity_id: int = Form(...),
@@ -21,29 +24,49 @@ async def process_image(
     session: Session = Depends(get_session),
     user: User = Depends(get_current_active_user),
 ):
-    return await record_service.process_image(session, user, file, activity_id, group_id)
+    return ocr_service.submit_image(session, user, file, activity_id, group_id)
+
+
+@router.get("/records/ocr-jobs/{job_id}", response_model=OcrJobRead)
+def get_ocr_job(
+    job_id: str,
+    user: User = Depends(get_current_active_user),
+):
+    return ocr_service.get_job(user, job_id)
+
+
+@router.get("/records/ocr-jobs/{job_id}/events")
+def stream_ocr_job(
+    job_id: str,
+    user: User = Depends(get_current_active_user),
+):
+    return StreamingResponse(
+        ocr_service.stream_job(user, job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/records", response_model=RecordRead, status_code=status.HTTP_201_CREATED)
 @limiter.limit("60/minute")
-def submit_record(
+async def submit_record(
     request: Request,
     body: RecordCreate,
-    session: Session = Depends(get_session),
-    user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(get_current_active_user_async),
 ):
-    return record_service.submit_record(session, user, body)
+    return await record_service.submit_record_async(session, user, body)
 
 
 @router.post("/records/bulk", response_model=list[RecordRead], status_code=status.HTTP_201_CREATED)
 @limiter.limit("30/minute")
-def submit_bulk_records(
+async def submit_bulk_records(
     request: Request,
     body: BulkRecordCreate,
-    session: Session = Depends(get_session),
-    user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(get_current_active_user_async),
 ):
-    return record_service.submit_bulk_records(session, user, body)
+    return await record_service.submit_bulk_records_async(session, user, body)
 
 
 @router.delete("/records/{record_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -58,7 +81,7 @@ def delete_record(
 @router.get("/activities/{activity_id}/records", response_model=list[RecordRead])
 def get_activity_records(
     activity_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     user: User = Depends(get_current_active_user),
 ):
     return record_service.get_activity_records(session, user, activity_id)
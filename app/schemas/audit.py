@@ -16,7 +16,9 @@ class AuditLogRead(BaseModel):
 
 
 class PaginatedAuditLogs(BaseModel):
-    total: int
+    total: int | None                 # None when count=none
+    total_estimated: bool = False     # True when taken from planner statistics
     skip: int
     limit: int
+    next_cursor: str | None = None    # pass as ?cursor= for the next page; None on the last page
     items: list[AuditLogRead]
@@ -0,0 +1,30 @@
+import enum
+
+from pydantic import BaseModel
+
+from app.schemas.event import ImportSummary
+
+
+class ImportJobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class ImportRowError(BaseModel):
+    line: int
+    message: str
+
+
+class ImportJobRead(BaseModel):
+    job_id: str
+    status: ImportJobStatus
+    event_name: str
+    rows_parsed: int = 0
+    rows_inserted: int = 0
+    error_count: int = 0
+    errors: list[ImportRowError] = []
+    result: ImportSummary | None = None
+    error: str | None = None
+    error_status: int | None = None
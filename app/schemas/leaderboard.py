@@ -31,3 +31,20 @@ class LeaderboardResponse(BaseModel):
     event_name: str
     has_age_categories: bool
     activities: list[ActivityLeaderboard]
+
+
+class LeaderboardChanges(BaseModel):
+    """Answer to ``GET /events/{id}/leaderboard?since=<version>``.
+
+    With ``full`` set, ``leaderboard`` is a complete snapshot that replaces the
+    client's copy. Otherwise ``activities`` lists only the activities that
+    changed since the client's version, each replacing the client's copy of
+    that activity; it is empty when nothing changed. Pass ``version`` as
+    ``since`` on the next request.
+    """
+
+    event_id: int
+    version: int
+    full: bool
+    leaderboard: LeaderboardResponse | None = None
+    activities: list[ActivityLeaderboard] = []
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class MetricsRead(BaseModel):
+    worker_pid: int
+    counters: dict[str, int]
+    gauges: dict[str, int] = {}
@@ -0,0 +1,27 @@
+import enum
+
+from pydantic import BaseModel
+
+
+class OcrJobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class OcrMatch(BaseModel):
+    participant_id: int
+    value: str
+    name: str
+    confidence: float
+
+
+class OcrJobRead(BaseModel):
+    job_id: str
+    status: OcrJobStatus
+    activity_id: int
+    group_id: int
+    result: list[OcrMatch] | None = None
+    error: str | None = None
+    error_status: int | None = None
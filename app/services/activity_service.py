@@ -23,6 +23,7 @@ def create_activity(session: Session, body: ActivityCreate) -> ActivityRead:
     session.add(activity)
     session.commit()
     session.refresh(activity)
+    invalidate_leaderboard_cache(activity.event_id)
     return ActivityRead.model_validate(activity)
 
 
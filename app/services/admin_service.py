@@ -10,8 +10,10 @@ from sqlmodel import Session, delete, select
 
 from app.config import settings
 from app.core.audit import log_action
+from app.core.authorization import invalidate_scope
 from app.core.email import send_invitation_email
 from app.core.exceptions import ConflictException, ForbiddenException, NotFoundException, ValidationException
+from app.core.user_cache import invalidate_user
 from app.models.audit_log import AuditLog
 from app.models.event import Event
 from app.models.event_evaluator import EventEvaluator
@@ -58,6 +60,7 @@ def update_user(session: Session, user_id: int, body: UserUpdate, admin: User) -
     session.add(user)
     session.commit()
     session.refresh(user)
+    invalidate_user(user.email)
     return UserRead.model_validate(user)
 
 
@@ -86,8 +89,11 @@ def delete_user(session: Session, user_id: int, admin: User) -> None:
         session, admin.id, "DELETE_USER",
         resource_type="user", resource_id=user.id, detail=user.email,
     )
+    email = user.email
     session.delete(user)
     session.commit()
+    invalidate_user(email)
+    invalidate_scope(user_id)
 
 
 def create_invitation(session: Session, body: CreateInvitationRequest, admin: User) -> InvitationRead:
@@ -0,0 +1,274 @@
+"""Audit-log retention — monthly partitions, archival and pruning.
+
+On PostgreSQL ``auditlog`` is range-partitioned by month (migration 012).
+Maintenance creates the partitions for the next AUDIT_PARTITIONS_AHEAD months
+and, with AUDIT_RETENTION_DAYS set, archives every partition lying wholly
+before the retention cutoff to ``AUDIT_ARCHIVE_DIR/auditlog_YYYY_MM.jsonl.gz``
+before detaching and dropping it, so the live table and its VACUUMs stay
+small. Without partitions (SQLite, or before the migration) the same whole
+months are archived and deleted row-wise; so are expired rows that landed in
+``auditlog_default``. A new partition takes over the rows ``auditlog_default``
+already holds for its month.
+
+An archive only takes its final name once it is completely written and
+synced; a month is dropped only after that. Archives are never overwritten:
+when the name is taken (a second row-wise run for the month, or a rerun after
+a crash between archiving and dropping) the file gets a numeric suffix, so at
+worst rows are archived twice, never lost.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from pathlib import Path
+
+from sqlalchemy import column, delete, func, select, table, text
+
+from app.config import settings
+from app.core import metrics
+from app.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+_ADVISORY_LOCK_ID = 0x6175646974  # one maintenance run across all workers
+_PARTITION_NAME = re.compile(r"^auditlog_(\d{4})_(\d{2})$")
+_COLUMNS = [c.name for c in AuditLog.__table__.columns]
+_DEFAULT_PARTITION = table("auditlog_default", *(column(c.name, c.type) for c in AuditLog.__table__.columns))
+_YIELD_PER = 1000
+
+_stop = threading.Event()
+_worker: threading.Thread | None = None
+
+
+@dataclass
+class MaintenanceReport:
+    partitions_created: list[str] = field(default_factory=list)
+    archived: dict[str, int] = field(default_factory=dict)  # archive file name -> rows
+
+
+def _month_start(dt: datetime) -> datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    years, index = divmod(month.month - 1 + months, 12)
+    return month.replace(year=month.year + years, month=index + 1)
+
+
+def _partition_name(month: datetime) -> str:
+    return f"auditlog_{month:%Y_%m}"
+
+
+def _archive_path(month: datetime) -> Path:
+    return Path(settings.AUDIT_ARCHIVE_DIR) / f"{_partition_name(month)}.jsonl.gz"
+
+
+def _claim_archive_name(tmp: Path, path: Path) -> Path:
+    """Give ``tmp`` the first free name of ``path``, ``path.1``, ...; never replaces a file."""
+    stem = path.name.removesuffix(".jsonl.gz")
+    for i in count():
+        target = path if i == 0 else path.with_name(f"{stem}.{i}.jsonl.gz")
+        try:
+            os.link(tmp, target)
+        except FileExistsError:
+            continue
+        tmp.unlink()
+        return target
+
+
+def _write_archive(path: Path, rows: Iterable) -> tuple[Path, int]:
+    """Write rows as gzip JSONL; returns the file written and the row count.
+
+    Nothing is kept for zero rows. If ``path`` exists the archive is written
+    next to it under a suffixed name.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    count = 0
+    with open(tmp, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for row in rows:
+                data = dict(row._mapping)
+                data["created_at"] = data["created_at"].isoformat()
+                gz.write((json.dumps(data) + "\n").encode())
+                count += 1
+        raw.flush()
+        os.fsync(raw.fileno())
+    if count:
+        path = _claim_archive_name(tmp, path)
+    else:
+        tmp.unlink()
+    return path, count
+
+
+def _is_partitioned(conn) -> bool:
+    return conn.execute(text("SELECT relkind FROM pg_class WHERE oid = 'auditlog'::regclass")).scalar() == "p"
+
+
+def _ensure_partitions(bind, now: datetime, report: MaintenanceReport) -> None:
+    """Create the partitions of this month and the next AUDIT_PARTITIONS_AHEAD.
+
+    Rows ``auditlog_default`` already holds for such a month are moved into the
+    new partition in the same transaction; PostgreSQL refuses to attach it
+    otherwise. A partition that still cannot be created fails the run.
+    """
+    month = _month_start(now)
+    for offset in range(settings.AUDIT_PARTITIONS_AHEAD + 1):
+        start = _add_months(month, offset)
+        end = _add_months(start, 1)
+        name = _partition_name(start)
+        bounds = f"FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        with bind.begin() as conn:
+            if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+                continue
+            in_month = (_DEFAULT_PARTITION.c.created_at >= start, _DEFAULT_PARTITION.c.created_at < end)
+            stranded = conn.execute(select(func.count()).select_from(_DEFAULT_PARTITION).where(*in_month)).scalar()
+            if not stranded:
+                conn.execute(text(f"CREATE TABLE {name} PARTITION OF auditlog FOR VALUES {bounds}"))
+            else:
+                conn.execute(text(f"CREATE TABLE {name} (LIKE auditlog INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+                conn.execute(text(
+                    f"WITH moved AS (DELETE FROM auditlog_default"
+                    f" WHERE created_at >= :start AND created_at < :end RETURNING *)"
+                    f" INSERT INTO {name} SELECT * FROM moved"
+                ), {"start": start, "end": end})
+                conn.execute(text(f"ALTER TABLE auditlog ATTACH PARTITION {name} FOR VALUES {bounds}"))
+                logger.info("Moved %s audit rows from auditlog_default into %s", stranded, name)
+                metrics.increment("audit.default_rows_moved", stranded)
+        report.partitions_created.append(name)
+
+
+def _expired_partitions(bind, cutoff: datetime) -> list[datetime]:
+    with bind.connect() as conn:
+        names = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid"
+            " WHERE i.inhparent = 'auditlog'::regclass"
+        )).scalars().all()
+    months = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            month = datetime(int(match[1]), int(match[2]), 1)
+            if _add_months(month, 1) <= cutoff:
+                months.append(month)
+    return sorted(months)
+
+
+def _archive_partition(bind, month: datetime, report: MaintenanceReport) -> None:
+    name = _partition_name(month)
+    partition = table(name, *(column(c) for c in _COLUMNS))
+    path = _archive_path(month)
+    with bind.connect() as conn:
+        rows = conn.execution_options(yield_per=_YIELD_PER).execute(
+            select(partition).order_by(partition.c.created_at, partition.c.id)
+        )
+        path, count = _write_archive(path, rows)
+    with bind.begin() as conn:
+        conn.execute(text(f"ALTER TABLE auditlog DETACH PARTITION {name}"))
+        conn.execute(text(f"DROP TABLE {name}"))
+    metrics.increment("audit.partitions_dropped")
+    metrics.increment("audit.archived_rows", count)
+    if count:
+        report.archived[path.name] = count
+
+
+def _archive_rows(bind, cutoff: datetime, report: MaintenanceReport, source=None) -> None:
+    """Archive and delete whole months before ``cutoff`` row by row.
+
+    ``source`` is the table to read and delete from: the unpartitioned
+    ``auditlog`` by default, or ``auditlog_default`` beside the partitions.
+    """
+    source = AuditLog.__table__ if source is None else source
+    end = _month_start(cutoff)
+    with bind.connect() as conn:
+        oldest = conn.execute(select(func.min(source.c.created_at)).where(source.c.created_at < end)).scalar()
+    if oldest is None:
+        return
+    month = _month_start(oldest)
+    while month < end:
+        next_month = _add_months(month, 1)
+        in_month = (source.c.created_at >= month, source.c.created_at < next_month)
+        with bind.connect() as conn:
+            rows = conn.execution_options(yield_per=_YIELD_PER).execute(
+                select(source).where(*in_month).order_by(source.c.created_at, source.c.id)
+            )
+            path, count = _write_archive(_archive_path(month), rows)
+        if count:
+            with bind.begin() as conn:
+                conn.execute(delete(source).where(*in_month))
+            metrics.increment("audit.archived_rows", count)
+            report.archived[path.name] = count
+        month = next_month
+
+
+def run_maintenance(bind=None, now: datetime | None = None) -> MaintenanceReport:
+    """Create upcoming partitions, then archive and drop expired months.
+
+    ``now`` is naive UTC, like the ``created_at`` column. On PostgreSQL a
+    session advisory lock keeps concurrent workers from running it twice.
+    """
+    if bind is None:
+        from app.database import engine as bind
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    cutoff = now - timedelta(days=settings.AUDIT_RETENTION_DAYS) if settings.AUDIT_RETENTION_DAYS > 0 else None
+    report = MaintenanceReport()
+
+    if bind.dialect.name == "postgresql":
+        with bind.connect() as lock_conn:
+            lock_conn = lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+            if not lock_conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": _ADVISORY_LOCK_ID}).scalar():
+                return report
+            try:
+                if _is_partitioned(lock_conn):
+                    _ensure_partitions(bind, now, report)
+                    if cutoff is not None:
+                        for month in _expired_partitions(bind, cutoff):
+                            _archive_partition(bind, month, report)
+                        _archive_rows(bind, cutoff, report, source=_DEFAULT_PARTITION)
+                elif cutoff is not None:
+                    _archive_rows(bind, cutoff, report)
+            finally:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _ADVISORY_LOCK_ID})
+    elif cutoff is not None:
+        _archive_rows(bind, cutoff, report)
+
+    if report.archived or report.partitions_created:
+        logger.info(
+            "Audit maintenance: created partitions %s, archived %s",
+            report.partitions_created, report.archived,
+        )
+    return report
+
+
+def _run_periodically() -> None:
+    while not _stop.is_set():
+        try:
+            run_maintenance()
+        except Exception:
+            logger.exception("Audit maintenance failed")
+        _stop.wait(settings.AUDIT_MAINTENANCE_INTERVAL_HOURS * 3600)
+
+
+def start() -> None:
+    """Run maintenance now and every AUDIT_MAINTENANCE_INTERVAL_HOURS in a background thread."""
+    global _worker
+    if settings.AUDIT_MAINTENANCE_INTERVAL_HOURS <= 0 or _worker is not None:
+        return
+    _stop.clear()
+    _worker = threading.Thread(target=_run_periodically, name="audit-maintenance", daemon=True)
+    _worker.start()
+
+
+def shutdown() -> None:
+    global _worker
+    if _worker is not None:
+        _stop.set()
+        _worker.join(timeout=5)
+        _worker = None
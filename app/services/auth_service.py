@@ -5,12 +5,14 @@ import secrets
 from datetime import datetime, timedelta, timezone
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
 from app.core.audit import log_action
 from app.core.email import send_password_reset_email
 from app.core.exceptions import ConflictException, ForbiddenException, NotFoundException, UnauthorizedException, ValidationException
-from app.core.security import create_access_token, hash_password, verify_password
+from app.core.security import create_access_token, hash_password_async, verify_and_update_password_async
+from app.core.user_cache import invalidate_user_async
 from app.models.invitation_token import InvitationToken
 from app.models.password_reset_token import PasswordResetToken
 from app.models.user import User, UserRole
@@ -43,33 +45,45 @@ def _validate_token(session: Session, token_str: str, model_class):
     return row
 
 
-def register(session: Session, body: RegisterRequest) -> UserRead:
-    existing = session.exec(select(User).where(User.email == body.email)).first()
+# Registration, login, invitations and password resets hash passwords; they
+# run on the asyncio request path so a request waiting for the bcrypt pool
+# holds no threadpool slot. Sync-only helpers go through ``run_sync``.
+
+
+async def register_async(session: AsyncSession, body: RegisterRequest) -> UserRead:
+    existing = (await session.exec(select(User).where(User.email == body.email))).first()
     if existing:
         raise ConflictException("Email already registered")
 
     user = User(
-        email=body.email, password_hash=hash_password(body.password),
+        email=body.email, password_hash=await hash_password_async(body.password),
         full_name=body.full_name, role=UserRole.ADMIN, is_active=False,
     )
     session.add(user)
-    session.flush()
-    log_action(session, user.id, "REGISTER", resource_type="user", resource_id=user.id)
-    session.commit()
-    session.refresh(user)
+    await session.flush()
+    await session.run_sync(log_action, user.id, "REGISTER", resource_type="user", resource_id=user.id)
+    await session.commit()
+    await session.refresh(user)
     return UserRead.model_validate(user)
 
 
-def login(session: Session, body: LoginRequest) -> TokenResponse:
-    user = session.exec(select(User).where(User.email == body.email)).first()
-    if not user or not verify_password(body.password, user.password_hash):
-        log_action(session, None, "LOGIN_FAILED", detail=body.email)
-        session.commit()
+async def login_async(session: AsyncSession, body: LoginRequest) -> TokenResponse:
+    user = (await session.exec(select(User).where(User.email == body.email))).first()
+    valid, new_hash = (
+        await verify_and_update_password_async(body.password, user.password_hash) if user else (False, None)
+    )
+    if not valid:
+        await session.run_sync(log_action, None, "LOGIN_FAILED", detail=body.email)
+        await session.commit()
         raise UnauthorizedException("Invalid email or password")
     if not user.is_active:
         raise ForbiddenException("Account not yet approved")
-    log_action(session, user.id, "LOGIN", resource_type="user", resource_id=user.id)
-    session.commit()
+    if new_hash:
+        user.password_hash = new_hash  # BCRYPT_ROUNDS changed since this hash was made
+        session.add(user)
+    await session.run_sync(log_action, user.id, "LOGIN", resource_type="user", resource_id=user.id)
+    await session.commit()
+    await invalidate_user_async(user.email)  # a fresh login always starts from the current user row
     token = create_access_token(subject=user.email)
     return TokenResponse(access_token=token)
 
@@ -84,24 +98,24 @@ def validate_invitation(session: Session, token: str) -> dict:
     return {"email": inv.email, "role": inv.role}
 
 
-def accept_invitation(session: Session, body: AcceptInvitationRequest) -> TokenResponse:
-    inv = _validate_token(session, body.token, InvitationToken)
+async def accept_invitation_async(session: AsyncSession, body: AcceptInvitationRequest) -> TokenResponse:
+    inv = await session.run_sync(_validate_token, body.token, InvitationToken)
 
-    existing = session.exec(select(User).where(User.email == inv.email)).first()
+    existing = (await session.exec(select(User).where(User.email == inv.email))).first()
     if existing:
         raise ConflictException("Email already registered")
 
     user = User(
-        email=inv.email, password_hash=hash_password(body.password),
+        email=inv.email, password_hash=await hash_password_async(body.password),
         full_name=body.full_name, role=UserRole(inv.role), is_active=True,
     )
     session.add(user)
-    session.flush()
+    await session.flush()
 
     inv.used = True
     session.add(inv)
-    log_action(session, user.id, "ACCEPT_INVITATION", resource_type="user", resource_id=user.id)
-    session.commit()
+    await session.run_sync(log_action, user.id, "ACCEPT_INVITATION", resource_type="user", resource_id=user.id)
+    await session.commit()
 
     token = create_access_token(subject=user.email)
     return TokenResponse(access_token=token)
@@ -138,18 +152,19 @@ def forgot_password(session: Session, body: ForgotPasswordRequest) -> dict:
     return {"detail": "If that email exists, a reset link has been sent."}
 
 
-def reset_password(session: Session, body: ResetPasswordRequest) -> dict:
-    reset_token = _validate_token(session, body.token, PasswordResetToken)
+async def reset_password_async(session: AsyncSession, body: ResetPasswordRequest) -> dict:
+    reset_token = await session.run_sync(_validate_token, body.token, PasswordResetToken)
 
-    user = session.get(User, reset_token.user_id)
+    user = await session.get(User, reset_token.user_id)
     if not user:
         raise ValidationException("User not found")
 
-    user.password_hash = hash_password(body.new_password)
+    user.password_hash = await hash_password_async(body.new_password)
     reset_token.used = True
     session.add(user)
     session.add(reset_token)
-    log_action(session, user.id, "RESET_PASSWORD", resource_type="user", resource_id=user.id)
-    session.commit()
+    await session.run_sync(log_action, user.id, "RESET_PASSWORD", resource_type="user", resource_id=user.id)
+    await session.commit()
+    await invalidate_user_async(user.email)
 
     return {"detail": "Password has been reset successfully."}
@@ -1,14 +1,30 @@
 """Shared service helpers."""
 
 import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
 
-from sqlmodel import Session, SQLModel
+from sqlalchemy import case, null, update
+from sqlmodel import Session, SQLModel, select
 
 from app.core.exceptions import NotFoundException
-from app.core.redis_client import redis_client
+from app.core.redis_client import async_redis_client, redis_client
+from app.models.age_category import AgeCategory
+from app.models.group import Group
+from app.models.participant import Participant
 
 logger = logging.getLogger(__name__)
 
+# Per-event leaderboard revisions when Redis is not configured (dev / tests).
+_local_revisions: dict[int, dict[str, int]] = {}
+_local_revisions_lock = threading.Lock()
+
+# In-process subscribers to leaderboard changes, called with (event_id, activity_id).
+_change_listeners: list[Callable[[int, int | None], None]] = []
+
+LEADERBOARD_CHANNEL_PATTERN = "leaderboard:*:changes"
+
 
 def get_or_404(session: Session, model: type[SQLModel], entity_id: int, label: str | None = None) -> SQLModel:
     """Fetch an entity by primary key or raise NotFoundException."""
@@ -18,12 +34,234 @@ def get_or_404(session: Session, model: type[SQLModel], entity_id: int, label: s
     return entity
 
 
+@dataclass(frozen=True)
+class LeaderboardRevisions:
+    """Revision counters of an event's leaderboard.
+
+    ``event`` moves on structural changes (participants, activities, groups,
+    age categories); ``activities`` holds one counter per activity that
+    record writes move.
+
+    ``version`` is the event's change version: it moves on every bump of
+    either kind, so it orders all of the event's changes. ``structure_version``
+    and ``activity_versions`` record the version of the last structural change
+    and of each activity's last change, which is what delta reads compare a
+    client's version against.
+    """
+
+    event: int = 0
+    activities: dict[int, int] = field(default_factory=dict)
+    version: int = 0
+    structure_version: int = 0
+    activity_versions: dict[int, int] = field(default_factory=dict)
+
+    def activity(self, activity_id: int) -> int:
+        return self.activities.get(activity_id, 0)
+
+
+def _revision_key(event_id: int) -> str:
+    return f"leaderboard:{event_id}:revs"
+
+
+def _revision_field(activity_id: int | None) -> str:
+    return "event" if activity_id is None else f"a{activity_id}"
+
+
+# Change versions live in the revisions hash: "version" plus "v:<revision field>".
+_VERSION_FIELD = "version"
+_CHANGED_AT_PREFIX = "v:"
+
+# Bump a revision and the change version in one step, so no reader sees one without the other.
+_BUMP_SCRIPT = """
+local version = redis.call('HINCRBY', KEYS[1], ARGV[2], 1)
+redis.call('HSET', KEYS[1], ARGV[3] .. ARGV[1], version)
+return redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+"""
+_bump_script = redis_client.register_script(_BUMP_SCRIPT) if redis_client else None
+_bump_script_async = async_redis_client.register_script(_BUMP_SCRIPT) if async_redis_client else None
+
+
+def _parse_revisions(fields: dict[str, str | int]) -> LeaderboardRevisions:
+    activities = {int(k[1:]): int(v) for k, v in fields.items() if k.startswith("a")}
+    changed_at = {
+        k.removeprefix(_CHANGED_AT_PREFIX): int(v) for k, v in fields.items() if k.startswith(_CHANGED_AT_PREFIX)
+    }
+    return LeaderboardRevisions(
+        event=int(fields.get("event", 0)),
+        activities=activities,
+        version=int(fields.get(_VERSION_FIELD, 0)),
+        structure_version=changed_at.get("event", 0),
+        activity_versions={int(k[1:]): v for k, v in changed_at.items() if k.startswith("a")},
+    )
+
+
+def _bump_local_revision(event_id: int, revision_field: str) -> int:
+    with _local_revisions_lock:
+        fields = _local_revisions.setdefault(event_id, {})
+        fields[_VERSION_FIELD] = fields.get(_VERSION_FIELD, 0) + 1
+        fields[_CHANGED_AT_PREFIX + revision_field] = fields[_VERSION_FIELD]
+        fields[revision_field] = fields.get(revision_field, 0) + 1
+        return fields[revision_field]
+
+
+def get_leaderboard_revisions(event_id: int) -> LeaderboardRevisions | None:
+    """Current leaderboard revisions of an event, or None if they cannot be read.
+
+    Revisions are shared by all API replicas through a Redis hash; anything
+    cached under older revisions is stale.
+    """
+    if not redis_client:
+        with _local_revisions_lock:
+            return _parse_revisions(_local_revisions.get(event_id, {}))
+    try:
+        return _parse_revisions(redis_client.hgetall(_revision_key(event_id)))
+    except Exception:
+        logger.warning("Failed to read leaderboard revisions for event %s", event_id)
+        return None
+
+
+def bump_leaderboard_revision(event_id: int, activity_id: int | None = None) -> int | None:
+    """Advance the event-wide (or one activity's) revision and return the new value.
+
+    The event's change version moves with it. Every bump is announced to live
+    leaderboard subscribers; see ``announce_leaderboard_change``.
+    """
+    revision_field = _revision_field(activity_id)
+    if not redis_client:
+        revision = _bump_local_revision(event_id, revision_field)
+        announce_leaderboard_change(event_id, activity_id)
+        return revision
+    try:
+        revision = int(_bump_script(
+            keys=[_revision_key(event_id)], args=[revision_field, _VERSION_FIELD, _CHANGED_AT_PREFIX],
+        ))
+    except Exception:
+        logger.warning("Failed to bump leaderboard revision for event %s", event_id)
+        return None
+    announce_leaderboard_change(event_id, activity_id)
+    return revision
+
+
+async def get_leaderboard_revisions_async(event_id: int) -> LeaderboardRevisions | None:
+    """``get_leaderboard_revisions`` over the asyncio Redis client."""
+    if not async_redis_client:
+        with _local_revisions_lock:
+            return _parse_revisions(_local_revisions.get(event_id, {}))
+    try:
+        return _parse_revisions(await async_redis_client.hgetall(_revision_key(event_id)))
+    except Exception:
+        logger.warning("Failed to read leaderboard revisions for event %s", event_id)
+        return None
+
+
+async def bump_leaderboard_revision_async(event_id: int, activity_id: int | None = None) -> int | None:
+    """``bump_leaderboard_revision`` over the asyncio Redis client."""
+    revision_field = _revision_field(activity_id)
+    if not async_redis_client:
+        revision = _bump_local_revision(event_id, revision_field)
+        announce_leaderboard_change(event_id, activity_id)
+        return revision
+    try:
+        revision = int(await _bump_script_async(
+            keys=[_revision_key(event_id)], args=[revision_field, _VERSION_FIELD, _CHANGED_AT_PREFIX],
+        ))
+    except Exception:
+        logger.warning("Failed to bump leaderboard revision for event %s", event_id)
+        return None
+    await announce_leaderboard_change_async(event_id, activity_id)
+    return revision
+
+
+# ── Change notifications ─────────────────────────────────────────────────────
+#
+# Each revision bump is published on the event's Redis channel so that every
+# replica can push it to its live scoreboards. The payload is the revision
+# field that moved ("event" or "a<activity_id>"). Without Redis, or when the
+# publish fails, only this process's listeners hear about it.
+
+
+def leaderboard_channel(event_id: int) -> str:
+    return f"leaderboard:{event_id}:changes"
+
+
+def parse_leaderboard_change(channel: str, payload: str) -> tuple[int, int | None]:
+    """``(event_id, activity_id)`` of a message received on a leaderboard channel."""
+    event_id = int(channel.split(":")[1])
+    return event_id, int(payload[1:]) if payload.startswith("a") else None
+
+
+def add_leaderboard_listener(listener: Callable[[int, int | None], None]) -> None:
+    """Call ``listener(event_id, activity_id)`` on changes made by this process when Redis is unavailable."""
+    _change_listeners.append(listener)
+
+
+def _notify_local_listeners(event_id: int, activity_id: int | None) -> None:
+    for listener in list(_change_listeners):
+        try:
+            listener(event_id, activity_id)
+        except Exception:
+            logger.warning("Leaderboard change listener failed for event %s", event_id, exc_info=True)
+
+
+def announce_leaderboard_change(event_id: int, activity_id: int | None = None) -> None:
+    if redis_client:
+        try:
+            redis_client.publish(leaderboard_channel(event_id), _revision_field(activity_id))
+            return
+        except Exception:
+            logger.warning("Failed to publish leaderboard change for event %s", event_id)
+    _notify_local_listeners(event_id, activity_id)
+
+
+async def announce_leaderboard_change_async(event_id: int, activity_id: int | None = None) -> None:
+    """``announce_leaderboard_change`` over the asyncio Redis client."""
+    if async_redis_client:
+        try:
+            await async_redis_client.publish(leaderboard_channel(event_id), _revision_field(activity_id))
+            return
+        except Exception:
+            logger.warning("Failed to publish leaderboard change for event %s", event_id)
+    _notify_local_listeners(event_id, activity_id)
+
+
 def invalidate_leaderboard_cache(event_id: int | None) -> None:
     """Drop the cached leaderboard for an event after a structural change."""
     if event_id is None:
         return
-    try:
-        if redis_client:
-            redis_client.delete(f"leaderboard:{event_id}")
-    except Exception:
-        logger.warning("Failed to invalidate leaderboard cache for event %s", event_id)
+    bump_leaderboard_revision(event_id)
+
+
+# ── Age categories ───────────────────────────────────────────────────────────
+#
+# ``Participant.age_category_id`` holds the first category (by id) whose age
+# range contains the participant's age, or NULL. It is resolved when a
+# participant's age is written and for the whole event whenever its
+# categories change, so leaderboards and exports read it instead of
+# classifying ages themselves.
+
+
+def _event_categories(session: Session, event_id: int) -> list[AgeCategory]:
+    return list(session.exec(
+        select(AgeCategory).where(AgeCategory.event_id == event_id).order_by(AgeCategory.id)
+    ).all())
+
+
+def resolve_age_category(session: Session, event_id: int, age: int | None) -> int | None:
+    """Id of the age category ``age`` falls into within an event, if any."""
+    if age is None:
+        return None
+    return next((c.id for c in _event_categories(session, event_id) if c.min_age <= age <= c.max_age), None)
+
+
+def reassign_age_categories(session: Session, event_id: int) -> None:
+    """Recompute ``age_category_id`` of every participant of an event in one UPDATE; caller commits."""
+    categories = _event_categories(session, event_id)
+    value = case(
+        *((Participant.age.between(c.min_age, c.max_age), c.id) for c in categories), else_=null(),
+    ) if categories else null()
+    session.execute(
+        update(Participant)
+        .where(Participant.group_id.in_(select(Group.id).where(Group.event_id == event_id)))
+        .values(age_category_id=value)
+        .execution_options(synchronize_session=False)
+    )
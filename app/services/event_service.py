@@ -1,13 +1,19 @@
 """Event domain service — business logic extracted from routers/events.py."""
 
+import codecs
 import csv
-import io
 import json as json_module
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
 
+from sqlalchemy import insert
 from sqlalchemy.orm import selectinload
 from sqlmodel import Session, func, select
 
+from app.config import settings
 from app.core.audit import log_action
+from app.core.authorization import get_scope, invalidate_scope
 from app.core.exceptions import (
     ConflictException,
     ForbiddenException,
@@ -39,11 +45,16 @@ from app.schemas.event import (
 )
 from app.schemas.group import EvaluatorRead, GroupCreate, GroupDetailRead
 from app.schemas.participant import ParticipantRead
-from app.services.common import get_or_404
+from app.services.common import get_or_404, invalidate_leaderboard_cache, reassign_age_categories
 
 REQUIRED_COLUMNS = {"display_name", "group_name"}
 KNOWN_COLUMNS = {"display_name", "group_name", "group_identifier", "external_id", "gender", "age"}
 
+_IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_IMPORT_ERRORS = 100
+
+RowParser = Callable[[dict[str | None, str], int], tuple[dict, dict | None]]
+
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
@@ -64,14 +75,30 @@ def _create_default_diploma(session: Session, event_id: int) -> None:
     session.add(default_tpl)
 
 
-def _read_csv_content(file) -> str:
+def validate_csv_upload(file) -> None:
     if not file.filename or not file.filename.lower().endswith(".csv"):
         raise ValidationException("File must be a .csv file")
+    if file.size is not None and file.size > settings.IMPORT_MAX_BYTES:
+        raise ValidationException(f"CSV file exceeds the {settings.IMPORT_MAX_BYTES // (1024 * 1024)} MB limit")
+
+
+def validate_event_name(event_name: str) -> str:
+    event_name = event_name.strip()
+    if not event_name or len(event_name) > 255:
+        raise ValidationException("Event name must be between 1 and 255 characters")
+    return event_name
+
+
+def _open_csv(file) -> Iterator[str]:
+    """Lines of the uploaded CSV, decoded incrementally from the spooled upload."""
+    validate_csv_upload(file)
+    file.file.seek(0)
+    return decoded_lines(file.file)
+
+
+def decoded_lines(raw: Iterable[bytes]) -> Iterator[str]:
     try:
-        raw = file.file.read()
-        if len(raw) > 5 * 1024 * 1024:
-            raise ValidationException("CSV file exceeds the 5 MB limit")
-        return raw.decode("utf-8-sig")
+        yield from codecs.iterdecode(raw, "utf-8-sig")
     except UnicodeDecodeError:
         raise ValidationException("File must be UTF-8 encoded")
 
@@ -98,8 +125,7 @@ def list_events(session: Session, user: User) -> list[EventRead]:
     stmt = select(Event, group_count_sq, part_count_sq)
     if user.role not in (UserRole.ADMIN, UserRole.SUPER_ADMIN):
         # Evaluators: only events where they're in the pool
-        pool_event_ids = select(EventEvaluator.event_id).where(EventEvaluator.user_id == user.id)
-        stmt = stmt.where(Event.id.in_(pool_event_ids))
+        stmt = stmt.where(Event.id.in_(sorted(get_scope(session, user).event_ids)))
     rows = session.exec(stmt).all()
     return [
         EventRead(
@@ -158,8 +184,7 @@ def get_event_detail(session: Session, event_id: int, user: User) -> EventDetail
     is_admin = user.role in (UserRole.ADMIN, UserRole.SUPER_ADMIN)
 
     if not is_admin:
-        pool_link = session.get(EventEvaluator, (event_id, user.id))
-        if not pool_link:
+        if event_id not in get_scope(session, user).event_ids:
             raise ForbiddenException("You are not assigned to this event")
 
     pool_user_ids = [ee.user_id for ee in event.event_evaluators]
@@ -199,6 +224,7 @@ def update_event(session: Session, event_id: int, body: EventUpdate, admin: User
         detail=f"name={event.name}, status={event.status.value}",
     )
     session.commit()
+    invalidate_leaderboard_cache(event_id)
     session.refresh(event)
 
     group_count = session.exec(select(func.count(Group.id)).where(Group.event_id == event_id)).one()
@@ -227,86 +253,170 @@ def delete_event(session: Session, event_id: int, admin: User) -> None:
         session, admin.id, "DELETE_EVENT",
         resource_type="event", resource_id=event_id, detail=event.name,
     )
+    evaluator_ids = session.exec(select(EventEvaluator.user_id).where(EventEvaluator.event_id == event_id)).all()
     session.delete(event)
     session.commit()
+    invalidate_leaderboard_cache(event_id)
+    invalidate_scope(*evaluator_ids)
 
 
 # ── CSV Preview / Import ─────────────────────────────────────────────────────
 
 
 def preview_csv(file) -> CsvPreviewResponse:
-    content = _read_csv_content(file)
-    reader = csv.reader(io.StringIO(content))
-    all_rows = list(reader)
-    if not all_rows:
+    reader = csv.reader(_open_csv(file))
+    first = next(reader, None)
+    if first is None:
         raise ValidationException("CSV file is empty or has no headers")
-    headers = [h.strip() for h in all_rows[0]]
-    data_rows = all_rows[1:]
-    return CsvPreviewResponse(headers=headers, sample_rows=data_rows[:5], total_rows=len(data_rows))
+    headers = [h.strip() for h in first]
+    sample_rows = list(islice(reader, 5))
+    total_rows = len(sample_rows) + sum(1 for _ in reader)
+    return CsvPreviewResponse(headers=headers, sample_rows=sample_rows, total_rows=total_rows)
 
 
-def import_event(
-    session: Session, event_name: str, file, column_mapping: str | None, admin: User,
-    bootstrap: bool = False,
-) -> ImportSummary:
-    event_name = event_name.strip()
-    if not event_name or len(event_name) > 255:
-        raise ValidationException("Event name must be between 1 and 255 characters")
+class _BulkImporter:
+    """Writes parsed CSV rows of one event as groups and participants in multi-row INSERTs.
+
+    Rows are buffered up to ``_IMPORT_BATCH_SIZE``; only group name -> id is
+    kept across batches, so memory stays flat however long the file is.
+    """
 
-    content = _read_csv_content(file)
-    reader = csv.DictReader(io.StringIO(content))
+    def __init__(self, session: Session, event_id: int, progress: "ImportProgress"):
+        self.session = session
+        self.event_id = event_id
+        self.progress = progress
+        self.group_ids: dict[str, int] = {}
+        self.participants_created = 0
+        self._pending: list[tuple[dict, dict | None]] = []
+
+    def add(self, row: dict, extra: dict | None) -> None:
+        self._pending.append((row, extra))
+        if len(self._pending) >= _IMPORT_BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        new_groups: dict[str, str] = {}
+        for row, _extra in self._pending:
+            name = row["group_name"]
+            if name not in self.group_ids and name not in new_groups:
+                new_groups[name] = row.get("group_identifier", "")
+        if new_groups:
+            created = self.session.execute(
+                insert(Group).returning(Group.id, Group.name, sort_by_parameter_order=True),
+                [{"name": name, "identifier": identifier, "event_id": self.event_id}
+                 for name, identifier in new_groups.items()],
+            )
+            self.group_ids.update({g.name: g.id for g in created})
+
+        participants = []
+        for row, extra in self._pending:
+            age_raw = row.get("age", "")
+            participants.append({
+                "display_name": row["display_name"], "external_id": row.get("external_id") or None,
+                "metadata_json": extra if extra else None, "gender": row.get("gender") or None,
+                "age": int(age_raw) if age_raw and age_raw.isdigit() else None,
+                "group_id": self.group_ids[row["group_name"]],
+            })
+        self.session.execute(insert(Participant), participants)
+        self.participants_created += len(participants)
+        self.progress.rows_inserted = self.participants_created
+        self._pending.clear()
+
+
+def _csv_reader(lines: Iterable[str], column_mapping: str | None) -> tuple[csv.DictReader, RowParser]:
+    reader = csv.DictReader(lines)
     if reader.fieldnames is None:
         raise ValidationException("CSV file is empty or has no headers")
+    return reader, _row_parser(reader.fieldnames, column_mapping)
 
-    rows = _parse_csv_rows(reader, column_mapping)
 
-    if not rows:
+def validate_csv_header(lines: Iterable[str], column_mapping: str | None) -> None:
+    """Reject up front a CSV whose headers or column mapping cannot be imported, or that has no rows."""
+    reader, _parse_row = _csv_reader(lines, column_mapping)
+    if next(reader, None) is None:
         raise ValidationException("CSV file contains no data rows")
-    if len(rows) > 10_000:
-        raise ValidationException(f"CSV file contains {len(rows)} rows — maximum is 10,000")
+
+
+@dataclass
+class ImportProgress:
+    """Counters of a running import; ``on_batch`` is called after every batch of rows."""
+
+    rows_parsed: int = 0
+    rows_inserted: int = 0
+    error_count: int = 0
+    errors: list[dict] = field(default_factory=list)  # the first MAX_REPORTED_IMPORT_ERRORS
+    on_batch: Callable[["ImportProgress"], None] | None = None
+
+    def add_error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_IMPORT_ERRORS:
+            self.errors.append({"line": line, "message": message})
+
+
+def import_event(
+    session: Session, event_name: str, lines: Iterable[str], column_mapping: str | None, admin: User,
+    bootstrap: bool = False, progress: ImportProgress | None = None,
+) -> ImportSummary | None:
+    """Create an event from CSV lines, streaming them in constant memory.
+
+    Rows are validated as they are read and written in batches. Invalid rows
+    are collected in ``progress`` and reading goes on, so one pass reports
+    all of them; the event is then rolled back and None returned. Problems
+    with the file as a whole (headers, mapping, size) raise. The event, its
+    rows and the bootstrapped evaluators are committed together at the end.
+    """
+    event_name = validate_event_name(event_name)
+    progress = progress or ImportProgress()
+    reader, parse_row = _csv_reader(lines, column_mapping)
 
     event = Event(name=event_name, created_by_id=admin.id)
     session.add(event)
     session.flush()
 
-    group_map: dict[str, Group] = {}
-    for row, _extra in rows:
-        group_name = row["group_name"]
-        if group_name not in group_map:
-            identifier = row.get("group_identifier", "")
-            group = Group(name=group_name, identifier=identifier, event_id=event.id)
-            session.add(group)
-            session.flush()
-            group_map[group_name] = group
-
-    participant_count = 0
-    for row, extra in rows:
-        group = group_map[row["group_name"]]
-        gender = row.get("gender") or None
-        age_raw = row.get("age", "")
-        age = int(age_raw) if age_raw and age_raw.isdigit() else None
-        participant = Participant(
-            display_name=row["display_name"], external_id=row.get("external_id") or None,
-            metadata_json=extra if extra else None, gender=gender, age=age, group_id=group.id,
-        )
-        session.add(participant)
-        participant_count += 1
+    importer = _BulkImporter(session, event.id, progress)
+    for line, raw_row in enumerate(reader, start=2):
+        progress.rows_parsed += 1
+        if progress.rows_parsed > settings.IMPORT_MAX_ROWS:
+            raise ValidationException(f"CSV file contains more than {settings.IMPORT_MAX_ROWS:,} rows")
+        try:
+            parsed = parse_row(raw_row, line)
+        except ValidationException as exc:
+            progress.add_error(line, exc.message)
+        else:
+            if not progress.error_count:  # the import is lost anyway; keep validating only
+                importer.add(*parsed)
+        if progress.on_batch and progress.rows_parsed % _IMPORT_BATCH_SIZE == 0:
+            progress.on_batch(progress)
+    if not progress.rows_parsed:
+        raise ValidationException("CSV file contains no data rows")
+    if progress.error_count:
+        session.rollback()
+        return None
+    importer.flush()
 
     _create_default_diploma(session, event.id)
-    session.commit()
-
     summary = ImportSummary(
         event_id=event.id, event_name=event.name,
-        groups_created=len(group_map), participants_created=participant_count,
+        groups_created=len(importer.group_ids), participants_created=importer.participants_created,
     )
     if bootstrap:
-        result = bootstrap_event_evaluators(session, event.id, admin)
-        summary.evaluators = result.created
+        summary.evaluators = bootstrap_event_evaluators(session, event.id, admin).created  # commits
+    else:
+        session.commit()
     return summary
 
 
-def _parse_csv_rows(reader: csv.DictReader, column_mapping: str | None) -> list[tuple[dict, dict | None]]:
-    """Parse CSV rows, applying column mapping if provided."""
+def _require_row_fields(row: dict, line: int) -> None:
+    if not row.get("display_name"):
+        raise ValidationException(f"Row {line}: display_name is required")
+    if not row.get("group_name"):
+        raise ValidationException(f"Row {line}: group_name is required")
+
+
+def _row_parser(fieldnames: Iterable[str], column_mapping: str | None) -> RowParser:
+    """Validate headers / mapping up front and return a per-row parser ``(raw_row, line) -> (row, extra)``."""
     if column_mapping:
         try:
             mapping = json_module.loads(column_mapping)
@@ -321,11 +431,12 @@ def _parse_csv_rows(reader: csv.DictReader, column_mapping: str | None) -> list[
         if missing:
             raise ValidationException(f"Mapping must include required fields: {', '.join(sorted(missing))}")
 
-        rows: list[tuple[dict, dict | None]] = []
-        for i, raw_row in enumerate(reader, start=2):
+        def parse_mapped(raw_row: dict[str | None, str], line: int) -> tuple[dict, dict | None]:
             row: dict[str, str] = {}
             extra: dict[str, str] = {}
             for csv_col, value in raw_row.items():
+                if csv_col is None:
+                    continue  # surplus cells beyond the header
                 csv_col_stripped = csv_col.strip()
                 val = value.strip() if value else ""
                 system_field = mapping.get(csv_col_stripped)
@@ -333,29 +444,24 @@ def _parse_csv_rows(reader: csv.DictReader, column_mapping: str | None) -> list[
                     row[system_field] = val
                 else:
                     extra[csv_col_stripped] = val
-            if not row.get("display_name"):
-                raise ValidationException(f"Row {i}: display_name is required")
-            if not row.get("group_name"):
-                raise ValidationException(f"Row {i}: group_name is required")
-            rows.append((row, extra if extra else None))
-        return rows
-    else:
-        headers = [h.strip().lower() for h in reader.fieldnames]
-        missing = REQUIRED_COLUMNS - set(headers)
-        if missing:
-            raise ValidationException(f"Missing required columns: {', '.join(sorted(missing))}")
-        extra_columns = [h for h in headers if h not in KNOWN_COLUMNS]
+            _require_row_fields(row, line)
+            return row, extra if extra else None
+
+        return parse_mapped
 
-        rows = []
-        for i, raw_row in enumerate(reader, start=2):
-            row = {k.strip().lower(): (v.strip() if v else "") for k, v in raw_row.items()}
-            if not row.get("display_name"):
-                raise ValidationException(f"Row {i}: display_name is required")
-            if not row.get("group_name"):
-                raise ValidationException(f"Row {i}: group_name is required")
-            extra = {col: row.get(col, "") for col in extra_columns} if extra_columns else None
-            rows.append((row, extra))
-        return rows
+    headers = [h.strip().lower() for h in fieldnames]
+    missing = REQUIRED_COLUMNS - set(headers)
+    if missing:
+        raise ValidationException(f"Missing required columns: {', '.join(sorted(missing))}")
+    extra_columns = [h for h in headers if h not in KNOWN_COLUMNS]
+
+    def parse(raw_row: dict[str | None, str], line: int) -> tuple[dict, dict | None]:
+        row = {k.strip().lower(): (v.strip() if v else "") for k, v in raw_row.items() if k is not None}
+        _require_row_fields(row, line)
+        extra = {col: row.get(col, "") for col in extra_columns} if extra_columns else None
+        return row, extra
+
+    return parse
 
 
 # ── Event Evaluator Pool ─────────────────────────────────────────────────────
@@ -386,6 +492,7 @@ def add_event_evaluator(session: Session, event_id: int, user_id: int) -> None:
     link = EventEvaluator(event_id=event_id, user_id=user_id)
     session.add(link)
     session.commit()
+    invalidate_scope(user_id)
 
 
 def remove_event_evaluator(session: Session, event_id: int, user_id: int, admin: User) -> None:
@@ -407,6 +514,7 @@ def remove_event_evaluator(session: Session, event_id: int, user_id: int, admin:
     )
     session.delete(link)
     session.commit()
+    invalidate_scope(user_id)
 
 
 # ── Age Categories ───────────────────────────────────────────────────────────
@@ -422,8 +530,11 @@ def create_age_category(session: Session, event_id: int, body: AgeCategoryCreate
     get_or_404(session, Event, event_id, "Event")
     cat = AgeCategory(event_id=event_id, name=body.name, min_age=body.min_age, max_age=body.max_age)
     session.add(cat)
+    session.flush()
+    reassign_age_categories(session, event_id)
     session.commit()
     session.refresh(cat)
+    invalidate_leaderboard_cache(event_id)
     return AgeCategoryRead.model_validate(cat)
 
 
@@ -444,8 +555,11 @@ def update_age_category(
     cat.min_age = new_min
     cat.max_age = new_max
     session.add(cat)
+    session.flush()
+    reassign_age_categories(session, event_id)
     session.commit()
     session.refresh(cat)
+    invalidate_leaderboard_cache(event_id)
     return AgeCategoryRead.model_validate(cat)
 
 
@@ -454,7 +568,10 @@ def delete_age_category(session: Session, event_id: int, category_id: int) -> No
     if not cat or cat.event_id != event_id:
         raise NotFoundException("Age category", category_id)
     session.delete(cat)
+    session.flush()
+    reassign_age_categories(session, event_id)
     session.commit()
+    invalidate_leaderboard_cache(event_id)
 
 
 # ── Bootstrap evaluators (one per group when the event has none) ──────────────
@@ -510,6 +627,7 @@ def bootstrap_event_evaluators(
 
     created: list[BootstrapEvaluatorCredential] = []
     skipped: list[str] = []
+    new_user_ids: list[int] = []
 
     for group in groups:
         has_evaluator = session.exec(
@@ -533,6 +651,7 @@ def bootstrap_event_evaluators(
 
         session.add(EventEvaluator(event_id=event.id, user_id=user.id))
         session.add(GroupEvaluator(group_id=group.id, user_id=user.id))
+        new_user_ids.append(user.id)
         log_action(
             session, admin.id, "BOOTSTRAP_EVALUATOR",
             resource_type="user", resource_id=user.id, detail=f"group={group.name}",
@@ -545,6 +664,7 @@ def bootstrap_event_evaluators(
         )
 
     session.commit()
+    invalidate_scope(*new_user_ids)
     return BootstrapEvaluatorsResponse(
         event_id=event.id, created=created, skipped_groups=skipped
     )
@@ -2,8 +2,10 @@
 
 from sqlalchemy.orm import selectinload
 from sqlmodel import Session, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.audit import log_action
+from app.core.authorization import get_scope, get_scope_async, invalidate_scope
 from app.core.exceptions import ConflictException, ForbiddenException, NotFoundException, ValidationException
 from app.models.event_evaluator import EventEvaluator
 from app.models.group import Group
@@ -11,20 +13,16 @@ from app.models.group_evaluator import GroupEvaluator
 from app.models.participant import Participant
 from app.models.user import User, UserRole
 from app.schemas.group import AssignEvaluatorRequest, EvaluatorRead, GroupUpdate, MyGroupRead
-from app.services.common import get_or_404
+from app.services.common import get_or_404, invalidate_leaderboard_cache
 
 
-def my_groups(session: Session, user: User) -> list[MyGroupRead]:
-    stmt = select(GroupEvaluator.group_id).where(GroupEvaluator.user_id == user.id)
-    group_ids = session.exec(stmt).all()
-    if not group_ids:
-        return []
+def _my_groups_query(group_ids: list[int]):
+    return select(Group).where(Group.id.in_(group_ids)).options(
+        selectinload(Group.event), selectinload(Group.participants),
+    )
 
-    groups = session.exec(
-        select(Group).where(Group.id.in_(group_ids)).options(
-            selectinload(Group.event), selectinload(Group.participants),
-        )
-    ).all()
+
+def _my_group_rows(groups: list[Group]) -> list[MyGroupRead]:
     return [
         MyGroupRead(
             id=g.id, name=g.name, identifier=g.identifier,
@@ -35,6 +33,20 @@ def my_groups(session: Session, user: User) -> list[MyGroupRead]:
     ]
 
 
+def my_groups(session: Session, user: User) -> list[MyGroupRead]:
+    group_ids = get_scope(session, user).group_ids()
+    if not group_ids:
+        return []
+    return _my_group_rows(session.exec(_my_groups_query(group_ids)).all())
+
+
+async def my_groups_async(session: AsyncSession, user: User) -> list[MyGroupRead]:
+    group_ids = (await get_scope_async(session, user)).group_ids()
+    if not group_ids:
+        return []
+    return _my_group_rows((await session.exec(_my_groups_query(group_ids))).all())
+
+
 def update_group(session: Session, group_id: int, body: GroupUpdate) -> MyGroupRead:
     group = session.exec(
         select(Group).where(Group.id == group_id).options(
@@ -51,6 +63,7 @@ def update_group(session: Session, group_id: int, body: GroupUpdate) -> MyGroupR
     session.add(group)
     session.commit()
     session.refresh(group)
+    invalidate_leaderboard_cache(group.event_id)
     return MyGroupRead(
         id=group.id, name=group.name, identifier=group.identifier,
         event_id=group.event_id, event_name=group.event.name,
@@ -67,8 +80,10 @@ def delete_group(session: Session, group_id: int) -> None:
         raise ValidationException(
             f"Cannot delete group — it still has {participant_count} participant(s). Remove or move them first."
         )
+    evaluator_ids = session.exec(select(GroupEvaluator.user_id).where(GroupEvaluator.group_id == group_id)).all()
     session.delete(group)
     session.commit()
+    invalidate_scope(*evaluator_ids)
 
 
 def assign_evaluator(session: Session, group_id: int, body: AssignEvaluatorRequest) -> None:
@@ -101,6 +116,7 @@ def assign_evaluator(session: Session, group_id: int, body: AssignEvaluatorReque
     link = GroupEvaluator(group_id=group_id, user_id=body.user_id)
     session.add(link)
     session.commit()
+    invalidate_scope(body.user_id)
 
 
 def remove_evaluator(session: Session, group_id: int, user_id: int, admin: User) -> None:
@@ -113,12 +129,12 @@ def remove_evaluator(session: Session, group_id: int, user_id: int, admin: User)
     )
     session.delete(link)
     session.commit()
+    invalidate_scope(user_id)
 
 
 def list_group_evaluators(session: Session, group_id: int, user: User) -> list[EvaluatorRead]:
     group = get_or_404(session, Group, group_id, "Group")
     if user.role not in (UserRole.ADMIN, UserRole.SUPER_ADMIN):
-        own_link = session.get(GroupEvaluator, (group_id, user.id))
-        if not own_link:
+        if not get_scope(session, user).has_group(group_id):
             raise ForbiddenException("You are not assigned to this group")
     return [EvaluatorRead.model_validate(e) for e in group.evaluators]
@@ -0,0 +1,275 @@
+"""CSV import jobs — events are created from uploads outside the request.
+
+The upload is checked and spooled to a temporary file, then a per-process
+thread pool runs the streaming import from ``event_service`` in a session of
+its own and the request returns the job id straight away. The job records
+rows parsed and inserted as it goes, and every invalid row instead of only
+the first; the event is committed in one transaction at the end, or not at
+all. Job state lives in Redis (process-local when Redis is not configured)
+so any replica can answer progress polls. Bootstrap evaluator credentials
+are kept apart from the job record and handed out by the first read of the
+finished job only.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from cachetools import TTLCache
+from sqlmodel import Session
+
+from app.config import settings
+from app.core import metrics
+from app.core.exceptions import NotFoundException, ServiceUnavailableException, ValidationException
+from app.core.redis_client import redis_client
+from app.models.user import User, UserRole
+from app.schemas.import_job import ImportJobRead, ImportJobStatus
+from app.services import event_service
+
+logger = logging.getLogger(__name__)
+
+_JOB_TTL = 3600
+_CREDENTIALS_TTL = 600
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+# Queued jobs and their spooled uploads, until a worker or shutdown() claims them.
+_pending: dict[str, tuple[dict, str]] = {}
+_pending_lock = threading.Lock()
+
+# Job state when Redis is not configured or unreachable.
+_local_jobs: TTLCache = TTLCache(maxsize=1_000, ttl=_JOB_TTL)
+_local_jobs_lock = threading.Lock()
+_local_credentials: TTLCache = TTLCache(maxsize=1_000, ttl=_CREDENTIALS_TTL)
+
+
+# ── Job state ────────────────────────────────────────────────────────────────
+
+
+def _job_key(job_id: str) -> str:
+    return f"import:job:{job_id}"
+
+
+def _save_job(job: dict) -> None:
+    if redis_client:
+        try:
+            redis_client.setex(_job_key(job["job_id"]), _JOB_TTL, json.dumps(job))
+            return
+        except Exception:
+            logger.warning("Failed to store import job %s in Redis", job["job_id"])
+    with _local_jobs_lock:
+        _local_jobs[job["job_id"]] = dict(job)
+
+
+def _load_job(job_id: str) -> dict | None:
+    if redis_client:
+        try:
+            raw = redis_client.get(_job_key(job_id))
+            if raw:
+                return json.loads(raw)
+        except Exception:
+            logger.warning("Failed to read import job %s from Redis", job_id)
+    with _local_jobs_lock:
+        job = _local_jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+
+def _credentials_key(job_id: str) -> str:
+    return f"import:job:{job_id}:credentials"
+
+
+def _save_credentials(job_id: str, evaluators: list[dict]) -> None:
+    if redis_client:
+        try:
+            redis_client.setex(_credentials_key(job_id), _CREDENTIALS_TTL, json.dumps(evaluators))
+            return
+        except Exception:
+            logger.warning("Failed to store import job %s credentials in Redis", job_id)
+    with _local_jobs_lock:
+        _local_credentials[job_id] = evaluators
+
+
+def _take_credentials(job_id: str) -> list[dict]:
+    """The job's bootstrap credentials, removed as they are read; [] once taken or expired."""
+    if redis_client:
+        try:
+            raw = redis_client.getdel(_credentials_key(job_id))
+            if raw:
+                return json.loads(raw)
+        except Exception:
+            logger.warning("Failed to read import job %s credentials from Redis", job_id)
+    with _local_jobs_lock:
+        return _local_credentials.pop(job_id, [])
+
+
+def _record_progress(job: dict, progress: event_service.ImportProgress) -> None:
+    job.update(
+        rows_parsed=progress.rows_parsed, rows_inserted=progress.rows_inserted,
+        error_count=progress.error_count, errors=progress.errors,
+    )
+
+
+# ── Worker pool ──────────────────────────────────────────────────────────────
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.IMPORT_WORKERS, thread_name_prefix="import")
+        return _executor
+
+
+def _claim(job_id: str) -> bool:
+    with _pending_lock:
+        return _pending.pop(job_id, None) is not None
+
+
+def shutdown() -> None:
+    """Stop the worker pool; jobs that have not started fail with a retry message."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+    with _pending_lock:
+        dropped = list(_pending.values())
+        _pending.clear()
+    for job, path in dropped:
+        job.update(
+            status=ImportJobStatus.FAILED, error_status=503,
+            error="The server restarted before the import started; nothing was imported. Please retry the import.",
+        )
+        _save_job(job)
+        os.unlink(path)
+        metrics.increment("import.jobs_failed")
+
+
+def _run_job(job: dict, path: str, column_mapping: str | None, admin_id: int, bootstrap: bool, bind) -> None:
+    if not _claim(job["job_id"]):
+        return  # shutdown() failed the job and removed its upload
+
+    def report(progress: event_service.ImportProgress) -> None:
+        _record_progress(job, progress)
+        _save_job(job)
+
+    progress = event_service.ImportProgress(on_batch=report)
+    try:
+        job["status"] = ImportJobStatus.RUNNING
+        _save_job(job)
+        with Session(bind) as session, open(path, "rb") as raw:
+            admin = session.get(User, admin_id)
+            try:
+                summary = event_service.import_event(
+                    session, job["event_name"], event_service.decoded_lines(raw), column_mapping, admin,
+                    bootstrap=bootstrap, progress=progress,
+                )
+            except ValidationException as exc:
+                session.rollback()
+                summary, job["error"], job["error_status"] = None, exc.message, exc.status_code
+            except ServiceUnavailableException:
+                # Bootstrap evaluators could not get a hashing slot; the whole import rolled back.
+                session.rollback()
+                summary, job["error_status"] = None, 503
+                job["error"] = "Server is too busy to create evaluator accounts; nothing was imported. Please retry the import."
+        _record_progress(job, progress)
+        if summary is None:
+            if job["error"] is None:
+                job["error"] = f"{progress.error_count} row(s) failed validation; nothing was imported"
+                job["error_status"] = 400
+            job["status"] = ImportJobStatus.FAILED
+            metrics.increment("import.jobs_failed")
+        else:
+            # Plaintext passwords stay out of the job record, which every poll returns for an hour.
+            if summary.evaluators:
+                _save_credentials(job["job_id"], [cred.model_dump() for cred in summary.evaluators])
+            job.update(status=ImportJobStatus.DONE, result=summary.model_dump(exclude={"evaluators"}))
+            metrics.increment("import.jobs_done")
+    except Exception:
+        logger.exception("Import job %s failed", job["job_id"])
+        job.update(status=ImportJobStatus.FAILED, error="Import failed unexpectedly. Please try again.", error_status=500)
+        metrics.increment("import.jobs_failed")
+    finally:
+        _save_job(job)
+        os.unlink(path)
+
+
+# ── Public API ───────────────────────────────────────────────────────────────
+
+
+def _spool_upload(file) -> str:
+    """Copy the upload to a file of our own; the request's copy is gone once it returns."""
+    file.file.seek(0)
+    with tempfile.NamedTemporaryFile(prefix="import-", suffix=".csv", delete=False) as tmp:
+        shutil.copyfileobj(file.file, tmp)
+        size = tmp.tell()
+    if size > settings.IMPORT_MAX_BYTES:
+        os.unlink(tmp.name)
+        raise ValidationException(f"CSV file exceeds the {settings.IMPORT_MAX_BYTES // (1024 * 1024)} MB limit")
+    return tmp.name
+
+
+def submit_import(
+    session: Session, event_name: str, file, column_mapping: str | None, admin: User,
+    bootstrap: bool = False,
+) -> ImportJobRead:
+    """Check an event CSV upload and queue its import; returns the queued job.
+
+    The name, file and header row are checked here, so those mistakes still
+    answer 400; row-level problems are reported by the job.
+    """
+    event_name = event_service.validate_event_name(event_name)
+    event_service.validate_csv_upload(file)
+    path = _spool_upload(file)
+    try:
+        with open(path, "rb") as raw:
+            event_service.validate_csv_header(event_service.decoded_lines(raw), column_mapping)
+    except ValidationException:
+        os.unlink(path)
+        raise
+
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "status": ImportJobStatus.QUEUED,
+        "user_id": admin.id,
+        "event_name": event_name,
+        "rows_parsed": 0,
+        "rows_inserted": 0,
+        "error_count": 0,
+        "errors": [],
+        "result": None,
+        "error": None,
+        "error_status": None,
+    }
+    try:
+        _save_job(job)
+    except Exception:
+        os.unlink(path)
+        raise
+    with _pending_lock:
+        _pending[job["job_id"]] = (dict(job), path)
+    try:
+        _get_executor().submit(_run_job, dict(job), path, column_mapping, admin.id, bootstrap, session.get_bind())
+    except Exception:
+        if _claim(job["job_id"]):
+            os.unlink(path)
+        raise
+    metrics.increment("import.jobs_submitted")
+    return ImportJobRead.model_validate(job)
+
+
+def get_job(user: User, job_id: str) -> ImportJobRead:
+    # Finished jobs may carry bootstrap credentials: only the submitter and super admins see them,
+    # and only on the first read after the job is done.
+    job = _load_job(job_id)
+    if job is None or (job["user_id"] != user.id and user.role != UserRole.SUPER_ADMIN):
+        raise NotFoundException("Import job", job_id)
+    if job["status"] == ImportJobStatus.DONE:
+        job["result"] = {**job["result"], "evaluators": _take_credentials(job_id)}
+    return ImportJobRead.model_validate(job)
@@ -3,14 +3,30 @@
 import csv
 import io
 import logging
+import math
+import random
+import threading
+import time
+from bisect import bisect_left, insort
 from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
+from itertools import groupby
 
+from cachetools import TTLCache
+from pydantic import BaseModel
+from sqlalchemy import case, func, literal
 from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
 
-from app.core.exceptions import NotFoundException
-from app.core.redis_client import redis_client
+from app.core import metrics
+from app.core.exceptions import NotFoundException, ValidationException
+from app.core.ranking import rank_scores
+from app.core.redis_client import async_redis_client, redis_client
+from app.core.scoring import LOWER_IS_BETTER, score_value
 from app.core.time_format import format_seconds
+from app.database import primary_session
 from app.models.activity import Activity, EvaluationType
 from app.models.age_category import AgeCategory
 from app.models.event import Event
@@ -20,49 +36,69 @@ from app.models.record import Record
 from app.schemas.leaderboard import (
     ActivityLeaderboard,
     CategoryRanking,
+    LeaderboardChanges,
     LeaderboardResponse,
     ParticipantRank,
 )
+from app.services.common import (
+    LeaderboardRevisions,
+    bump_leaderboard_revision,
+    bump_leaderboard_revision_async,
+    get_leaderboard_revisions,
+    get_leaderboard_revisions_async,
+)
 
 logger = logging.getLogger(__name__)
 
+_CACHE_TTL = 300
+_STALE_TTL = 3600           # last good response, served while another worker rebuilds
+_REBUILD_LEASE_TTL = 10     # seconds one worker may hold an event's rebuild lease
+_REBUILD_WAIT = 2.0         # seconds a worker without a stale copy waits for the leader
+_REBUILD_POLL = 0.05
+_EARLY_REFRESH_BETA = 1.0   # XFetch: > 1 refreshes earlier, < 1 later
+
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
 
-def _assign_age_category(age: int | None, categories: list[AgeCategory], has_categories: bool) -> str:
+def _age_category_label(age_category_id: int | None, names: dict[int, str], has_categories: bool) -> str:
+    """Bucket name of a participant's stored ``age_category_id``."""
     if not has_categories:
         return "All"
-    if age is None:
-        return "Unassigned"
-    for cat in categories:
-        if cat.min_age <= age <= cat.max_age:
-            return cat.name
-    return "Unassigned"
+    return names.get(age_category_id, "Unassigned")
 
 
-_LOWER_IS_BETTER = {EvaluationType.NUMERIC_LOW, EvaluationType.TIME_LOW}
+def _sort_key(value_numeric: float | None, evaluation_type: EvaluationType) -> tuple:
+    """Ascending key of a record's ``value_numeric``: best first, unrankable values tied last."""
+    if value_numeric is None:
+        return (1, 0)
+    if evaluation_type in LOWER_IS_BETTER:
+        return (0, value_numeric)
+    return (0, -value_numeric)
 
 
-def _sort_key_for_record(value_raw: str, evaluation_type: EvaluationType):
-    try:
-        numeric = float(value_raw)
-        if evaluation_type in _LOWER_IS_BETTER:
-            return (0, numeric)
-        else:
-            return (0, -numeric)
-    except (ValueError, TypeError):
-        return (1, 0)
+@dataclass(frozen=True)
+class LeaderboardFilter:
+    """Slice of a leaderboard requested by scoreboards: one activity, one bucket, the podium."""
 
+    activity_id: int | None = None
+    gender: str | None = None
+    age_category: str | None = None
+    top: int | None = None
+
+    def matches(self, gender: str, age_category_name: str) -> bool:
+        return (self.gender is None or self.gender == gender) and (
+            self.age_category is None or self.age_category == age_category_name
+        )
 
-@dataclass
-class RankedEntry:
-    rank: int
-    participant: Participant
-    group_name: str
-    value_raw: str
-    gender: str
-    age_category_name: str
+
+def _load_participant_map(session: Session, event_id: int) -> dict[int, tuple[Participant, str]]:
+    groups = session.exec(select(Group).where(Group.event_id == event_id)).all()
+    group_name_map = {g.id: g.name for g in groups}
+    participants = session.exec(
+        select(Participant).join(Group, Participant.group_id == Group.id).where(Group.event_id == event_id)
+    ).all()
+    return {p.id: (p, group_name_map[p.group_id]) for p in participants}
 
 
 def _load_event_data(
@@ -78,15 +114,7 @@ def _load_event_data(
     has_age_categories = len(age_categories) > 0
 
     activities = session.exec(select(Activity).where(Activity.event_id == event_id)).all()
-
-    groups = session.exec(select(Group).where(Group.event_id == event_id)).all()
-    group_name_map = {g.id: g.name for g in groups}
-    participants = session.exec(
-        select(Participant).join(Group, Participant.group_id == Group.id).where(Group.event_id == event_id)
-    ).all()
-    participant_map: dict[int, tuple[Participant, str]] = {
-        p.id: (p, group_name_map[p.group_id]) for p in participants
-    }
+    participant_map = _load_participant_map(session, event_id)
 
     all_records = session.exec(
         select(Record).join(Activity, Record.activity_id == Activity.id).where(Activity.event_id == event_id)
@@ -98,88 +126,717 @@ def _load_event_data(
     return activities, list(age_categories), has_age_categories, participant_map, records_by_activity
 
 
-def _bucket_and_rank(
-    records: list[Record],
-    activity: Activity,
-    age_categories: list[AgeCategory],
-    has_age_categories: bool,
-    participant_map: dict[int, tuple[Participant, str]],
-) -> dict[tuple[str, str], list[RankedEntry]]:
-    buckets: dict[tuple[str, str], list[tuple[Participant, str, str]]] = {}
-    for record in records:
-        if record.participant_id not in participant_map:
-            continue
-        participant, group_name = participant_map[record.participant_id]
-        gender = participant.gender or "?"
-        age_cat_name = _assign_age_category(participant.age, age_categories, has_age_categories)
-        key = (gender, age_cat_name)
-        buckets.setdefault(key, []).append((participant, record.value_raw, group_name))
-
-    ranked: dict[tuple[str, str], list[RankedEntry]] = {}
-    for (gender, age_cat_name), entries in buckets.items():
-        sorted_entries = sorted(entries, key=lambda e: _sort_key_for_record(e[1], activity.evaluation_type))
-        rank = 1
-        ranked_list: list[RankedEntry] = []
-        for i, (participant, value_raw, group_name) in enumerate(sorted_entries):
-            if i > 0:
-                prev_key = _sort_key_for_record(sorted_entries[i - 1][1], activity.evaluation_type)
-                curr_key = _sort_key_for_record(value_raw, activity.evaluation_type)
-                if curr_key != prev_key:
-                    rank = i + 1
-            ranked_list.append(RankedEntry(
-                rank=rank, participant=participant, group_name=group_name,
-                value_raw=value_raw, gender=gender, age_category_name=age_cat_name,
-            ))
-        ranked[(gender, age_cat_name)] = ranked_list
-
-    return ranked
+def _ranked_records(
+    event_id: int, age_categories: list[AgeCategory], has_age_categories: bool,
+    activity_ids: list[int] | None = None, slice_: LeaderboardFilter | None = None,
+):
+    """An event's records ranked in SQL, one ``RANK() OVER`` partition per leaderboard bucket.
+
+    Buckets are (activity, gender, stored age category); within one, records
+    order by ``value_numeric`` (descending unless lower is better) with
+    unrankable values tied last, giving the same "1224" ranks as
+    ``BucketRanking``. Rows come back in leaderboard order, ties listed by
+    participant id exactly as ``BucketRanking`` lists them. ``slice_`` narrows
+    the rows before ranking as far as it can without changing any rank, and
+    cuts ranks below ``top``.
+    """
+    gender = func.coalesce(func.nullif(Participant.gender, ""), "?")
+    age_category = func.coalesce(AgeCategory.name, "Unassigned") if has_age_categories else literal("All")
+    score = case(
+        (Activity.evaluation_type.in_(list(LOWER_IS_BETTER)), Record.value_numeric),
+        else_=-Record.value_numeric,
+    )
+    ranked = (
+        select(
+            Record.id.label("record_id"), Record.activity_id, Record.value_raw, Record.value_numeric,
+            Participant.id.label("participant_id"), Participant.display_name,
+            Participant.gender.label("participant_gender"), Participant.age,
+            Group.name.label("group_name"), gender.label("gender"), age_category.label("age_category"),
+            func.rank().over(
+                partition_by=(Record.activity_id, gender, age_category),
+                order_by=(Record.value_numeric.is_(None), score),
+            ).label("rank"),
+        )
+        .join(Participant, Record.participant_id == Participant.id)
+        .join(Group, Participant.group_id == Group.id)
+        .join(Activity, Record.activity_id == Activity.id)
+        .outerjoin(AgeCategory, Participant.age_category_id == AgeCategory.id)
+        .where(Group.event_id == event_id)
+    )
+    if activity_ids is not None:
+        ranked = ranked.where(Record.activity_id.in_(activity_ids))
+    if slice_ is not None:
+        # Whole buckets are dropped here, so the ranks within the rest hold.
+        if slice_.gender is not None:
+            ranked = ranked.where(gender == slice_.gender)
+        category_ids = [c.id for c in age_categories if c.name == slice_.age_category]
+        if category_ids:
+            ranked = ranked.where(Participant.age_category_id.in_(category_ids))
+    ranked = ranked.subquery()
+
+    stmt = select(ranked)
+    if slice_ is not None:
+        if slice_.age_category is not None:
+            stmt = stmt.where(ranked.c.age_category == slice_.age_category)
+        if slice_.top is not None:
+            stmt = stmt.where(ranked.c.rank <= slice_.top)
+    return stmt.order_by(
+        ranked.c.activity_id, ranked.c.gender, ranked.c.age_category, ranked.c.rank, ranked.c.participant_id,
+    )
 
 
-# ── Public API ───────────────────────────────────────────────────────────────
+# ── Incremental ranking engine ───────────────────────────────────────────────
+
+
+@dataclass(frozen=True, slots=True)
+class _ParticipantInfo:
+    display_name: str
+    gender: str | None
+    age: int | None
+    group_name: str
+    age_category_name: str
+
+
+class BucketRanking:
+    """Sorted ``(sort_key, participant_id)`` pairs of one (activity, gender, age category) bucket.
+
+    Positions are found by binary search, so a single upsert or delete touches
+    only this bucket. Ranks follow the same "1224" tie semantics as
+    ``_ranked_records`` and are cached until the bucket changes.
+    """
+
+    __slots__ = ("_entries", "_ranks")
+
+    def __init__(self, entries: list[tuple[tuple, int]] | None = None):
+        self._entries: list[tuple[tuple, int]] = sorted(entries or [])
+        self._ranks: list[int] | None = None
+
+    @classmethod
+    def from_scores(
+        cls, scores: list[float | None], participant_ids: list[int], evaluation_type: EvaluationType,
+    ) -> "BucketRanking":
+        """Build a bucket from ``value_numeric`` scores, ranked by ``rank_scores`` in one pass."""
+        order, ranks = rank_scores(scores, participant_ids, evaluation_type in LOWER_IS_BETTER)
+        bucket = cls()
+        bucket._entries = [(_sort_key(scores[i], evaluation_type), participant_ids[i]) for i in order]
+        bucket._ranks = ranks
+        return bucket
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, sort_key: tuple, participant_id: int) -> None:
+        insort(self._entries, (sort_key, participant_id))
+        self._ranks = None
+
+    def remove(self, sort_key: tuple, participant_id: int) -> None:
+        i = bisect_left(self._entries, (sort_key, participant_id))
+        if i < len(self._entries) and self._entries[i] == (sort_key, participant_id):
+            del self._entries[i]
+            self._ranks = None
+
+    def rank_of(self, sort_key: tuple) -> int:
+        """Rank a value with this sort key holds (or would hold) in the bucket."""
+        return bisect_left(self._entries, (sort_key,)) + 1
+
+    def _competition_ranks(self) -> list[int]:
+        ranks: list[int] = []
+        rank = 0
+        prev_key = None
+        for i, (sort_key, _) in enumerate(self._entries, start=1):
+            if sort_key != prev_key:
+                rank = i
+                prev_key = sort_key
+            ranks.append(rank)
+        return ranks
+
+    def ranked(self) -> Iterator[tuple[int, int]]:
+        """Yield ``(rank, participant_id)`` in leaderboard order."""
+        if self._ranks is None:
+            self._ranks = self._competition_ranks()
+        for rank, (_, participant_id) in zip(self._ranks, self._entries):
+            yield rank, participant_id
+
+
+class _LeaderboardHeader(BaseModel):
+    """Event-level part of a cached leaderboard; activities are cached separately."""
+
+    event_revision: int
+    event_id: int
+    event_name: str
+    has_age_categories: bool
+    activity_ids: list[int]
+    expires_at: float = 0.0
+    build_seconds: float = 0.0
+
+
+class EventLeaderboard:
+    """In-memory leaderboard of one event, kept current record by record.
+
+    ``event_revision`` and ``activity_revisions`` are the shared revisions the
+    engine reflects; callers must hold ``lock`` while reading or mutating it.
+    """
+
+    def __init__(self, event: Event, revisions: LeaderboardRevisions | None):
+        self.event_id = event.id
+        self.event_name = event.name
+        self.event_revision = revisions.event if revisions else None
+        self.activity_revisions: dict[int, int] = dict(revisions.activities) if revisions else {}
+        self.lock = threading.Lock()
+        self.has_age_categories = False
+        self._cat_order: dict[str, int] = {}
+        self._activities: dict[int, tuple[str, EvaluationType]] = {}
+        self._participants: dict[int, _ParticipantInfo] = {}
+        self._values: dict[int, dict[int, tuple[tuple, str]]] = {}
+        self._buckets: dict[int, dict[tuple[str, str], BucketRanking]] = {}
+
+    @classmethod
+    def build(cls, session: Session, event: Event, revisions: LeaderboardRevisions | None) -> "EventLeaderboard":
+        activities, age_categories, has_age_categories, participant_map, records_by_activity = (
+            _load_event_data(session, event.id)
+        )
+        engine = cls(event, revisions)
+        engine.has_age_categories = has_age_categories
+        engine._cat_order = {cat.name: cat.min_age for cat in age_categories}
+        category_names = {cat.id: cat.name for cat in age_categories}
+        engine._participants = {
+            pid: _ParticipantInfo(
+                display_name=p.display_name, gender=p.gender, age=p.age, group_name=group_name,
+                age_category_name=_age_category_label(p.age_category_id, category_names, has_age_categories),
+            )
+            for pid, (p, group_name) in participant_map.items()
+        }
+        for activity in activities:
+            engine._activities[activity.id] = (activity.name, activity.evaluation_type)
+            engine._fill_activity(activity.id, records_by_activity[activity.id])
+        return engine
+
+    @property
+    def activity_ids(self) -> list[int]:
+        return list(self._activities)
+
+    @staticmethod
+    def _bucket_key(participant: _ParticipantInfo) -> tuple[str, str]:
+        return (participant.gender or "?", participant.age_category_name)
+
+    def _fill_activity(self, activity_id: int, records: list[Record]) -> None:
+        evaluation_type = self._activities[activity_id][1]
+        values: dict[int, tuple[tuple, str]] = {}
+        bucket_scores: dict[tuple[str, str], tuple[list[float | None], list[int]]] = {}
+        for record in records:
+            participant = self._participants.get(record.participant_id)
+            if participant is None:
+                continue
+            values[record.participant_id] = (_sort_key(record.value_numeric, evaluation_type), record.value_raw)
+            scores, participant_ids = bucket_scores.setdefault(self._bucket_key(participant), ([], []))
+            scores.append(record.value_numeric)
+            participant_ids.append(record.participant_id)
+        self._values[activity_id] = values
+        self._buckets[activity_id] = {
+            key: BucketRanking.from_scores(scores, participant_ids, evaluation_type)
+            for key, (scores, participant_ids) in bucket_scores.items()
+        }
+
+    def sync(self, session: Session, revisions: LeaderboardRevisions) -> bool:
+        """Reload only the activities whose records changed on another worker.
+
+        Returns False when the event itself changed and a full rebuild is needed.
+        """
+        if self.event_revision != revisions.event:
+            return False
+        for activity_id in self._activities:
+            revision = revisions.activity(activity_id)
+            if self.activity_revisions.get(activity_id, 0) == revision:
+                continue
+            records = session.exec(select(Record).where(Record.activity_id == activity_id)).all()
+            if any(r.participant_id not in self._participants for r in records):
+                return False
+            self._fill_activity(activity_id, records)
+            self.activity_revisions[activity_id] = revision
+        return True
+
+    def apply(self, activity_id: int, changes: dict[int, str | None]) -> bool:
+        """Apply record upserts (value) and deletes (``None``) to one activity.
+
+        Returns False if the activity or a participant is unknown to the engine.
+        """
+        for participant_id, value_raw in changes.items():
+            if value_raw is None:
+                self.remove(activity_id, participant_id)
+            elif not self.upsert(activity_id, participant_id, value_raw):
+                return False
+        return True
+
+    def upsert(self, activity_id: int, participant_id: int, value_raw: str) -> bool:
+        """Move a participant's score into place. False if the activity or participant is unknown."""
+        activity = self._activities.get(activity_id)
+        participant = self._participants.get(participant_id)
+        if activity is None or participant is None:
+            return False
+        self.remove(activity_id, participant_id)
+        sort_key = _sort_key(score_value(value_raw, activity[1]), activity[1])
+        self._values[activity_id][participant_id] = (sort_key, value_raw)
+        buckets = self._buckets[activity_id]
+        buckets.setdefault(self._bucket_key(participant), BucketRanking()).add(sort_key, participant_id)
+        return True
+
+    def remove(self, activity_id: int, participant_id: int) -> None:
+        value = self._values.get(activity_id, {}).pop(participant_id, None)
+        if value is None:
+            return
+        buckets = self._buckets[activity_id]
+        bucket_key = self._bucket_key(self._participants[participant_id])
+        bucket = buckets[bucket_key]
+        bucket.remove(value[0], participant_id)
+        if not bucket:
+            del buckets[bucket_key]
+
+    def header(self) -> _LeaderboardHeader:
+        return _LeaderboardHeader(
+            event_revision=self.event_revision or 0, event_id=self.event_id, event_name=self.event_name,
+            has_age_categories=self.has_age_categories, activity_ids=self.activity_ids,
+        )
+
+    def render_activity(self, activity_id: int, slice_: LeaderboardFilter | None = None) -> ActivityLeaderboard:
+        activity_name, evaluation_type = self._activities[activity_id]
+        category_rankings: list[CategoryRanking] = []
+        for (gender, age_cat_name), bucket in self._buckets[activity_id].items():
+            if slice_ is not None and not slice_.matches(gender, age_cat_name):
+                continue
+            participants: list[ParticipantRank] = []
+            for rank, participant_id in bucket.ranked():
+                if slice_ is not None and slice_.top is not None and rank > slice_.top:
+                    break
+                p = self._participants[participant_id]
+                participants.append(ParticipantRank(
+                    rank=rank, participant_id=participant_id, display_name=p.display_name,
+                    gender=p.gender, age=p.age,
+                    value=self._values[activity_id][participant_id][1], group_name=p.group_name,
+                ))
+            category_rankings.append(
+                CategoryRanking(gender=gender, age_category_name=age_cat_name, participants=participants)
+            )
+        category_rankings.sort(key=lambda c: (c.gender, self._cat_order.get(c.age_category_name, 9999)))
+        return ActivityLeaderboard(
+            activity_id=activity_id, activity_name=activity_name,
+            evaluation_type=evaluation_type, categories=category_rankings,
+        )
+
+    def render(self) -> LeaderboardResponse:
+        return _assemble(self.header(), {aid: self.render_activity(aid) for aid in self._activities})
+
+
+def _assemble(header: _LeaderboardHeader, activities: dict[int, ActivityLeaderboard]) -> LeaderboardResponse:
+    return LeaderboardResponse(
+        event_id=header.event_id, event_name=header.event_name,
+        has_age_categories=header.has_age_categories,
+        activities=[activities[aid] for aid in header.activity_ids],
+    )
+
+
+# One warm engine per event in this worker process; other replicas keep their own
+# and detect staleness through the shared revisions.
+_engines: TTLCache[int, EventLeaderboard] = TTLCache(maxsize=64, ttl=_CACHE_TTL)
+_engines_lock = threading.Lock()
+
+
+def _get_engine(event_id: int) -> EventLeaderboard | None:
+    with _engines_lock:
+        return _engines.get(event_id)
+
+
+def _store_engine(engine: EventLeaderboard) -> None:
+    with _engines_lock:
+        _engines[engine.event_id] = engine
+
+
+def _drop_engine(event_id: int) -> None:
+    with _engines_lock:
+        _engines.pop(event_id, None)
 
 
-def get_leaderboard(session: Session, event_id: int) -> LeaderboardResponse:
+# Threads of one worker that miss together wait for a single build.
+_build_locks = [threading.Lock() for _ in range(16)]
+
+
+def _synced_engine(session: Session, event_id: int, revisions: LeaderboardRevisions) -> EventLeaderboard | None:
+    engine = _get_engine(event_id)
+    if engine is not None:
+        with engine.lock:
+            if engine.sync(session, revisions):
+                return engine
+    return None
+
+
+def _current_engine(session: Session, event_id: int, revisions: LeaderboardRevisions) -> EventLeaderboard:
+    """This worker's engine brought up to ``revisions``, rebuilt from the DB if needed."""
+    engine = _synced_engine(session, event_id, revisions)
+    if engine is not None:
+        return engine
+
+    with _build_locks[event_id % len(_build_locks)]:
+        engine = _synced_engine(session, event_id, revisions)
+        if engine is not None:
+            metrics.increment("leaderboard.rebuilds_coalesced")
+            return engine
+        event = session.get(Event, event_id)
+        if not event:
+            raise NotFoundException("Event", event_id)
+        # Revisions are read before loading, so a write racing this build can
+        # only make the engine look older than it is, never newer.
+        engine = EventLeaderboard.build(session, event, revisions)
+        _store_engine(engine)
+        metrics.increment("leaderboard.rebuilds")
+        return engine
+
+
+# ── Redis fragments ──────────────────────────────────────────────────────────
+#
+# leaderboard:{event_id}:header                     event name, activity order, event revision
+# leaderboard:{event_id}:a{activity_id}:{ev}.{av}   one ActivityLeaderboard per revision pair
+# leaderboard:{event_id}:stale                      last assembled response, any revision
+# leaderboard:{event_id}:rebuild                    lease held by the worker rebuilding
+#
+# Fragment keys embed both revisions, so a record write only orphans the
+# fragment of its own activity; structural changes orphan all of them.
+
+
+def _stale_key(event_id: int) -> str:
+    return f"leaderboard:{event_id}:stale"
+
+
+def _header_key(event_id: int) -> str:
+    return f"leaderboard:{event_id}:header"
+
+
+def _fragment_key(event_id: int, activity_id: int, revisions: LeaderboardRevisions) -> str:
+    return f"leaderboard:{event_id}:a{activity_id}:{revisions.event}.{revisions.activity(activity_id)}"
+
+
+def _parse_fragments(
+    header: _LeaderboardHeader, values: list[str | None]
+) -> dict[int, ActivityLeaderboard]:
+    return {
+        aid: ActivityLeaderboard.model_validate_json(value)
+        for aid, value in zip(header.activity_ids, values)
+        if value
+    }
+
+
+def _read_cached_fragments(
+    event_id: int, revisions: LeaderboardRevisions
+) -> tuple[_LeaderboardHeader | None, dict[int, ActivityLeaderboard]]:
+    try:
+        if redis_client:
+            raw_header = redis_client.get(_header_key(event_id))
+            if raw_header:
+                header = _LeaderboardHeader.model_validate_json(raw_header)
+                if header.event_revision == revisions.event:
+                    keys = [_fragment_key(event_id, aid, revisions) for aid in header.activity_ids]
+                    return header, _parse_fragments(header, redis_client.mget(keys) if keys else [])
+    except Exception:
+        logger.warning("Failed to read leaderboard cache for event %s", event_id)
+    return None, {}
+
+
+async def _read_cached_fragments_async(
+    event_id: int, revisions: LeaderboardRevisions
+) -> tuple[_LeaderboardHeader | None, dict[int, ActivityLeaderboard]]:
+    try:
+        if async_redis_client:
+            raw_header = await async_redis_client.get(_header_key(event_id))
+            if raw_header:
+                header = _LeaderboardHeader.model_validate_json(raw_header)
+                if header.event_revision == revisions.event:
+                    keys = [_fragment_key(event_id, aid, revisions) for aid in header.activity_ids]
+                    values = await async_redis_client.mget(keys) if keys else []
+                    return header, _parse_fragments(header, values)
+    except Exception:
+        logger.warning("Failed to read leaderboard cache for event %s", event_id)
+    return None, {}
+
+
+def _write_cached_fragments(
+    event_id: int,
+    revisions: LeaderboardRevisions,
+    header: _LeaderboardHeader,
+    fragments: dict[int, ActivityLeaderboard],
+    result: LeaderboardResponse,
+) -> None:
+    try:
+        if redis_client:
+            pipe = redis_client.pipeline(transaction=False)
+            # Rewritten with every fragment so it outlives the fragments it indexes.
+            pipe.setex(_header_key(event_id), _CACHE_TTL, header.model_dump_json())
+            for aid, fragment in fragments.items():
+                pipe.setex(_fragment_key(event_id, aid, revisions), _CACHE_TTL, fragment.model_dump_json())
+            pipe.setex(_stale_key(event_id), _STALE_TTL, result.model_dump_json())
+            pipe.execute()
+    except Exception:
+        logger.warning("Failed to write leaderboard cache for event %s", event_id)
+
+
+def _read_stale(event_id: int) -> LeaderboardResponse | None:
     try:
         if redis_client:
-            cached = redis_client.get(f"leaderboard:{event_id}")
+            cached = redis_client.get(_stale_key(event_id))
             if cached:
                 return LeaderboardResponse.model_validate_json(cached)
     except Exception:
-        logger.warning("Failed to read leaderboard cache for event %s", event_id)
+        logger.warning("Failed to read stale leaderboard for event %s", event_id)
+    return None
+
+
+@contextmanager
+def _rebuild_lease(event_id: int) -> Iterator[bool]:
+    """Cross-replica single flight: yields True for the one worker that should rebuild.
+
+    Without Redis (or if Redis fails) every caller proceeds; in-process
+    coalescing still happens in ``_current_engine``.
+    """
+    lease = None
+    acquired = True
+    if redis_client:
+        try:
+            lease = redis_client.lock(f"leaderboard:{event_id}:rebuild", timeout=_REBUILD_LEASE_TTL, blocking=False)
+            acquired = lease.acquire()
+        except Exception:
+            logger.warning("Failed to take leaderboard rebuild lease for event %s", event_id)
+            lease, acquired = None, True
+    if not acquired:
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        if lease is not None:
+            try:
+                lease.release()
+            except Exception:
+                logger.warning("Leaderboard rebuild lease for event %s expired before release", event_id)
+
+
+def _should_refresh_early(header: _LeaderboardHeader) -> bool:
+    """Probabilistic early expiration (XFetch): refresh sooner the costlier the build."""
+    gap = -header.build_seconds * _EARLY_REFRESH_BETA * math.log(1.0 - random.random())
+    return time.time() + gap >= header.expires_at
+
+
+def _wait_for_leader(event_id: int, revisions: LeaderboardRevisions) -> LeaderboardResponse | None:
+    deadline = time.monotonic() + _REBUILD_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(_REBUILD_POLL)
+        header, fragments = _read_cached_fragments(event_id, revisions)
+        if header is not None and len(fragments) == len(header.activity_ids):
+            return _assemble(header, fragments)
+    return None
+
+
+# ── Public API ───────────────────────────────────────────────────────────────
+
+
+def get_leaderboard(session: Session, event_id: int, wait_for_leader: bool = True) -> LeaderboardResponse:
+    """The event's full leaderboard, from cached fragments where they are current.
+
+    With ``wait_for_leader=False`` a caller that loses the rebuild lease and
+    has nothing stale to serve renders at once instead of polling for the
+    leader's result.
+    """
+    revisions = get_leaderboard_revisions(event_id)
+    if revisions is None:
+        event = session.get(Event, event_id)
+        if not event:
+            raise NotFoundException("Event", event_id)
+        return EventLeaderboard.build(session, event, None).render()
+
+    header, fragments = _read_cached_fragments(event_id, revisions)
+    complete = header is not None and len(fragments) == len(header.activity_ids)
+    if complete and not _should_refresh_early(header):
+        return _assemble(header, fragments)
+
+    with _rebuild_lease(event_id) as leader:
+        if not leader:
+            metrics.increment("leaderboard.rebuilds_coalesced")
+            if complete:
+                return _assemble(header, fragments)
+            stale = _read_stale(event_id)
+            if stale is not None:
+                metrics.increment("leaderboard.stale_served")
+                return stale
+            result = _wait_for_leader(event_id, revisions) if wait_for_leader else None
+            if result is not None:
+                return result
+            # The leader is slow or gone; fall through and render ourselves.
+        if complete:
+            metrics.increment("leaderboard.early_refreshes")
+            header, fragments = None, {}
+        with primary_session(session) as primary:
+            return _render_missing(primary, event_id, revisions, header, fragments)
+
+
+async def get_leaderboard_async(session: Session, event_id: int) -> LeaderboardResponse:
+    """``get_leaderboard`` for the asyncio request path.
+
+    Current cached fragments are read over the asyncio Redis client, on the
+    event loop. Misses and early refreshes run the sync implementation in the
+    threadpool with ``session``: rebuilds, its Redis calls and the engine
+    locks would otherwise stall every request on the loop.
+    """
+    revisions = await get_leaderboard_revisions_async(event_id)
+    if revisions is not None:
+        header, fragments = await _read_cached_fragments_async(event_id, revisions)
+        if header is not None and len(fragments) == len(header.activity_ids) and not _should_refresh_early(header):
+            return _assemble(header, fragments)
+    return await run_in_threadpool(get_leaderboard, session, event_id)
+
+
+async def get_leaderboard_slice_async(session: Session, event_id: int, slice_: LeaderboardFilter) -> LeaderboardResponse:
+    """``get_leaderboard_slice`` in the threadpool, for the asyncio request path."""
+    return await run_in_threadpool(get_leaderboard_slice, session, event_id, slice_)
+
+
+def _needs_snapshot(revisions: LeaderboardRevisions | None, since: int) -> bool:
+    """Whether a client at change version ``since`` must start over from a full leaderboard.
+
+    That is when it has no version yet, when the event's structure changed
+    after it (activities or buckets may be gone), or when its version is
+    ahead of the server's (the revisions were lost and restarted).
+    """
+    return (
+        revisions is None or since <= 0 or since > revisions.version or since < revisions.structure_version
+    )
+
+
+def _changed_since(revisions: LeaderboardRevisions, since: int) -> set[int]:
+    return {aid for aid, version in revisions.activity_versions.items() if version > since}
+
+
+def _changes(
+    event_id: int, since: int, revisions: LeaderboardRevisions | None, response: LeaderboardResponse | None,
+) -> LeaderboardChanges:
+    version = revisions.version if revisions is not None else 0
+    if _needs_snapshot(revisions, since):
+        metrics.increment("leaderboard.delta_snapshots")
+        return LeaderboardChanges(event_id=event_id, version=version, full=True, leaderboard=response)
+    changed = _changed_since(revisions, since)
+    activities = [a for a in response.activities if a.activity_id in changed] if response is not None else []
+    metrics.increment("leaderboard.delta_reads")
+    return LeaderboardChanges(event_id=event_id, version=version, full=False, activities=activities)
+
+
+def _check_unsliced(slice_: LeaderboardFilter | None) -> None:
+    if slice_ is not None and slice_ != LeaderboardFilter():
+        raise ValidationException("since cannot be combined with activity, gender, age category or top filters")
+
+
+def get_leaderboard_changes(
+    session: Session, event_id: int, since: int, slice_: LeaderboardFilter | None = None,
+) -> LeaderboardChanges:
+    """The parts of an event's leaderboard that changed after change version ``since``.
+
+    The version is read before rendering, so what is sent is at least that
+    recent; a change racing the read is sent again on the next poll rather
+    than lost. Nothing is rendered when no activity changed. Deltas cover
+    whole leaderboards, so slice filters are rejected.
+    """
+    _check_unsliced(slice_)
+    revisions = get_leaderboard_revisions(event_id)
+    response = None
+    if _needs_snapshot(revisions, since) or _changed_since(revisions, since):
+        response = get_leaderboard(session, event_id)
+    return _changes(event_id, since, revisions, response)
+
+
+async def get_leaderboard_changes_async(
+    session: Session, event_id: int, since: int, slice_: LeaderboardFilter | None = None,
+) -> LeaderboardChanges:
+    """``get_leaderboard_changes`` for the asyncio request path."""
+    _check_unsliced(slice_)
+    revisions = await get_leaderboard_revisions_async(event_id)
+    response = None
+    if _needs_snapshot(revisions, since) or _changed_since(revisions, since):
+        response = await get_leaderboard_async(session, event_id)
+    return _changes(event_id, since, revisions, response)
+
+
+def _render_missing(
+    session: Session,
+    event_id: int,
+    revisions: LeaderboardRevisions,
+    header: _LeaderboardHeader | None,
+    fragments: dict[int, ActivityLeaderboard],
+) -> LeaderboardResponse:
+    started = time.perf_counter()
+    engine = _current_engine(session, event_id, revisions)
+    with engine.lock:
+        if header is None or not set(header.activity_ids) <= set(engine.activity_ids):
+            header, fragments = engine.header(), {}
+        rendered = {
+            aid: engine.render_activity(aid) for aid in header.activity_ids if aid not in fragments
+        }
+    header = header.model_copy(update={
+        "expires_at": time.time() + _CACHE_TTL,
+        "build_seconds": time.perf_counter() - started,
+    })
+    result = _assemble(header, {**fragments, **rendered})
+    _write_cached_fragments(event_id, revisions, header, rendered, result)
+    return result
+
+
+def get_leaderboard_slice(session: Session, event_id: int, slice_: LeaderboardFilter) -> LeaderboardResponse:
+    """Only the requested activity / bucket / podium of an event's leaderboard.
+
+    Served from this worker's engine when it is current; otherwise from one
+    query that ranks only the requested records in the database.
+    """
+    revisions = get_leaderboard_revisions(event_id)
+    engine = None
+    if revisions is not None:
+        with primary_session(session) as primary:
+            engine = _synced_engine(primary, event_id, revisions)
+    if engine is not None:
+        with engine.lock:
+            activity_ids = engine.activity_ids
+            if slice_.activity_id is not None:
+                if slice_.activity_id not in activity_ids:
+                    raise NotFoundException("Activity", slice_.activity_id)
+                activity_ids = [slice_.activity_id]
+            header = engine.header()
+            return LeaderboardResponse(
+                event_id=header.event_id, event_name=header.event_name,
+                has_age_categories=header.has_age_categories,
+                activities=[engine.render_activity(aid, slice_) for aid in activity_ids],
+            )
 
     event = session.get(Event, event_id)
     if not event:
         raise NotFoundException("Event", event_id)
-
-    activities, age_categories, has_age_categories, participant_map, records_by_activity = (
-        _load_event_data(session, event_id)
-    )
+    activity_stmt = select(Activity).where(Activity.event_id == event_id)
+    if slice_.activity_id is not None:
+        activity_stmt = activity_stmt.where(Activity.id == slice_.activity_id)
+    activities = session.exec(activity_stmt).all()
+    if slice_.activity_id is not None and not activities:
+        raise NotFoundException("Activity", slice_.activity_id)
+    age_categories = list(session.exec(select(AgeCategory).where(AgeCategory.event_id == event_id)).all())
+    has_age_categories = len(age_categories) > 0
     cat_order: dict[str, int] = {cat.name: cat.min_age for cat in age_categories}
 
-    activity_leaderboards: list[ActivityLeaderboard] = []
+    rows = session.execute(
+        _ranked_records(event_id, age_categories, has_age_categories, [a.id for a in activities], slice_)
+    ).all()
+    buckets: dict[int, dict[tuple[str, str], list[ParticipantRank]]] = {a.id: {} for a in activities}
+    for row in rows:
+        buckets[row.activity_id].setdefault((row.gender, row.age_category), []).append(ParticipantRank(
+            rank=row.rank, participant_id=row.participant_id, display_name=row.display_name,
+            gender=row.participant_gender, age=row.age, value=row.value_raw, group_name=row.group_name,
+        ))
 
+    activity_leaderboards: list[ActivityLeaderboard] = []
     for activity in activities:
-        ranked_buckets = _bucket_and_rank(
-            records_by_activity[activity.id], activity,
-            age_categories, has_age_categories, participant_map,
-        )
-
-        category_rankings: list[CategoryRanking] = []
-        for (gender, age_cat_name), ranked_entries in ranked_buckets.items():
-            category_rankings.append(
-                CategoryRanking(
-                    gender=gender, age_category_name=age_cat_name,
-                    participants=[
-                        ParticipantRank(
-                            rank=e.rank, participant_id=e.participant.id,
-                            display_name=e.participant.display_name,
-                            gender=e.participant.gender, age=e.participant.age,
-                            value=e.value_raw, group_name=e.group_name,
-                        )
-                        for e in ranked_entries
-                    ],
-                )
-            )
+        category_rankings = [
+            CategoryRanking(gender=gender, age_category_name=age_cat_name, participants=participants)
+            for (gender, age_cat_name), participants in buckets[activity.id].items()
+        ]
         category_rankings.sort(key=lambda c: (c.gender, cat_order.get(c.age_category_name, 9999)))
         activity_leaderboards.append(
             ActivityLeaderboard(
@@ -187,47 +844,101 @@ def get_leaderboard(session: Session, event_id: int) -> LeaderboardResponse:
                 evaluation_type=activity.evaluation_type, categories=category_rankings,
             )
         )
-
-    result = LeaderboardResponse(
+    return LeaderboardResponse(
         event_id=event.id, event_name=event.name,
         has_age_categories=has_age_categories, activities=activity_leaderboards,
     )
-    try:
-        if redis_client:
-            redis_client.setex(f"leaderboard:{event_id}", 300, result.model_dump_json())
-    except Exception:
-        logger.warning("Failed to write leaderboard cache for event %s", event_id)
-    return result
 
 
-def export_csv(session: Session, event_id: int) -> str:
-    event = session.get(Event, event_id)
-    if not event:
-        raise NotFoundException("Event", event_id)
+def apply_record_changes(event_id: int, activity_id: int, changes: dict[int, str | None]) -> None:
+    """Fold committed record writes of one activity into the leaderboard.
 
-    activities, age_categories, has_age_categories, participant_map, records_by_activity = (
-        _load_event_data(session, event_id)
-    )
+    ``changes`` maps participant id to the new ``value_raw``, or ``None`` for a
+    deleted record. Only the activity's revision is bumped, so other activities
+    stay cached on every replica; this worker's engine is updated in place when
+    it was current, touching only the affected buckets.
+    """
+    _fold_record_changes(event_id, activity_id, changes, bump_leaderboard_revision(event_id, activity_id))
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["rank", "podium", "activity", "gender", "age_category", "participant_name", "group_name", "age", "score"])
 
-    for activity in activities:
-        ranked_buckets = _bucket_and_rank(
-            records_by_activity[activity.id], activity,
-            age_categories, has_age_categories, participant_map,
+async def apply_record_changes_async(event_id: int, activity_id: int, changes: dict[int, str | None]) -> None:
+    """``apply_record_changes`` with the revision bumped over the asyncio Redis client."""
+    revision = await bump_leaderboard_revision_async(event_id, activity_id)
+    # The engine lock may be held by a rebuild; wait for it off the event loop.
+    await run_in_threadpool(_fold_record_changes, event_id, activity_id, changes, revision)
+
+
+def _fold_record_changes(
+    event_id: int, activity_id: int, changes: dict[int, str | None], revision: int | None,
+) -> None:
+    engine = _get_engine(event_id)
+    if engine is None:
+        return
+    with engine.lock:
+        if revision is not None:
+            if engine.activity_revisions.get(activity_id, 0) != revision - 1:
+                return  # another worker moved it first; the next read reloads this activity
+            if engine.apply(activity_id, changes):
+                engine.activity_revisions[activity_id] = revision
+                return
+    _drop_engine(event_id)
+
+
+_CSV_HEADER = ["rank", "podium", "activity", "gender", "age_category", "participant_name", "group_name", "age", "score"]
+_CSV_CHUNK_SIZE = 64 * 1024
+_CSV_YIELD_PER = 1000
+
+
+def export_csv(session: Session, event_id: int) -> Iterator[str]:
+    """Stream the ranked results of an event as CSV text chunks.
+
+    The event is checked up front so a missing one still yields a 404.
+    Records come ranked from the database through a server-side cursor, so
+    nothing but the activity names is held in memory. Chunks are
+    flushed every ``_CSV_CHUNK_SIZE`` characters and after each activity.
+    """
+    event = session.get(Event, event_id)
+    if not event:
+        raise NotFoundException("Event", event_id)
+    return _iter_csv(session.get_bind(), event_id)
+
+
+def _iter_csv(bind, event_id: int) -> Iterator[str]:
+    # The request session is closed before the response body is iterated,
+    # so the generator owns a session of its own.
+    with Session(bind) as session:
+        age_categories = list(session.exec(select(AgeCategory).where(AgeCategory.event_id == event_id)).all())
+        has_age_categories = len(age_categories) > 0
+        activities = {
+            a.id: a for a in session.exec(select(Activity).where(Activity.event_id == event_id)).all()
+        }
+
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(_CSV_HEADER)
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+
+        rows = session.execute(
+            _ranked_records(event_id, age_categories, has_age_categories)
+            .execution_options(yield_per=_CSV_YIELD_PER)
         )
-        is_time = activity.evaluation_type == EvaluationType.TIME_LOW
-        for (_gender, _age_cat), ranked_entries in sorted(ranked_buckets.items()):
-            for e in ranked_entries:
-                podium = {1: "Gold", 2: "Silver", 3: "Bronze"}.get(e.rank, "")
-                score = format_seconds(e.value_raw) if is_time else e.value_raw
+        for activity_id, activity_rows in groupby(rows, key=lambda r: r.activity_id):
+            activity = activities[activity_id]
+            is_time = activity.evaluation_type == EvaluationType.TIME_LOW
+            for row in activity_rows:
+                podium = {1: "Gold", 2: "Silver", 3: "Bronze"}.get(row.rank, "")
+                score = format_seconds(row.value_numeric) if is_time else row.value_raw
                 writer.writerow([
-                    e.rank, podium, activity.name, e.gender, e.age_category_name,
-                    e.participant.display_name, e.group_name,
-                    e.participant.age if e.participant.age is not None else "", score,
+                    row.rank, podium, activity.name, row.gender, row.age_category,
+                    row.display_name, row.group_name, row.age if row.age is not None else "", score,
                 ])
-
-    output.seek(0)
-    return output.getvalue()
+                if output.tell() >= _CSV_CHUNK_SIZE:
+                    yield output.getvalue()
+                    output.seek(0)
+                    output.truncate()
+            if output.tell():
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
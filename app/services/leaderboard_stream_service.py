@@ -0,0 +1,256 @@
+"""Live leaderboards for scoreboard screens, pushed over Server-Sent Events.
+
+Every leaderboard revision bump is announced on the event's Redis channel
+(see ``common.announce_leaderboard_change``). Each API worker that has
+streaming clients subscribes to those channels once and keeps one feed per
+event. A burst of changes is coalesced for ``_COALESCE_SECONDS``. The feed
+then renders the leaderboard once, through the usual fragment cache, and
+compares each activity with what it last sent. Clients receive only the
+activities whose rendering changed, and nothing at all when no ranking
+moved. A full snapshot is sent on connect, after structural changes (the
+activity list or header changed), and to clients that fell too far behind.
+Renders run in the threadpool on the primary, in sessions of the feed's own,
+so nothing blocking happens on the event loop.
+
+SSE events:
+
+- ``snapshot`` — a full ``LeaderboardResponse``
+- ``activity`` — one ``ActivityLeaderboard`` that replaces the client's copy
+- ``deleted`` — the event is gone; the stream ends
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core import metrics
+from app.core.exceptions import NotFoundException
+from app.core.redis_client import async_redis_client
+from app.schemas.leaderboard import LeaderboardResponse
+from app.services import leaderboard_service
+from app.services.common import LEADERBOARD_CHANNEL_PATTERN, add_leaderboard_listener, parse_leaderboard_change
+
+logger = logging.getLogger(__name__)
+
+_COALESCE_SECONDS = 0.25
+_HEARTBEAT_SECONDS = 15.0
+_CLIENT_QUEUE_SIZE = 64
+_RESUBSCRIBE_MAX_SECONDS = 30.0
+
+# (SSE event name, JSON data); ``None`` ends the stream.
+_Message = tuple[str, str] | None
+
+
+@dataclass(eq=False)
+class _Subscriber:
+    event_id: int
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(_CLIENT_QUEUE_SIZE))
+
+    def send(self, message: _Message, snapshot: str | None) -> None:
+        """Queue a message; a client that fell behind gets the latest snapshot instead."""
+        try:
+            self.queue.put_nowait(message)
+            return
+        except asyncio.QueueFull:
+            pass
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(("snapshot", snapshot) if message is not None and snapshot is not None else message)
+        metrics.increment("leaderboard.stream_resyncs")
+
+
+class _EventFeed:
+    """Streaming clients of one event on this worker, and what they were last sent."""
+
+    def __init__(self, event_id: int, bind: Engine):
+        self.event_id = event_id
+        self.bind = bind
+        self.loop = asyncio.get_running_loop()
+        self.subscribers: set[_Subscriber] = set()
+        self.pending = False
+        self.flush_task: asyncio.Task | None = None
+        self.header: tuple | None = None
+        self.activities: dict[int, str] = {}
+        self.snapshot: str | None = None
+
+    def seed(self, response: LeaderboardResponse) -> None:
+        if self.header is None:
+            self._remember(response)
+
+    def _remember(self, response: LeaderboardResponse) -> None:
+        self.header = (response.event_name, response.has_age_categories, [a.activity_id for a in response.activities])
+        self.activities = {a.activity_id: a.model_dump_json() for a in response.activities}
+        self.snapshot = response.model_dump_json()
+
+    def notify(self) -> None:
+        self.pending = True
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = self.loop.create_task(self._flush())
+
+    def broadcast(self, message: _Message) -> None:
+        for subscriber in list(self.subscribers):
+            subscriber.send(message, self.snapshot)
+
+    async def _flush(self) -> None:
+        while self.pending and self.subscribers:
+            await asyncio.sleep(_COALESCE_SECONDS)
+            self.pending = False
+            try:
+                response = await run_in_threadpool(_render, self.bind, self.event_id)
+            except NotFoundException:
+                self.broadcast(("deleted", "{}"))
+                self.broadcast(None)
+                return
+            except Exception:
+                logger.warning("Failed to render live leaderboard for event %s", self.event_id, exc_info=True)
+                continue
+            self._publish(response)
+
+    def _publish(self, response: LeaderboardResponse) -> None:
+        previous_header, previous = self.header, self.activities
+        self._remember(response)
+        if self.header != previous_header:
+            self.broadcast(("snapshot", self.snapshot))
+            metrics.increment("leaderboard.stream_snapshots")
+            return
+        changed = [aid for aid, fragment in self.activities.items() if previous.get(aid) != fragment]
+        if not changed:
+            metrics.increment("leaderboard.stream_unchanged")
+        for aid in changed:
+            self.broadcast(("activity", self.activities[aid]))
+        metrics.increment("leaderboard.stream_deltas", len(changed))
+
+
+def _render(bind: Engine, event_id: int) -> LeaderboardResponse:
+    with Session(bind) as session:
+        return leaderboard_service.get_leaderboard(session, event_id)
+
+
+_feeds: dict[int, _EventFeed] = {}
+_listener_task: asyncio.Task | None = None
+
+
+def _on_change(event_id: int, _activity_id: int | None = None) -> None:
+    """Mark an event's feed dirty; safe to call from any thread."""
+    feed = _feeds.get(event_id)
+    if feed is not None:
+        feed.loop.call_soon_threadsafe(feed.notify)
+
+
+# Changes made by this process reach the feeds directly when Redis is unavailable.
+add_leaderboard_listener(_on_change)
+
+
+async def _listen() -> None:
+    """Fan Redis change notifications out to this worker's feeds, resubscribing on failure."""
+    delay = 1.0
+    while True:
+        pubsub = async_redis_client.pubsub()
+        try:
+            await pubsub.psubscribe(LEADERBOARD_CHANNEL_PATTERN)
+            delay = 1.0
+            # Anything published while we were not subscribed was missed.
+            for event_id in list(_feeds):
+                _on_change(event_id)
+            async for message in pubsub.listen():
+                if message["type"] == "pmessage":
+                    _on_change(*parse_leaderboard_change(message["channel"], message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("Leaderboard change subscription failed; retrying in %.0fs", delay)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, _RESUBSCRIBE_MAX_SECONDS)
+
+
+def _ensure_listener() -> None:
+    global _listener_task
+    if async_redis_client and (_listener_task is None or _listener_task.done()):
+        _listener_task = asyncio.get_running_loop().create_task(_listen())
+
+
+def _subscribe(bind: Engine, event_id: int) -> _Subscriber:
+    _ensure_listener()
+    feed = _feeds.get(event_id)
+    if feed is None:
+        feed = _feeds[event_id] = _EventFeed(event_id, bind)
+    subscriber = _Subscriber(event_id)
+    feed.subscribers.add(subscriber)
+    metrics.adjust_gauge("leaderboard.stream_clients", 1)
+    return subscriber
+
+
+def _unsubscribe(subscriber: _Subscriber) -> None:
+    feed = _feeds.get(subscriber.event_id)
+    if feed is None or subscriber not in feed.subscribers:
+        return
+    feed.subscribers.discard(subscriber)
+    metrics.adjust_gauge("leaderboard.stream_clients", -1)
+    if not feed.subscribers:
+        del _feeds[subscriber.event_id]
+        if feed.flush_task is not None:
+            feed.flush_task.cancel()
+
+
+def _format(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def _events(subscriber: _Subscriber, snapshot: LeaderboardResponse) -> AsyncIterator[str]:
+    try:
+        yield _format("snapshot", snapshot.model_dump_json())
+        while True:
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), _HEARTBEAT_SECONDS)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if message is None:
+                return
+            yield _format(*message)
+    finally:
+        _unsubscribe(subscriber)
+
+
+async def open_stream(session: Session, event_id: int) -> AsyncIterator[str]:
+    """Subscribe to an event's leaderboard; returns the SSE text stream.
+
+    ``session`` must be a primary session; the event's feed keeps rendering
+    through its engine. The client is registered before the first snapshot
+    is rendered, so no change can fall between the two. A missing event
+    raises here, before the response starts.
+    """
+    subscriber = _subscribe(session.get_bind(), event_id)
+    try:
+        snapshot = await leaderboard_service.get_leaderboard_async(session, event_id)
+    except BaseException:
+        _unsubscribe(subscriber)
+        raise
+    feed = _feeds.get(event_id)
+    if feed is not None:
+        feed.seed(snapshot)
+    return _events(subscriber, snapshot)
+
+
+async def shutdown() -> None:
+    """End every open stream and stop listening for changes."""
+    global _listener_task
+    for feed in list(_feeds.values()):
+        feed.broadcast(None)
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except BaseException:
+            pass
+        _listener_task = None
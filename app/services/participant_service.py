@@ -6,7 +6,7 @@ from app.core.exceptions import NotFoundException, ValidationException
 from app.models.group import Group
 from app.models.participant import Participant
 from app.schemas.participant import ParticipantCreate, ParticipantMoveRequest, ParticipantRead, ParticipantUpdate
-from app.services.common import get_or_404, invalidate_leaderboard_cache
+from app.services.common import get_or_404, invalidate_leaderboard_cache, resolve_age_category
 
 
 def _event_id_for_group(session: Session, group_id: int) -> int | None:
@@ -15,14 +15,16 @@ def _event_id_for_group(session: Session, group_id: int) -> int | None:
 
 
 def add_participant(session: Session, group_id: int, body: ParticipantCreate) -> ParticipantRead:
-    get_or_404(session, Group, group_id, "Group")
+    group = get_or_404(session, Group, group_id, "Group")
     participant = Participant(
         display_name=body.display_name, external_id=body.external_id,
         gender=body.gender, age=body.age, group_id=group_id,
+        age_category_id=resolve_age_category(session, group.event_id, body.age),
     )
     session.add(participant)
     session.commit()
     session.refresh(participant)
+    invalidate_leaderboard_cache(group.event_id)
     return ParticipantRead.model_validate(participant)
 
 
@@ -36,6 +38,9 @@ def update_participant(session: Session, participant_id: int, body: ParticipantU
         participant.gender = body.gender
     if body.age is not None:
         participant.age = body.age
+        participant.age_category_id = resolve_age_category(
+            session, _event_id_for_group(session, participant.group_id), body.age,
+        )
     session.add(participant)
     session.commit()
     session.refresh(participant)
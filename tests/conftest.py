@@ -1,19 +1,25 @@
 """
 Shared pytest fixtures.
 
-Uses an in-memory SQLite engine so tests have no dependency on PostgreSQL.
-The `get_session` dependency is overridden in the FastAPI app for every test.
+Uses a throwaway SQLite database so tests have no dependency on PostgreSQL.
+The `get_session` and `get_async_session` dependencies are overridden in the
+FastAPI app for every test; both engines open the same file.
 """
 
 import os
 os.environ.setdefault("SECRET_KEY", "test-secret-key-for-pytest-runs-01")
 os.environ.setdefault("REDIS_URL", "")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")  # minimum bcrypt cost keeps the suite fast
+os.environ.setdefault("AUDIT_MAINTENANCE_INTERVAL_HOURS", "0")  # no background retention job per TestClient
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, SQLModel, create_engine
-from sqlmodel.pool import StaticPool
-from app.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_async_session, get_session
 from app.main import app
 from app.core.limiter import limiter
 
@@ -33,26 +39,103 @@ def reset_rate_limiter():
     yield
 
 
+@pytest.fixture(autouse=True)
+def reset_service_state():
+    """Drop per-process caches between tests.
+
+    Every test gets a fresh SQLite database, so ids are reused and a leaderboard
+    engine, cached user or authorization scope left over from a previous test
+    would otherwise look current.
+    """
+    from app.core import audit, authorization, user_cache
+    from app.services import common, import_service, leaderboard_service, leaderboard_stream_service, ocr_service
+
+    leaderboard_service._engines.clear()
+    leaderboard_stream_service._feeds.clear()
+    common._local_revisions.clear()
+    ocr_service._local_results.clear()
+    import_service._local_jobs.clear()
+    import_service._local_credentials.clear()
+    user_cache._local_users.clear()
+    authorization._scopes.clear()
+    authorization._local_revisions.clear()
+    audit._buffer.clear()
+    yield
+
+
+@pytest.fixture(name="fake_redis")
+def fake_redis_fixture(monkeypatch):
+    """Point the leaderboard services at one in-memory Redis server; returns its sync client.
+
+    The services bind the clients at import time, so each module is patched,
+    and the revision bump script is registered again on the fake clients.
+    """
+    # fakeredis is a declared dev dependency: a missing install must fail the Redis tests, not skip them.
+    try:
+        import fakeredis
+    except ImportError:
+        pytest.fail("fakeredis is not installed; pip install -r requirements-dev.txt")
+    from app.services import common, leaderboard_service, leaderboard_stream_service
+
+    server = fakeredis.FakeServer()
+    sync_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    async_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    for module in (common, leaderboard_service):
+        monkeypatch.setattr(module, "redis_client", sync_client)
+        monkeypatch.setattr(module, "async_redis_client", async_client)
+    monkeypatch.setattr(leaderboard_stream_service, "async_redis_client", async_client)
+    monkeypatch.setattr(common, "_bump_script", sync_client.register_script(common._BUMP_SCRIPT))
+    monkeypatch.setattr(common, "_bump_script_async", async_client.register_script(common._BUMP_SCRIPT))
+    return sync_client
+
+
+@pytest.fixture(name="db_path", scope="function")
+def db_path_fixture(tmp_path):
+    return tmp_path / "test.db"
+
+
 @pytest.fixture(name="engine", scope="function")
-def engine_fixture():
-    """Fresh in-memory SQLite engine for each test."""
+def engine_fixture(db_path):
+    """Fresh SQLite database for each test.
+
+    A pool of connections rather than one shared connection, so that import
+    jobs running in worker threads keep their transaction to themselves.
+    """
     engine = create_engine(
-        "sqlite://",
+        f"sqlite:///{db_path}",
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
     )
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _record):
+        # WAL lets the async engine's connections write while this one reads.
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+        dbapi_conn.execute("PRAGMA synchronous=OFF")
+
     SQLModel.metadata.create_all(engine)
     yield engine
     SQLModel.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture(name="async_engine", scope="function")
+def async_engine_fixture(engine, db_path):
+    """aiosqlite engine on the same database; NullPool since each TestClient runs its own loop."""
+    return create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
 
 
 @pytest.fixture(name="client", scope="function")
-def client_fixture(engine):
+def client_fixture(engine, async_engine):
     def override_get_session():
         with Session(engine) as session:
             yield session
 
+    async def override_get_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_async_session] = override_get_async_session
     with TestClient(app, raise_server_exceptions=True) as client:
         yield client
     app.dependency_overrides.clear()
@@ -108,3 +191,17 @@ def evaluator_token_fixture(client, admin_token, engine):
 
 def auth_headers(token: str) -> dict:
     return {"Authorization": f"Bearer {token}"}
+
+
+def wait_for_import(client: TestClient, token: str, resp) -> dict:
+    """Poll the import job queued by a POST /events/import response until it finishes."""
+    import time
+
+    assert resp.status_code == 202, resp.text
+    job_id = resp.json()["job_id"]
+    for _ in range(250):
+        job = client.get(f"/events/import-jobs/{job_id}", headers=auth_headers(token)).json()
+        if job["status"] in ("DONE", "FAILED"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError("Import job did not finish")
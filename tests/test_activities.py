@@ -5,7 +5,7 @@ import io
 import pytest
 from fastapi.testclient import TestClient
 
-from tests.conftest import auth_headers
+from tests.conftest import auth_headers, wait_for_import
 
 
 CSV = b"display_name,group_name\nAlice,Group1\n"
@@ -18,7 +18,7 @@ def _import_event(client: TestClient, token: str) -> int:
         files={"file": ("p.csv", io.BytesIO(CSV), "text/csv")},
         data={"event_name": "Activity Test"},
     )
-    return resp.json()["event_id"]
+    return wait_for_import(client, token, resp)["result"]["event_id"]
 
 
 # ── Create activity ─────────────────────────────────────────────────────────
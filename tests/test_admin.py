@@ -74,6 +74,27 @@ def test_delete_user(client: TestClient, admin_token: str, evaluator_token: str,
     assert all(u["id"] != eval_user["id"] for u in users)
 
 
+def test_role_and_status_changes_apply_to_cached_principal(
+    client: TestClient, admin_token: str, evaluator_token: str, engine,
+):
+    """A user's principal is cached between requests, but admin changes take effect at once."""
+    _make_super_admin(engine, "admin@test.com")
+    sa = client.post("/auth/login", json={"email": "admin@test.com", "password": "Password1!"}).json()["access_token"]
+
+    eval_user = client.get("/auth/me", headers=auth_headers(evaluator_token)).json()
+    assert client.get("/admin/users", headers=auth_headers(evaluator_token)).status_code == 403
+
+    client.patch(f"/admin/users/{eval_user['id']}", headers=auth_headers(sa), json={"role": "ADMIN"})
+    assert client.get("/admin/users", headers=auth_headers(evaluator_token)).status_code == 200
+
+    client.patch(f"/admin/users/{eval_user['id']}", headers=auth_headers(sa), json={"is_active": False})
+    assert client.get("/auth/me", headers=auth_headers(evaluator_token)).json()["is_active"] is False
+    assert client.get("/admin/users", headers=auth_headers(evaluator_token)).status_code == 403
+
+    client.delete(f"/admin/users/{eval_user['id']}", headers=auth_headers(sa))
+    assert client.get("/auth/me", headers=auth_headers(evaluator_token)).status_code == 401
+
+
 def test_delete_user_requires_super_admin(client: TestClient, admin_token: str, evaluator_token: str):
     """A plain admin (not super admin) cannot delete users."""
     eval_user = client.get("/auth/me", headers=auth_headers(evaluator_token)).json()
@@ -217,3 +238,25 @@ def test_revoke_then_resend_fails(client: TestClient, admin_token: str):
 def test_invitation_not_found_404(client: TestClient, admin_token: str):
     resp = client.delete("/admin/invitations/9999", headers=auth_headers(admin_token))
     assert resp.status_code == 404
+
+
+# ── Metrics ─────────────────────────────────────────────────────────────────
+
+def test_metrics_counts_leaderboard_rebuilds(client: TestClient, admin_token: str):
+    event_id = client.post(
+        "/events/manual", headers=auth_headers(admin_token),
+        json={"name": "Metrics", "groups": [{"name": "G1", "participants": []}]},
+    ).json()["event_id"]
+    before = client.get("/admin/metrics", headers=auth_headers(admin_token)).json()["counters"]
+    client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token))
+    client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token))
+
+    resp = client.get("/admin/metrics", headers=auth_headers(admin_token))
+    assert resp.status_code == 200
+    after = resp.json()["counters"]
+    assert after["leaderboard.rebuilds"] == before.get("leaderboard.rebuilds", 0) + 1
+
+
+def test_metrics_non_admin_403(client: TestClient, evaluator_token: str):
+    resp = client.get("/admin/metrics", headers=auth_headers(evaluator_token))
+    assert resp.status_code == 403
@@ -5,7 +5,7 @@ import io
 import pytest
 from fastapi.testclient import TestClient
 
-from tests.conftest import auth_headers
+from tests.conftest import auth_headers, wait_for_import
 
 # All participants in a single group so one evaluator covers everyone
 VALID_CSV = b"display_name,group_name,age,gender\nAlice,Team1,20,F\nBob,Team1,25,M\nCarol,Team1,22,F\n"
@@ -13,12 +13,12 @@ VALID_CSV = b"display_name,group_name,age,gender\nAlice,Team1,20,F\nBob,Team1,25
 
 def _setup(client: TestClient, admin_token: str, eval_token: str, eval_type: str = "NUMERIC_LOW"):
     """Import event, create activity, assign evaluator, return (event_id, activity_id, participants)."""
-    event_id = client.post(
+    event_id = wait_for_import(client, admin_token, client.post(
         "/events/import",
         headers=auth_headers(admin_token),
         files={"file": ("p.csv", io.BytesIO(VALID_CSV), "text/csv")},
         data={"event_name": "LB Test"},
-    ).json()["event_id"]
+    ))["result"]["event_id"]
 
     event = client.get(f"/events/{event_id}", headers=auth_headers(admin_token)).json()
     group = event["groups"][0]
@@ -112,7 +112,746 @@ def test_export_csv_admin_200(client: TestClient, admin_token: str, evaluator_to
     assert "Alice" in resp.text
 
 
+def test_export_csv_gzip_ranked(client: TestClient, admin_token: str, evaluator_token: str):
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token)
+    client.post("/records/bulk", headers=auth_headers(evaluator_token), json={
+        "activity_id": activity_id,
+        "records": [
+            {"participant_id": participants["Alice"], "value_raw": "12"},
+            {"participant_id": participants["Carol"], "value_raw": "10"},
+            {"participant_id": participants["Bob"], "value_raw": "11"},
+        ],
+    })
+    resp = client.get(
+        f"/events/{event_id}/export-csv",
+        headers={**auth_headers(admin_token), "Accept-Encoding": "gzip"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    rows = [line.split(",") for line in resp.text.strip().splitlines()]
+    assert rows[0][0] == "rank"
+    assert [(r[0], r[1], r[3], r[5]) for r in rows[1:]] == [
+        ("1", "Gold", "F", "Carol"),
+        ("2", "Silver", "F", "Alice"),
+        ("1", "Gold", "M", "Bob"),
+    ]
+
+
+def test_time_scores_rank_by_seconds(client: TestClient, admin_token: str, evaluator_token: str, engine):
+    """'m:ss' times are normalized at write time and rank by seconds everywhere."""
+    from sqlmodel import Session, select
+
+    from app.models.record import Record
+
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token, "TIME_LOW")
+    client.post("/records/bulk", headers=auth_headers(evaluator_token), json={
+        "activity_id": activity_id,
+        "records": [
+            {"participant_id": participants["Alice"], "value_raw": "1:23.4"},
+            {"participant_id": participants["Carol"], "value_raw": "85"},
+            {"participant_id": participants["Bob"], "value_raw": "n/a"},
+        ],
+    })
+    with Session(engine) as session:
+        stored = dict(session.exec(select(Record.value_raw, Record.value_numeric)).all())
+    assert stored == {"1:23.4": 83.4, "85": 85.0, "n/a": None}
+
+    def female_order(data):
+        female_cat = next(c for c in data["activities"][0]["categories"] if c["gender"] == "F")
+        return [(p["display_name"], p["rank"]) for p in female_cat["participants"]]
+
+    # Ranked in SQL (cold slice), then by the in-memory engine.
+    url = f"/events/{event_id}/leaderboard?gender=F"
+    assert female_order(client.get(url, headers=auth_headers(admin_token)).json()) == [("Alice", 1), ("Carol", 2)]
+    full = client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token)).json()
+    assert female_order(full) == [("Alice", 1), ("Carol", 2)]
+
+    rows = [line.split(",") for line in client.get(
+        f"/events/{event_id}/export-csv", headers=auth_headers(admin_token),
+    ).text.strip().splitlines()[1:]]
+    # Times are exported as m:ss(.cc); values that are not a time export as "", as they always have.
+    assert [(r[0], r[5], r[8]) for r in rows] == [("1", "Alice", "1:23.40"), ("2", "Carol", "1:25"), ("1", "Bob", "")]
+
+
+def test_tied_scores_list_in_the_same_order_everywhere(client: TestClient, admin_token: str, evaluator_token: str):
+    """SQL ranking (cold slice, CSV) and the engine both list ties by participant id."""
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token, "NUMERIC_HIGH")
+    # Carol's record is written first, so record ids order the tie the other way round.
+    for name in ("Carol", "Alice"):
+        client.post("/records", headers=auth_headers(evaluator_token), json={
+            "activity_id": activity_id, "participant_id": participants[name], "value_raw": "10",
+        })
+    expected = sorted(["Alice", "Carol"], key=participants.get)
+
+    def female_names(data):
+        female_cat = next(c for c in data["activities"][0]["categories"] if c["gender"] == "F")
+        assert {p["rank"] for p in female_cat["participants"]} == {1}
+        return [p["display_name"] for p in female_cat["participants"]]
+
+    sliced = client.get(f"/events/{event_id}/leaderboard?gender=F", headers=auth_headers(admin_token)).json()
+    assert female_names(sliced) == expected
+    full = client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token)).json()
+    assert female_names(full) == expected
+    rows = [line.split(",") for line in client.get(
+        f"/events/{event_id}/export-csv", headers=auth_headers(admin_token),
+    ).text.strip().splitlines()[1:]]
+    assert [r[5] for r in rows if r[3] == "F"] == expected
+
+
+def test_export_csv_unknown_event_404(client: TestClient, admin_token: str):
+    resp = client.get("/events/9999/export-csv", headers=auth_headers(admin_token))
+    assert resp.status_code == 404
+
+
 def test_export_csv_non_admin_403(client: TestClient, admin_token: str, evaluator_token: str):
     event_id, _, _ = _setup(client, admin_token, evaluator_token)
     resp = client.get(f"/events/{event_id}/export-csv", headers=auth_headers(evaluator_token))
     assert resp.status_code == 403
+
+
+def test_leaderboard_incremental_updates(client: TestClient, admin_token: str, evaluator_token: str):
+    """Writes after a warm leaderboard are folded in without losing tie semantics."""
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token, "NUMERIC_HIGH")
+    client.post("/records/bulk", headers=auth_headers(evaluator_token), json={
+        "activity_id": activity_id,
+        "records": [
+            {"participant_id": participants["Alice"], "value_raw": "10"},
+            {"participant_id": participants["Carol"], "value_raw": "20"},
+        ],
+    })
+    client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token))
+
+    record = client.post("/records", headers=auth_headers(evaluator_token), json={
+        "participant_id": participants["Alice"], "activity_id": activity_id, "value_raw": "20",
+    }).json()
+    data = client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token)).json()
+    female_cat = next(c for c in data["activities"][0]["categories"] if c["gender"] == "F")
+    assert [(p["rank"], p["value"]) for p in female_cat["participants"]] == [(1, "20"), (1, "20")]
+
+    client.delete(f"/records/{record['id']}", headers=auth_headers(evaluator_token))
+    data = client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token)).json()
+    female_cat = next(c for c in data["activities"][0]["categories"] if c["gender"] == "F")
+    assert [p["display_name"] for p in female_cat["participants"]] == ["Carol"]
+
+
+def test_bucket_ranking_competition_ranks():
+    from app.models.activity import EvaluationType
+    from app.core.scoring import score_value
+    from app.services.leaderboard_service import BucketRanking, _sort_key
+
+    def key(v):
+        return _sort_key(score_value(v, EvaluationType.NUMERIC_HIGH), EvaluationType.NUMERIC_HIGH)
+
+    bucket = BucketRanking([(key("5"), 1), (key("9"), 2), (key("9"), 3), (key("x"), 4)])
+    assert list(bucket.ranked()) == [(1, 2), (1, 3), (3, 1), (4, 4)]
+    assert bucket.rank_of(key("7")) == 3
+
+    bucket.remove(key("9"), 2)
+    bucket.add(key("1"), 2)
+    assert list(bucket.ranked()) == [(1, 3), (2, 1), (3, 2), (4, 4)]
+
+
+def test_leaderboard_reloads_activity_changed_elsewhere(client: TestClient, admin_token: str, evaluator_token: str, engine):
+    """A write seen only through its activity revision (another replica) reloads that activity."""
+    from sqlmodel import Session, select
+
+    from app.models.record import Record
+    from app.services.common import bump_leaderboard_revision
+
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token, "NUMERIC_HIGH")
+    client.post("/records/bulk", headers=auth_headers(evaluator_token), json={
+        "activity_id": activity_id,
+        "records": [
+            {"participant_id": participants["Alice"], "value_raw": "10"},
+            {"participant_id": participants["Carol"], "value_raw": "20"},
+        ],
+    })
+    client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token))
+
+    with Session(engine) as session:
+        record = session.exec(select(Record).where(Record.participant_id == participants["Alice"])).one()
+        record.value_raw, record.value_numeric = "30", 30.0
+        session.add(record)
+        session.commit()
+    bump_leaderboard_revision(event_id, activity_id)
+
+    data = client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token)).json()
+    female_cat = next(c for c in data["activities"][0]["categories"] if c["gender"] == "F")
+    assert [p["display_name"] for p in female_cat["participants"]] == ["Alice", "Carol"]
+
+
+
+@pytest.mark.parametrize("redis", [False, True], ids=["local", "redis"])
+def test_leaderboard_follows_event_rename(
+    client: TestClient, admin_token: str, evaluator_token: str, request, redis: bool,
+):
+    """Renaming an event shows in the full and the sliced leaderboard, even after more records."""
+    if redis:
+        request.getfixturevalue("fake_redis")
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token)
+    client.post("/records/bulk", headers=auth_headers(evaluator_token), json={
+        "activity_id": activity_id,
+        "records": [{"participant_id": participants["Alice"], "value_raw": "10"}],
+    })
+    data = client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token)).json()
+    assert data["event_name"] == "LB Test"
+
+    resp = client.patch(f"/events/{event_id}", headers=auth_headers(admin_token), json={"name": "Renamed"})
+    assert resp.status_code == 200
+    client.post("/records/bulk", headers=auth_headers(evaluator_token), json={
+        "activity_id": activity_id,
+        "records": [{"participant_id": participants["Bob"], "value_raw": "20"}],
+    })
+
+    full = client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token)).json()
+    sliced = client.get(
+        f"/events/{event_id}/leaderboard?activity_id={activity_id}", headers=auth_headers(admin_token),
+    ).json()
+    assert full["event_name"] == sliced["event_name"] == "Renamed"
+
+PODIUM_CSV = (
+    b"display_name,group_name,age,gender\n"
+    b"Alice,Team1,20,F\nBeth,Team1,21,F\nCarol,Team1,22,F\nDana,Team1,23,F\nBob,Team1,25,M\n"
+)
+
+
+def _setup_podium(client: TestClient, admin_token: str):
+    event_id = wait_for_import(client, admin_token, client.post(
+        "/events/import",
+        headers=auth_headers(admin_token),
+        files={"file": ("p.csv", io.BytesIO(PODIUM_CSV), "text/csv")},
+        data={"event_name": "Podium"},
+    ))["result"]["event_id"]
+    group = client.get(f"/events/{event_id}", headers=auth_headers(admin_token)).json()["groups"][0]
+    ids = {p["display_name"]: p["id"] for p in group["participants"]}
+    activity_ids = [
+        client.post("/activities", headers=auth_headers(admin_token), json={
+            "name": name, "evaluation_type": "NUMERIC_HIGH", "event_id": event_id,
+        }).json()["id"]
+        for name in ("Jump", "Throw")
+    ]
+    for activity_id in activity_ids:
+        client.post("/records/bulk", headers=auth_headers(admin_token), json={
+            "activity_id": activity_id,
+            "records": [
+                {"participant_id": ids["Alice"], "value_raw": "9"},
+                {"participant_id": ids["Beth"], "value_raw": "8"},
+                {"participant_id": ids["Carol"], "value_raw": "7"},
+                {"participant_id": ids["Dana"], "value_raw": "7"},
+                {"participant_id": ids["Bob"], "value_raw": "5"},
+            ],
+        })
+    return event_id, activity_ids
+
+
+def test_leaderboard_slice_top_keeps_ties(client: TestClient, admin_token: str):
+    event_id, (jump_id, _throw_id) = _setup_podium(client, admin_token)
+    url = f"/events/{event_id}/leaderboard?activity_id={jump_id}&gender=F&top=3"
+
+    cold = client.get(url, headers=auth_headers(admin_token))
+    assert cold.status_code == 200
+    data = cold.json()
+    assert [a["activity_id"] for a in data["activities"]] == [jump_id]
+    categories = data["activities"][0]["categories"]
+    assert [c["gender"] for c in categories] == ["F"]
+    assert [(p["display_name"], p["rank"]) for p in categories[0]["participants"]] == [
+        ("Alice", 1), ("Beth", 2), ("Carol", 3), ("Dana", 3),
+    ]
+
+    # Once the full leaderboard warms the engine, the slice is served from it.
+    client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token))
+    assert client.get(url, headers=auth_headers(admin_token)).json() == data
+
+
+def test_leaderboard_slice_unknown_activity_404(client: TestClient, admin_token: str):
+    event_id, _ = _setup_podium(client, admin_token)
+    resp = client.get(f"/events/{event_id}/leaderboard?activity_id=9999", headers=auth_headers(admin_token))
+    assert resp.status_code == 404
+
+
+def test_age_category_mapping_follows_changes(client: TestClient, admin_token: str, evaluator_token: str):
+    """Leaderboard buckets follow category and age edits through the stored mapping."""
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token, "NUMERIC_HIGH")
+    client.post("/records/bulk", headers=auth_headers(evaluator_token), json={
+        "activity_id": activity_id,
+        "records": [
+            {"participant_id": participants["Alice"], "value_raw": "5"},
+            {"participant_id": participants["Carol"], "value_raw": "7"},
+        ],
+    })
+    base_url = f"/events/{event_id}/age-categories"
+
+    def female_buckets():
+        data = client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token)).json()
+        return {
+            c["age_category_name"]: [p["display_name"] for p in c["participants"]]
+            for c in data["activities"][0]["categories"] if c["gender"] == "F"
+        }
+
+    assert female_buckets() == {"All": ["Carol", "Alice"]}
+    young = client.post(base_url, headers=auth_headers(admin_token), json={"name": "U21", "min_age": 0, "max_age": 20}).json()
+    client.post(base_url, headers=auth_headers(admin_token), json={"name": "Adult", "min_age": 21, "max_age": 99})
+    assert female_buckets() == {"U21": ["Alice"], "Adult": ["Carol"]}
+
+    client.patch(f"/participants/{participants['Alice']}", headers=auth_headers(admin_token), json={"age": 30})
+    assert female_buckets() == {"Adult": ["Carol", "Alice"]}
+
+    client.patch(f"{base_url}/{young['id']}", headers=auth_headers(admin_token), json={"max_age": 40})
+    assert female_buckets() == {"U21": ["Carol", "Alice"]}
+
+    client.delete(f"{base_url}/{young['id']}", headers=auth_headers(admin_token))
+    assert female_buckets() == {"Adult": ["Carol", "Alice"]}
+
+    slice_ = client.get(
+        f"/events/{event_id}/leaderboard?age_category=Adult&top=1", headers=auth_headers(admin_token),
+    ).json()
+    assert [p["display_name"] for c in slice_["activities"][0]["categories"] for p in c["participants"]] == ["Carol"]
+
+
+def test_deleting_an_age_category_reassigns_its_participants(
+    client: TestClient, admin_token: str, evaluator_token: str, engine,
+):
+    from sqlalchemy import delete
+    from sqlmodel import Session, select
+
+    from app.models.age_category import AgeCategory
+    from app.models.participant import Participant
+
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token, "NUMERIC_HIGH")
+    client.post("/records/bulk", headers=auth_headers(evaluator_token), json={
+        "activity_id": activity_id,
+        "records": [
+            {"participant_id": participants["Alice"], "value_raw": "5"},
+            {"participant_id": participants["Carol"], "value_raw": "7"},
+        ],
+    })
+    base_url = f"/events/{event_id}/age-categories"
+    junior = client.post(base_url, headers=auth_headers(admin_token),
+                         json={"name": "Junior", "min_age": 0, "max_age": 21}).json()["id"]
+    adult = client.post(base_url, headers=auth_headers(admin_token),
+                        json={"name": "Adult", "min_age": 18, "max_age": 99}).json()["id"]
+
+    def assigned() -> dict[str, int | None]:
+        with Session(engine) as session:
+            rows = session.exec(select(Participant).where(Participant.id.in_(participants.values()))).all()
+            return {p.display_name: p.age_category_id for p in rows}
+
+    assert assigned() == {"Alice": junior, "Bob": adult, "Carol": adult}
+
+    # Like migrated databases (014), the schema nulls references to a deleted category.
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+        conn.commit()
+        try:
+            conn.execute(delete(AgeCategory).where(AgeCategory.id == junior))
+            alice = conn.execute(
+                select(Participant.age_category_id).where(Participant.id == participants["Alice"])
+            ).scalar_one()
+            assert alice is None
+        finally:
+            conn.rollback()
+            conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            conn.commit()
+
+    assert client.delete(f"{base_url}/{junior}", headers=auth_headers(admin_token)).status_code == 204
+    assert assigned() == {"Alice": adult, "Bob": adult, "Carol": adult}
+    data = client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(admin_token)).json()
+    female = next(c for c in data["activities"][0]["categories"] if c["gender"] == "F")
+    assert female["age_category_name"] == "Adult"
+    assert [p["display_name"] for p in female["participants"]] == ["Carol", "Alice"]
+
+
+async def _next_event(events, timeout: float = 2.0) -> tuple[str, dict]:
+    import asyncio
+    import json
+
+    chunk = await asyncio.wait_for(anext(events), timeout)
+    kind, data = chunk.strip().split("\n")
+    return kind.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+async def test_stream_pushes_changed_activities_only(
+    client: TestClient, admin_token: str, evaluator_token: str, engine,
+):
+    import asyncio
+
+    from sqlmodel import Session
+
+    from app.services import leaderboard_stream_service
+
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token, "NUMERIC_HIGH")
+    other_id = client.post("/activities", headers=auth_headers(admin_token), json={
+        "name": "Jump", "evaluation_type": "NUMERIC_HIGH", "event_id": event_id,
+    }).json()["id"]
+
+    with Session(engine) as session:
+        events = await leaderboard_stream_service.open_stream(session, event_id)
+    try:
+        kind, snapshot = await _next_event(events)
+        assert kind == "snapshot"
+        assert {a["activity_id"] for a in snapshot["activities"]} == {activity_id, other_id}
+
+        # A burst of writes arrives as one delta for the activity that changed.
+        for value in ("5", "7"):
+            client.post("/records", headers=auth_headers(evaluator_token), json={
+                "activity_id": activity_id, "participant_id": participants["Alice"], "value_raw": value,
+            })
+        kind, delta = await _next_event(events)
+        assert kind == "activity" and delta["activity_id"] == activity_id
+        female = next(c for c in delta["categories"] if c["gender"] == "F")
+        assert [(p["display_name"], p["value"]) for p in female["participants"]] == [("Alice", "7")]
+
+        # Rewriting the same value moves nothing, so nothing is pushed.
+        client.post("/records", headers=auth_headers(evaluator_token), json={
+            "activity_id": activity_id, "participant_id": participants["Alice"], "value_raw": "7",
+        })
+        await asyncio.sleep(0.6)
+        assert all(sub.queue.empty() for sub in leaderboard_stream_service._feeds[event_id].subscribers)
+
+        # Structural changes resend the whole leaderboard.
+        client.delete(f"/activities/{other_id}", headers=auth_headers(admin_token))
+        kind, snapshot = await _next_event(events)
+        assert kind == "snapshot"
+        assert [a["activity_id"] for a in snapshot["activities"]] == [activity_id]
+    finally:
+        await events.aclose()
+    assert event_id not in leaderboard_stream_service._feeds
+
+
+def test_stream_requires_event_access(client: TestClient, admin_token: str, evaluator_token: str):
+    event_id, _, _ = _setup(client, admin_token, evaluator_token)
+    assert client.get("/events/999/leaderboard/stream", headers=auth_headers(admin_token)).status_code == 404
+
+    other = wait_for_import(client, admin_token, client.post(
+        "/events/import", headers=auth_headers(admin_token),
+        files={"file": ("p.csv", io.BytesIO(VALID_CSV), "text/csv")}, data={"event_name": "Other"},
+    ))["result"]["event_id"]
+    resp = client.get(f"/events/{other}/leaderboard/stream", headers=auth_headers(evaluator_token))
+    assert resp.status_code == 403
+
+
+def test_leaderboard_changes_since_version(client: TestClient, admin_token: str, evaluator_token: str):
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token, "NUMERIC_HIGH")
+    other_id = client.post("/activities", headers=auth_headers(admin_token), json={
+        "name": "Jump", "evaluation_type": "NUMERIC_HIGH", "event_id": event_id,
+    }).json()["id"]
+    url = f"/events/{event_id}/leaderboard"
+
+    def since(version: int) -> dict:
+        resp = client.get(f"{url}?since={version}", headers=auth_headers(admin_token))
+        assert resp.status_code == 200, resp.text
+        return resp.json()
+
+    first = since(0)
+    assert first["full"] is True
+    assert {a["activity_id"] for a in first["leaderboard"]["activities"]} == {activity_id, other_id}
+    version = first["version"]
+    assert since(version) == {"event_id": event_id, "version": version, "full": False, "leaderboard": None, "activities": []}
+
+    client.post("/records", headers=auth_headers(evaluator_token), json={
+        "activity_id": activity_id, "participant_id": participants["Alice"], "value_raw": "5",
+    })
+    delta = since(version)
+    assert delta["full"] is False and delta["version"] > version
+    assert [a["activity_id"] for a in delta["activities"]] == [activity_id]
+    female = next(c for c in delta["activities"][0]["categories"] if c["gender"] == "F")
+    assert [p["display_name"] for p in female["participants"]] == ["Alice"]
+    # Older clients still get every activity that changed after their version.
+    assert [a["activity_id"] for a in since(version)["activities"]] == [activity_id]
+    version = delta["version"]
+
+    # Structural changes (here an age category) need a full snapshot.
+    client.post(f"/events/{event_id}/age-categories", headers=auth_headers(admin_token),
+                json={"name": "Adult", "min_age": 18, "max_age": 99})
+    assert since(version)["full"] is True
+    # A version from the future (revisions were reset) starts over too.
+    assert since(version + 1000)["full"] is True
+
+    assert client.get(f"{url}?since=1&top=3", headers=auth_headers(admin_token)).status_code == 400
+    assert client.get("/events/999/leaderboard?since=5", headers=auth_headers(admin_token)).status_code == 404
+
+
+def test_cached_fragments_follow_revisions(
+    client: TestClient, admin_token: str, evaluator_token: str, engine, fake_redis, monkeypatch,
+):
+    from sqlmodel import Session
+
+    from app.services import leaderboard_service
+    from app.services.leaderboard_service import EventLeaderboard
+
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token, "NUMERIC_HIGH")
+    other_id = client.post("/activities", headers=auth_headers(admin_token), json={
+        "name": "Jump", "evaluation_type": "NUMERIC_HIGH", "event_id": event_id,
+    }).json()["id"]
+    record_id = client.post("/records", headers=auth_headers(evaluator_token), json={
+        "activity_id": activity_id, "participant_id": participants["Alice"], "value_raw": "5",
+    }).json()["id"]
+
+    def ranked(board, aid: int) -> list[str]:
+        activity = next(a for a in board.activities if a.activity_id == aid)
+        return [p.display_name for c in activity.categories for p in c.participants]
+
+    def leaderboard():
+        with Session(engine) as session:
+            return leaderboard_service.get_leaderboard(session, event_id)
+
+    assert ranked(leaderboard(), activity_id) == ["Alice"]
+
+    rendered = []
+    render_activity = EventLeaderboard.render_activity
+
+    def spy(self, activity_id):
+        rendered.append(activity_id)
+        return render_activity(self, activity_id)
+
+    monkeypatch.setattr(EventLeaderboard, "render_activity", spy)
+
+    # Current fragments are assembled without rendering anything.
+    leaderboard()
+    assert rendered == []
+
+    # A record write orphans only its own activity's fragment.
+    client.delete(f"/records/{record_id}", headers=auth_headers(evaluator_token))
+    assert ranked(leaderboard(), activity_id) == []
+    assert rendered == [activity_id]
+    assert len(fake_redis.keys(f"leaderboard:{event_id}:a{activity_id}:*")) == 2
+    assert len(fake_redis.keys(f"leaderboard:{event_id}:a{other_id}:*")) == 1
+
+    # A structural change orphans the header, so every fragment is rendered again.
+    rendered.clear()
+    client.post(f"/events/{event_id}/age-categories", headers=auth_headers(admin_token),
+                json={"name": "Adult", "min_age": 18, "max_age": 99})
+    assert leaderboard().has_age_categories is True
+    assert sorted(rendered) == sorted([activity_id, other_id])
+
+
+def test_rebuild_lease_admits_one_worker_per_event(fake_redis):
+    from app.services.leaderboard_service import _rebuild_lease
+
+    with _rebuild_lease(7) as leader:
+        assert leader is True
+        with _rebuild_lease(7) as contender:
+            assert contender is False
+        with _rebuild_lease(8) as other_event:
+            assert other_event is True
+    with _rebuild_lease(7) as leader:
+        assert leader is True
+
+
+def test_leaderboard_serves_stale_while_another_worker_rebuilds(
+    client: TestClient, admin_token: str, evaluator_token: str, engine, fake_redis, monkeypatch,
+):
+    from sqlmodel import Session
+
+    from app.core import metrics
+    from app.services import leaderboard_service
+
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token, "NUMERIC_HIGH")
+    record_id = client.post("/records", headers=auth_headers(evaluator_token), json={
+        "activity_id": activity_id, "participant_id": participants["Alice"], "value_raw": "5",
+    }).json()["id"]
+
+    def ranked() -> list[str]:
+        with Session(engine) as session:
+            board = leaderboard_service.get_leaderboard(session, event_id)
+        return [p.display_name for c in board.activities[0].categories for p in c.participants]
+
+    assert ranked() == ["Alice"]
+    client.delete(f"/records/{record_id}", headers=auth_headers(evaluator_token))
+
+    # Another worker holds the lease: the last good response is served as is.
+    lease = fake_redis.lock(f"leaderboard:{event_id}:rebuild", timeout=10)
+    assert lease.acquire(blocking=False)
+    served = metrics.snapshot().get("leaderboard.stale_served", 0)
+    assert ranked() == ["Alice"]
+    assert metrics.snapshot()["leaderboard.stale_served"] == served + 1
+
+    # With nothing stale, a worker waits for the leader and then renders itself.
+    fake_redis.delete(f"leaderboard:{event_id}:stale")
+    monkeypatch.setattr(leaderboard_service, "_REBUILD_WAIT", 0.1)
+    assert ranked() == []
+    lease.release()
+    assert ranked() == []
+
+
+async def test_async_leaderboard_renders_misses_in_the_threadpool(
+    client: TestClient, admin_token: str, evaluator_token: str, engine, fake_redis, monkeypatch,
+):
+    from sqlmodel import Session
+
+    from app.services import leaderboard_service
+
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token, "NUMERIC_HIGH")
+
+    def write(name: str, value: str) -> None:
+        client.post("/records", headers=auth_headers(evaluator_token), json={
+            "activity_id": activity_id, "participant_id": participants[name], "value_raw": value,
+        })
+
+    offloaded = []
+    run_in_threadpool = leaderboard_service.run_in_threadpool
+
+    async def spy(func, *args, **kwargs):
+        offloaded.append(func.__name__)
+        return await run_in_threadpool(func, *args, **kwargs)
+
+    with Session(engine) as session:
+        write("Alice", "5")
+        await leaderboard_service.get_leaderboard_async(session, event_id)
+        write("Bob", "7")
+        monkeypatch.setattr(leaderboard_service, "run_in_threadpool", spy)
+
+        # The write bumped the revision in Redis: the miss is rendered off the loop...
+        board = await leaderboard_service.get_leaderboard_async(session, event_id)
+        assert offloaded == ["get_leaderboard"]
+        # ...and the fragments it cached are then served on the loop.
+        assert await leaderboard_service.get_leaderboard_async(session, event_id) == board
+        assert offloaded == ["get_leaderboard"]
+    assert {p.display_name for c in board.activities[0].categories for p in c.participants} == {"Alice", "Bob"}
+
+
+async def _until(condition, timeout: float = 2.0) -> None:
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+async def test_stream_listener_dispatches_published_changes(fake_redis, monkeypatch):
+    import asyncio
+
+    from app.services import common, leaderboard_stream_service
+
+    changes = []
+    monkeypatch.setattr(leaderboard_stream_service, "_on_change", lambda *change: changes.append(change))
+    listener = asyncio.create_task(leaderboard_stream_service._listen())
+    try:
+        await _until(lambda: fake_redis.pubsub_numpat() == 1)
+        common.bump_leaderboard_revision(3, 5)
+        await common.bump_leaderboard_revision_async(3)
+        fake_redis.publish("leaderboard:4:revs", "a1")  # not a change channel
+        await _until(lambda: len(changes) == 2)
+        assert changes == [(3, 5), (3, None)]
+    finally:
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
+
+
+async def test_stream_listener_resubscribes_with_backoff_and_resyncs(fake_redis, monkeypatch):
+    import asyncio
+
+    from app.services import leaderboard_stream_service
+
+    client = leaderboard_stream_service.async_redis_client
+    pubsub = client.pubsub
+    attempts = []
+
+    def flaky_pubsub():
+        subscription = pubsub()
+        attempts.append(subscription)
+        if len(attempts) <= 3:
+            async def refuse(*args):
+                raise ConnectionError("Redis is down")
+            subscription.psubscribe = refuse
+        return subscription
+
+    delays = []
+    sleep = asyncio.sleep
+
+    async def fast_sleep(delay):
+        if delay >= 1:
+            delays.append(delay)
+        await sleep(0)
+
+    changes = []
+    monkeypatch.setattr(client, "pubsub", flaky_pubsub)
+    monkeypatch.setattr(leaderboard_stream_service.asyncio, "sleep", fast_sleep)
+    monkeypatch.setattr(leaderboard_stream_service, "_RESUBSCRIBE_MAX_SECONDS", 3.0)
+    monkeypatch.setattr(leaderboard_stream_service, "_on_change", lambda *change: changes.append(change))
+    # Feeds open on this worker; anything published while disconnected was missed.
+    monkeypatch.setitem(leaderboard_stream_service._feeds, 9, None)
+    monkeypatch.setitem(leaderboard_stream_service._feeds, 12, None)
+
+    listener = asyncio.create_task(leaderboard_stream_service._listen())
+    try:
+        await _until(lambda: fake_redis.pubsub_numpat() == 1)
+        assert delays == [1.0, 2.0, 3.0]
+        assert len(attempts) == 4
+        # Every open feed re-renders once the subscription is back.
+        assert changes == [(9,), (12,)]
+        fake_redis.publish("leaderboard:9:changes", "a2")
+        await _until(lambda: len(changes) == 3)
+        assert changes[-1] == (9, 2)
+    finally:
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
+
+
+async def test_bump_script_moves_revision_and_change_version_together(fake_redis):
+    from app.services import common
+    from app.services.common import LeaderboardRevisions
+
+    assert common.bump_leaderboard_revision(5, 2) == 1
+    assert common.bump_leaderboard_revision(5) == 1
+    assert await common.bump_leaderboard_revision_async(5, 3) == 1
+    assert common.bump_leaderboard_revision(5, 2) == 2
+    assert fake_redis.hgetall("leaderboard:5:revs") == {
+        "a2": "2", "a3": "1", "event": "1", "version": "4", "v:a2": "4", "v:a3": "3", "v:event": "2",
+    }
+    assert common.get_leaderboard_revisions(5) == await common.get_leaderboard_revisions_async(5) == LeaderboardRevisions(
+        event=1, activities={2: 2, 3: 1}, version=4, structure_version=2, activity_versions={2: 4, 3: 3},
+    )
+
+
+def test_leaderboard_changes_follow_redis_revisions(
+    client: TestClient, admin_token: str, evaluator_token: str, fake_redis,
+):
+    event_id, activity_id, participants = _setup(client, admin_token, evaluator_token, "NUMERIC_HIGH")
+    other_id = client.post("/activities", headers=auth_headers(admin_token), json={
+        "name": "Jump", "evaluation_type": "NUMERIC_HIGH", "event_id": event_id,
+    }).json()["id"]
+    revisions_key = f"leaderboard:{event_id}:revs"
+
+    def since(version: int) -> dict:
+        resp = client.get(f"/events/{event_id}/leaderboard?since={version}", headers=auth_headers(admin_token))
+        assert resp.status_code == 200, resp.text
+        return resp.json()
+
+    first = since(0)
+    assert first["full"] is True
+    version = first["version"]
+    assert version == int(fake_redis.hget(revisions_key, "version"))
+
+    for participant, value in (("Alice", "5"), ("Bob", "7")):
+        client.post("/records", headers=auth_headers(evaluator_token), json={
+            "activity_id": activity_id, "participant_id": participants[participant], "value_raw": value,
+        })
+    delta = since(version)
+    assert delta["full"] is False
+    assert delta["version"] == version + 2 == int(fake_redis.hget(revisions_key, f"v:a{activity_id}"))
+    assert [a["activity_id"] for a in delta["activities"]] == [activity_id]
+    assert since(delta["version"])["activities"] == []
+
+    client.post("/records", headers=auth_headers(evaluator_token), json={
+        "activity_id": other_id, "participant_id": participants["Carol"], "value_raw": "3",
+    })
+    assert [a["activity_id"] for a in since(delta["version"])["activities"]] == [other_id]
+    assert {a["activity_id"] for a in since(version)["activities"]} == {activity_id, other_id}
+
+    # Losing the revisions hash restarts versions; clients ahead of it resync.
+    latest = since(version)["version"]
+    fake_redis.delete(revisions_key)
+    client.post("/records", headers=auth_headers(evaluator_token), json={
+        "activity_id": activity_id, "participant_id": participants["Alice"], "value_raw": "9",
+    })
+    restarted = since(latest)
+    assert restarted["full"] is True and restarted["version"] == 1
+    sprint = next(a for a in restarted["leaderboard"]["activities"] if a["activity_id"] == activity_id)
+    assert {p["display_name"]: p["value"] for c in sprint["categories"] for p in c["participants"]} == {
+        "Alice": "9", "Bob": "7",
+    }
@@ -1,5 +1,7 @@
 """Tests for /admin/audit-logs endpoint — pagination, admin-only access."""
 
+from types import SimpleNamespace
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -47,3 +49,227 @@ def test_audit_logs_non_admin_403(client: TestClient, evaluator_token: str):
 def test_audit_logs_unauthenticated_401(client: TestClient):
     resp = client.get("/admin/audit-logs")
     assert resp.status_code == 401
+
+
+def test_buffered_audit_waits_for_commit_and_flush(client: TestClient, admin_token: str, engine, monkeypatch):
+    """Buffered entries are queued on commit, dropped on rollback and written by flush()."""
+    from sqlmodel import Session, func, select
+
+    from app.config import settings
+    from app.core import audit
+    from app.models.audit_log import AuditLog
+
+    monkeypatch.setattr(settings, "AUDIT_MODE", "buffered")
+
+    def count(action: str) -> int:
+        with Session(engine) as session:
+            return session.exec(select(func.count()).select_from(AuditLog).where(AuditLog.action == action)).one()
+
+    with Session(engine) as session:
+        audit.log_action(session, None, "ROLLED_BACK")
+        session.rollback()
+        audit.log_action(session, None, "BUFFERED")
+        audit.log_actions(session, [{"action": "BUFFERED"}, {"action": "BUFFERED"}])
+        session.commit()
+
+    assert count("BUFFERED") == 0
+    assert audit.flush(engine) == 3
+    assert count("BUFFERED") == 3
+    assert count("ROLLED_BACK") == 0
+    assert audit.flush(engine) == 0
+
+
+def test_buffered_audit_caps_the_buffer(client: TestClient, admin_token: str, engine, monkeypatch):
+    """While the database is unreachable the buffer stops growing at AUDIT_MAX_BUFFERED."""
+    from sqlmodel import Session, create_engine
+
+    from app.config import settings
+    from app.core import audit, metrics
+
+    monkeypatch.setattr(settings, "AUDIT_MODE", "buffered")
+    monkeypatch.setattr(settings, "AUDIT_MAX_BUFFERED", 3)
+    before = metrics.snapshot().get("audit.overflow", 0)
+
+    with Session(engine) as session:
+        audit.log_actions(session, [{"action": f"CAPPED_{i}"} for i in range(5)])
+        session.commit()
+    assert [row["action"] for row in audit._buffer] == ["CAPPED_0", "CAPPED_1", "CAPPED_2"]
+
+    # A failed flush puts the rows back without going over the cap either.
+    monkeypatch.setattr(settings, "AUDIT_MAX_BUFFERED", 2)
+    unreachable = create_engine("sqlite:////nonexistent-dir/audit.db")
+    assert audit.flush(unreachable) == 0
+    assert [row["action"] for row in audit._buffer] == ["CAPPED_0", "CAPPED_1"]
+    assert metrics.snapshot()["audit.overflow"] - before == 3
+
+
+def test_audit_mode_rejects_unknown_values():
+    from pydantic import ValidationError
+
+    from app.config import Settings
+
+    with pytest.raises(ValidationError):
+        Settings(AUDIT_MODE="bufferd", SECRET_KEY="x" * 32)
+
+
+def test_audit_logs_keyset_pages_and_filters(client: TestClient, admin_token: str, engine):
+    """Cursor pages cover every row once, even when rows share a timestamp."""
+    from sqlmodel import Session
+
+    from app.core.audit import log_actions
+
+    with Session(engine) as session:
+        log_actions(session, [
+            {"action": "PAGED", "resource_type": "record", "resource_id": i % 2} for i in range(5)
+        ])
+        session.commit()
+
+    seen, cursor = [], None
+    while True:
+        params = {"action": "PAGED", "limit": 2, "count": "none"}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get("/admin/audit-logs", params=params, headers=auth_headers(admin_token)).json()
+        assert data["total"] is None
+        seen += [item["id"] for item in data["items"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 5
+    assert seen == sorted(seen, reverse=True)
+
+    resp = client.get(
+        "/admin/audit-logs",
+        params={"resource_type": "record", "resource_id": 1, "count": "exact"},
+        headers=auth_headers(admin_token),
+    )
+    assert resp.json()["total"] == 2
+    assert {item["resource_id"] for item in resp.json()["items"]} == {1}
+
+    resp = client.get("/admin/audit-logs", params={"cursor": "not-a-cursor"}, headers=auth_headers(admin_token))
+    assert resp.status_code == 400
+
+
+
+def test_audit_logs_filter_values_are_not_parsed_as_sql(client: TestClient, admin_token: str, engine):
+    """A ':' or '%' in a filter value reaches EXPLAIN as a bound parameter."""
+    from sqlalchemy.dialects import postgresql
+    from sqlmodel import Session
+
+    from app.core.audit import log_actions
+    from app.services.audit_service import AuditLogFilter, CountMode, _count
+
+    with Session(engine) as session:
+        log_actions(session, [{"action": "run :step", "resource_type": "record", "resource_id": 1}])
+        session.commit()
+    resp = client.get(
+        "/admin/audit-logs",
+        params={"action": "run :step", "count": "estimated"},
+        headers=auth_headers(admin_token),
+    )
+    assert resp.status_code == 200
+    assert [item["action"] for item in resp.json()["items"]] == ["run :step"]
+
+    calls = []
+
+    class _Connection:
+        def exec_driver_sql(self, sql, params):
+            calls.append((sql, params))
+            return SimpleNamespace(scalar=lambda: [{"Plan": {"Plan Rows": 7}}])
+
+    session = SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=postgresql.psycopg2.dialect()),
+        connection=_Connection,
+    )
+    total = _count(session, AuditLogFilter(action="run :step", resource_type="100%"), CountMode.ESTIMATED)
+    assert total == (7, True)
+    [(sql, params)] = calls
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert ":step" not in sql and "100%" not in sql
+    assert sorted(params.values()) == ["100%", "run :step"]
+
+def test_retention_archives_whole_expired_months(engine, tmp_path, monkeypatch):
+    """Months wholly older than the retention window are archived to gzip JSONL, then deleted."""
+    import gzip
+    import json
+    from datetime import datetime
+
+    from sqlmodel import Session, select
+
+    from app.config import settings
+    from app.models.audit_log import AuditLog
+    from app.services.audit_retention_service import run_maintenance
+
+    monkeypatch.setattr(settings, "AUDIT_RETENTION_DAYS", 30)
+    monkeypatch.setattr(settings, "AUDIT_ARCHIVE_DIR", str(tmp_path / "archive"))
+    with Session(engine) as session:
+        for created_at in (datetime(2026, 7, 3), datetime(2026, 7, 30), datetime(2026, 8, 20), datetime(2026, 9, 25)):
+            session.add(AuditLog(action="OLD", created_at=created_at))
+        session.commit()
+
+    # Cutoff 2026-09-17: July and August are wholly expired, September is not.
+    report = run_maintenance(engine, now=datetime(2026, 10, 17))
+    assert report.archived == {"auditlog_2026_07.jsonl.gz": 2, "auditlog_2026_08.jsonl.gz": 1}
+
+    with gzip.open(tmp_path / "archive" / "auditlog_2026_07.jsonl.gz", "rt") as f:
+        rows = [json.loads(line) for line in f]
+    assert [r["created_at"][:10] for r in rows] == ["2026-07-03", "2026-07-30"]
+    assert rows[0]["action"] == "OLD"
+
+    with Session(engine) as session:
+        remaining = session.exec(select(AuditLog.created_at).where(AuditLog.action == "OLD")).all()
+    assert [d.month for d in remaining] == [9]
+
+    assert run_maintenance(engine, now=datetime(2026, 10, 17)).archived == {}
+    assert (tmp_path / "archive" / "auditlog_2026_07.jsonl.gz").exists()
+
+
+def test_retention_never_overwrites_an_archive(engine, tmp_path, monkeypatch):
+    """A second row-wise run for an archived month writes a suffixed file next to the first."""
+    import gzip
+    from datetime import datetime
+
+    from sqlmodel import Session
+
+    from app.config import settings
+    from app.models.audit_log import AuditLog
+    from app.services.audit_retention_service import run_maintenance
+
+    monkeypatch.setattr(settings, "AUDIT_RETENTION_DAYS", 30)
+    monkeypatch.setattr(settings, "AUDIT_ARCHIVE_DIR", str(tmp_path / "archive"))
+    for action in ("FIRST", "LATE"):
+        with Session(engine) as session:
+            session.add(AuditLog(action=action, created_at=datetime(2026, 7, 3)))
+            session.commit()
+        run_maintenance(engine, now=datetime(2026, 10, 17))
+
+    archives = sorted(p.name for p in (tmp_path / "archive").iterdir())
+    assert archives == ["auditlog_2026_07.1.jsonl.gz", "auditlog_2026_07.jsonl.gz"]
+    with gzip.open(tmp_path / "archive" / "auditlog_2026_07.jsonl.gz", "rt") as f:
+        assert '"FIRST"' in f.read()
+    with gzip.open(tmp_path / "archive" / "auditlog_2026_07.1.jsonl.gz", "rt") as f:
+        assert '"LATE"' in f.read()
+
+
+def test_retention_archives_expired_rows_of_another_table(engine, tmp_path, monkeypatch):
+    """The row-wise path also prunes a given table, as it does auditlog_default next to the partitions."""
+    from datetime import datetime
+
+    from sqlalchemy import text
+
+    from app.config import settings
+    from app.services.audit_retention_service import _DEFAULT_PARTITION, MaintenanceReport, _archive_rows
+
+    monkeypatch.setattr(settings, "AUDIT_ARCHIVE_DIR", str(tmp_path / "archive"))
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE auditlog_default AS SELECT * FROM auditlog WHERE 0"))
+        conn.execute(text(
+            "INSERT INTO auditlog_default (id, action, created_at) VALUES"
+            " (1, 'STRANDED', '2026-05-02 00:00:00'), (2, 'RECENT', '2026-10-01 00:00:00')"
+        ))
+
+    report = MaintenanceReport()
+    _archive_rows(engine, datetime(2026, 9, 17), report, source=_DEFAULT_PARTITION)
+    assert report.archived == {"auditlog_2026_05.jsonl.gz": 1}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT action FROM auditlog_default")).scalars().all() == ["RECENT"]
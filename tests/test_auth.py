@@ -84,3 +84,52 @@ def test_me_returns_current_user(client: TestClient, admin_token: str):
 def test_me_without_token_401(client: TestClient):
     resp = client.get("/auth/me")
     assert resp.status_code == 401
+
+
+def test_login_rehashes_password_with_outdated_cost(client: TestClient, engine):
+    """A hash made with another bcrypt cost is replaced on the next successful login."""
+    from passlib.hash import bcrypt
+
+    from app.config import settings
+    from app.models.user import User
+
+    client.post("/auth/register", json={"email": "old@test.com", "password": "Password1!", "full_name": "Old"})
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.email == "old@test.com")).first()
+        user.password_hash = bcrypt.using(rounds=settings.BCRYPT_ROUNDS + 1).hash("Password1!")
+        user.is_active = True
+        session.add(user)
+        session.commit()
+
+    assert client.post("/auth/login", json={"email": "old@test.com", "password": "Password1!"}).status_code == 200
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.email == "old@test.com")).first()
+        assert bcrypt.from_string(user.password_hash).rounds == settings.BCRYPT_ROUNDS
+    assert client.post("/auth/login", json={"email": "old@test.com", "password": "Password1!"}).status_code == 200
+
+
+def test_login_rejected_fast_when_hashing_saturated(client: TestClient, monkeypatch):
+    from app.config import settings
+
+    client.post("/auth/register", json={"email": "busy@test.com", "password": "Password1!", "full_name": "Busy"})
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+    resp = client.post("/auth/login", json={"email": "busy@test.com", "password": "Password1!"})
+    assert resp.status_code == 503
+
+
+async def test_async_hashing_runs_on_the_bcrypt_pool():
+    import threading
+
+    from app.core import metrics, security
+
+    threads = []
+
+    def hash_on_pool(password: str) -> str:
+        threads.append(threading.current_thread().name)
+        return security.pwd_context.hash(password)
+
+    gauge = metrics.gauges().get("auth.hash_pending", 0)
+    hashed = await security._run_hashing_async(hash_on_pool, "Password1!")
+    assert threads[0].startswith("bcrypt") and threads[0] != threading.current_thread().name
+    assert (await security.verify_and_update_password_async("Password1!", hashed)) == (True, None)
+    assert metrics.gauges()["auth.hash_pending"] == gauge
@@ -5,7 +5,7 @@ import io
 import pytest
 from fastapi.testclient import TestClient
 
-from tests.conftest import auth_headers, register_and_login
+from tests.conftest import auth_headers, register_and_login, wait_for_import
 
 CSV = b"display_name,group_name\nAlice,Group1\nBob,Group2\n"
 
@@ -17,7 +17,7 @@ def _create_event(client: TestClient, admin_token: str) -> int:
         files={"file": ("p.csv", io.BytesIO(CSV), "text/csv")},
         data={"event_name": "Auth Test"},
     )
-    return resp.json()["event_id"]
+    return wait_for_import(client, admin_token, resp)["result"]["event_id"]
 
 
 def _get_user_id(client: TestClient, token: str) -> int:
@@ -70,11 +70,11 @@ def test_evaluator_event_list_only_shows_pool_events(
 ):
     """Evaluator should only see events they are in the pool for."""
     event1_id = _create_event(client, admin_token)
-    event2_id = client.post(
+    event2_id = wait_for_import(client, admin_token, client.post(
         "/events/import", headers=auth_headers(admin_token),
         files={"file": ("p.csv", io.BytesIO(CSV), "text/csv")},
         data={"event_name": "Auth Test 2"},
-    ).json()["event_id"]
+    ))["result"]["event_id"]
 
     eval_id = _get_user_id(client, evaluator_token)
     client.post(f"/events/{event1_id}/evaluators", headers=auth_headers(admin_token), json={"user_id": eval_id})
@@ -98,11 +98,11 @@ def test_cross_event_record_injection_blocked(
     )
 
     # Create a second event with its own activity
-    event2_id = client.post(
+    event2_id = wait_for_import(client, admin_token, client.post(
         "/events/import", headers=auth_headers(admin_token),
         files={"file": ("p.csv", io.BytesIO(CSV), "text/csv")},
         data={"event_name": "Other Event"},
-    ).json()["event_id"]
+    ))["result"]["event_id"]
     activity2_id = client.post(
         "/activities", headers=auth_headers(admin_token),
         json={"name": "Other Activity", "evaluation_type": "NUMERIC_HIGH", "event_id": event2_id},
@@ -125,11 +125,11 @@ def test_cross_event_bulk_record_injection_blocked(
         client, admin_token, evaluator_token, engine
     )
 
-    event2_id = client.post(
+    event2_id = wait_for_import(client, admin_token, client.post(
         "/events/import", headers=auth_headers(admin_token),
         files={"file": ("p.csv", io.BytesIO(CSV), "text/csv")},
         data={"event_name": "Other Event 2"},
-    ).json()["event_id"]
+    ))["result"]["event_id"]
     activity2_id = client.post(
         "/activities", headers=auth_headers(admin_token),
         json={"name": "Other Activity 2", "evaluation_type": "NUMERIC_HIGH", "event_id": event2_id},
@@ -189,6 +189,25 @@ def test_remove_from_pool_cascades_to_group_evaluator(
 # ── Evaluator role restrictions ───────────────────────────────────────────
 
 
+def test_assignment_changes_apply_to_cached_scope(
+    client: TestClient, admin_token: str, evaluator_token: str, engine
+):
+    """Group and pool membership are cached per evaluator but changes take effect at once."""
+    event_id, activity_id, group1_id, group2_id, alice_id, bob_id, eval_id = _full_setup(
+        client, admin_token, evaluator_token, engine
+    )
+    submit_bob = {"participant_id": bob_id, "activity_id": activity_id, "value_raw": "5"}
+    assert client.post("/records", headers=auth_headers(evaluator_token), json=submit_bob).status_code == 403
+
+    client.delete(f"/groups/{group1_id}/evaluators/{eval_id}", headers=auth_headers(admin_token))
+    client.post(f"/groups/{group2_id}/evaluators", headers=auth_headers(admin_token), json={"user_id": eval_id})
+    assert client.post("/records", headers=auth_headers(evaluator_token), json=submit_bob).status_code == 201
+
+    client.delete(f"/events/{event_id}/evaluators/{eval_id}", headers=auth_headers(admin_token))
+    assert client.get(f"/events/{event_id}/leaderboard", headers=auth_headers(evaluator_token)).status_code == 403
+    assert client.post("/records", headers=auth_headers(evaluator_token), json=submit_bob).status_code == 403
+
+
 def test_evaluator_cannot_create_event(client: TestClient, evaluator_token: str):
     """Evaluators should not be able to create events."""
     resp = client.post(
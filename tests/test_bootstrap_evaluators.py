@@ -1,22 +1,24 @@
 """Tests for POST /events/{id}/bootstrap-evaluators — auto-mint one evaluator per group."""
 
 import io
+import json
 
+import pytest
 from fastapi.testclient import TestClient
 
 from app.core.text import slugify
-from tests.conftest import auth_headers
+from tests.conftest import auth_headers, wait_for_import
 
 CSV = b"display_name,group_name\nAlice,1.oddil\nBob,2.oddil\n"
 
 
 def _import_event(client: TestClient, token: str, name: str = "Letni tabor 2026") -> int:
-    return client.post(
+    return wait_for_import(client, token, client.post(
         "/events/import",
         headers=auth_headers(token),
         files={"file": ("p.csv", io.BytesIO(CSV), "text/csv")},
         data={"event_name": name},
-    ).json()["event_id"]
+    ))["result"]["event_id"]
 
 
 def test_bootstrap_creates_one_evaluator_per_group(client: TestClient, admin_token: str):
@@ -127,8 +129,7 @@ def test_import_with_bootstrap_flag_mints_evaluators(client: TestClient, admin_t
         files={"file": ("p.csv", io.BytesIO(CSV), "text/csv")},
         data={"event_name": "Letni tabor 2026"},
     )
-    assert resp.status_code == 201
-    data = resp.json()
+    data = wait_for_import(client, admin_token, resp)["result"]
     assert data["groups_created"] == 2
     assert len(data["evaluators"]) == 2
 
@@ -138,6 +139,30 @@ def test_import_with_bootstrap_flag_mints_evaluators(client: TestClient, admin_t
     assert login.status_code == 200
 
 
+
+@pytest.mark.parametrize("redis", [False, True], ids=["local", "redis"])
+def test_import_hands_out_bootstrap_credentials_once(
+    client: TestClient, admin_token: str, request, monkeypatch, redis: bool,
+):
+    """Passwords are returned by the first read of the finished job and never stored with it."""
+    from app.services import import_service
+
+    if redis:
+        monkeypatch.setattr(import_service, "redis_client", request.getfixturevalue("fake_redis"))
+    resp = client.post(
+        "/events/import?bootstrap=true",
+        headers=auth_headers(admin_token),
+        files={"file": ("p.csv", io.BytesIO(CSV), "text/csv")},
+        data={"event_name": "Once Camp"},
+    )
+    job_id = resp.json()["job_id"]
+    assert len(wait_for_import(client, admin_token, resp)["result"]["evaluators"]) == 2
+
+    assert "password" not in json.dumps(import_service._load_job(job_id))
+    again = client.get(f"/events/import-jobs/{job_id}", headers=auth_headers(admin_token)).json()
+    assert again["status"] == "DONE"
+    assert again["result"]["evaluators"] == []
+
 def test_import_without_bootstrap_flag_mints_nothing(client: TestClient, admin_token: str):
     resp = client.post(
         "/events/import",
@@ -145,10 +170,30 @@ def test_import_without_bootstrap_flag_mints_nothing(client: TestClient, admin_t
         files={"file": ("p.csv", io.BytesIO(CSV), "text/csv")},
         data={"event_name": "No Bootstrap"},
     )
-    assert resp.status_code == 201
-    data = resp.json()
+    data = wait_for_import(client, admin_token, resp)["result"]
     assert data["evaluators"] == []
 
     event_id = data["event_id"]
     pool = client.get(f"/events/{event_id}/evaluators", headers=auth_headers(admin_token)).json()
     assert pool == []
+
+
+def test_import_with_bootstrap_reports_busy_hashing_as_retryable(
+    client: TestClient, admin_token: str, monkeypatch,
+):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+    resp = client.post(
+        "/events/import?bootstrap=true",
+        headers=auth_headers(admin_token),
+        files={"file": ("p.csv", io.BytesIO(CSV), "text/csv")},
+        data={"event_name": "Busy Camp"},
+    )
+    job = wait_for_import(client, admin_token, resp)
+    assert job["status"] == "FAILED"
+    assert job["error_status"] == 503
+    assert "retry" in job["error"]
+    # The import rolled back with the failed bootstrap.
+    events = client.get("/events", headers=auth_headers(admin_token)).json()
+    assert all(e["name"] != "Busy Camp" for e in events)
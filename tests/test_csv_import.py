@@ -6,7 +6,7 @@ import json
 import pytest
 from fastapi.testclient import TestClient
 
-from tests.conftest import auth_headers
+from tests.conftest import auth_headers, wait_for_import
 
 
 STANDARD_CSV = b"display_name,group_name\nAlice,TeamA\nBob,TeamB\n"
@@ -64,8 +64,7 @@ def test_import_standard_csv(client: TestClient, admin_token: str):
         files={"file": ("data.csv", io.BytesIO(STANDARD_CSV), "text/csv")},
         data={"event_name": "Standard Import"},
     )
-    assert resp.status_code == 201
-    data = resp.json()
+    data = wait_for_import(client, admin_token, resp)["result"]
     assert data["groups_created"] == 2
     assert data["participants_created"] == 2
 
@@ -82,8 +81,7 @@ def test_import_with_column_mapping(client: TestClient, admin_token: str):
         files={"file": ("data.csv", io.BytesIO(CUSTOM_COLUMNS_CSV), "text/csv")},
         data={"event_name": "Mapped Import", "column_mapping": mapping},
     )
-    assert resp.status_code == 201
-    data = resp.json()
+    data = wait_for_import(client, admin_token, resp)["result"]
     assert data["participants_created"] == 2
 
     # Verify participants have correct data
@@ -104,7 +102,7 @@ def test_import_csv_with_extra_columns(client: TestClient, admin_token: str):
         files={"file": ("data.csv", io.BytesIO(CSV_WITH_METADATA), "text/csv")},
         data={"event_name": "Metadata Import"},
     )
-    assert resp.status_code == 201
+    assert wait_for_import(client, admin_token, resp)["status"] == "DONE"
 
 
 # ── Error cases ─────────────────────────────────────────────────────────────
@@ -139,3 +137,108 @@ def test_import_non_admin_403(client: TestClient, evaluator_token: str):
         data={"event_name": "Nope"},
     )
     assert resp.status_code == 403
+
+
+def test_import_streams_in_batches(client: TestClient, admin_token: str, engine):
+    """Rows spanning several insert batches keep their groups, metadata and UTF-8 text."""
+    from sqlmodel import Session, func, select
+
+    from app.models.group import Group
+    from app.models.participant import Participant
+
+    lines = ["display_name,group_name,age,note"]
+    lines += [f"Účastník {i},Team {i % 7},{i % 90},\"multi\nline {i}\"" for i in range(2500)]
+    body = ("\ufeff" + "\n".join(lines) + "\n").encode()
+
+    resp = client.post(
+        "/events/import",
+        headers=auth_headers(admin_token),
+        data={"event_name": "Big Import"},
+        files={"file": ("big.csv", io.BytesIO(body), "text/csv")},
+    )
+    job = wait_for_import(client, admin_token, resp)
+    assert job["rows_parsed"] == job["rows_inserted"] == 2500
+    data = job["result"]
+    assert data["groups_created"] == 7
+    assert data["participants_created"] == 2500
+
+    with Session(engine) as session:
+        assert session.exec(
+            select(func.count()).select_from(Group).where(Group.event_id == data["event_id"])
+        ).one() == 7
+        last = session.exec(select(Participant).where(Participant.display_name == "Účastník 2499")).one()
+        assert last.age == 2499 % 90
+        assert last.metadata_json == {"note": "multi\nline 2499"}
+
+
+def test_import_collects_row_errors_and_rolls_back(client: TestClient, admin_token: str, engine):
+    from sqlmodel import Session, select
+
+    from app.models.event import Event
+
+    body = ("display_name,group_name\n" + "A,T\n" * 1500 + ",T\nB,\n" + "C,T\n" * 10).encode()
+    resp = client.post(
+        "/events/import",
+        headers=auth_headers(admin_token),
+        data={"event_name": "Broken Import"},
+        files={"file": ("broken.csv", io.BytesIO(body), "text/csv")},
+    )
+    job = wait_for_import(client, admin_token, resp)
+    assert job["status"] == "FAILED"
+    assert job["rows_parsed"] == 1512
+    assert job["error_count"] == 2
+    assert job["errors"] == [
+        {"line": 1502, "message": "Row 1502: display_name is required"},
+        {"line": 1503, "message": "Row 1503: group_name is required"},
+    ]
+    assert job["result"] is None
+    with Session(engine) as session:
+        assert session.exec(select(Event).where(Event.name == "Broken Import")).first() is None
+
+
+def test_import_job_visible_to_submitter_only(client: TestClient, admin_token: str, engine):
+    from tests.conftest import register_and_login
+
+    resp = client.post(
+        "/events/import",
+        headers=auth_headers(admin_token),
+        data={"event_name": "Private Import"},
+        files={"file": ("data.csv", io.BytesIO(STANDARD_CSV), "text/csv")},
+    )
+    wait_for_import(client, admin_token, resp)
+
+    other_token = register_and_login(client, "admin2@test.com", "Password1!", "Other Admin", engine)
+    resp = client.get(f"/events/import-jobs/{resp.json()['job_id']}", headers=auth_headers(other_token))
+    assert resp.status_code == 404
+
+
+def test_shutdown_fails_queued_imports_and_removes_their_uploads(client: TestClient, admin_token: str, monkeypatch):
+    """Jobs still queued at shutdown fail with a retry message instead of staying QUEUED."""
+    import os
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.services import import_service
+
+    release = threading.Event()
+    busy = ThreadPoolExecutor(max_workers=1)
+    busy.submit(release.wait)
+    monkeypatch.setattr(import_service, "_executor", busy)
+    try:
+        resp = client.post(
+            "/events/import",
+            headers=auth_headers(admin_token),
+            data={"event_name": "Never Started"},
+            files={"file": ("data.csv", io.BytesIO(STANDARD_CSV), "text/csv")},
+        )
+        job_id = resp.json()["job_id"]
+        [(_, path)] = import_service._pending.values()
+        import_service.shutdown()
+    finally:
+        release.set()
+
+    assert not os.path.exists(path)
+    job = client.get(f"/events/import-jobs/{job_id}", headers=auth_headers(admin_token)).json()
+    assert job["status"] == "FAILED"
+    assert job["error_status"] == 503
+    assert "retry" in job["error"]
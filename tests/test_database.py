@@ -0,0 +1,79 @@
+"""Tests for engine/pool configuration in app.database."""
+
+from sqlalchemy import create_engine
+
+from app.config import settings
+from app.database import _InstrumentedAsyncQueuePool, _InstrumentedQueuePool, async_url, engine_options, instrument_engine
+
+
+def test_sqlite_keeps_default_pool():
+    assert engine_options("sqlite://") == {}
+
+
+def test_postgres_pool_and_statement_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    options = engine_options("postgresql://u:p@db/app")
+    assert options["poolclass"] is _InstrumentedQueuePool
+    assert options["pool_size"] == 20
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+
+def test_pgbouncer_mode_sends_no_startup_options(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    assert "connect_args" not in engine_options("postgresql://u:p@db/app")
+    assert engine_options("postgresql+asyncpg://u:p@db/app")["connect_args"] == {
+        "statement_cache_size": 0, "prepared_statement_cache_size": 0,
+    }
+
+
+def test_async_url_and_pool():
+    assert async_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert async_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert async_url("sqlite:///./local.db") == "sqlite+aiosqlite:///./local.db"
+    assert engine_options(async_url("postgresql://u:p@db/app"))["poolclass"] is _InstrumentedAsyncQueuePool
+
+
+def test_pool_metrics_recorded():
+    from app.core import metrics
+
+    engine = create_engine("sqlite:///:memory:", poolclass=_InstrumentedQueuePool, pool_size=1)
+    instrument_engine(engine, label="test")
+    before = metrics.snapshot().get("db.test.pool_checkouts", 0)
+    with engine.connect():
+        assert metrics.gauges()["db.test.pool_checked_out"] == 1
+    assert metrics.gauges()["db.test.pool_checked_out"] == 0
+    assert metrics.snapshot()["db.test.pool_checkouts"] == before + 1
+
+
+def test_read_session_routing(client, admin_token, engine, monkeypatch):
+    """GETs go to a healthy replica, except right after the user wrote or when it lags."""
+    from sqlmodel import SQLModel, create_engine as create_sqlite_engine
+    from sqlmodel.pool import StaticPool
+
+    from app import database
+    from tests.conftest import auth_headers
+
+    # An empty replica: anything read from it is missing.
+    replica = create_sqlite_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(replica)
+    lag = {"seconds": 0.0}
+    monkeypatch.setattr(database, "replica_engine", replica)
+    monkeypatch.setattr(database, "_replica_lag_seconds", lambda: lag["seconds"])
+    monkeypatch.setattr(database, "_LAG_CHECK_INTERVAL", 0.0)
+    database._local_writers.clear()
+
+    event_id = client.post(
+        "/events/manual", headers=auth_headers(admin_token),
+        json={"name": "Replica", "groups": [{"name": "G1", "participants": []}]},
+    ).json()["event_id"]
+    # Read-your-writes: the creator still reads from the primary.
+    assert client.get(f"/events/{event_id}", headers=auth_headers(admin_token)).status_code == 200
+
+    database._local_writers.clear()
+    assert client.get(f"/events/{event_id}", headers=auth_headers(admin_token)).status_code == 404
+
+    lag["seconds"] = settings.DB_REPLICA_MAX_LAG_SECONDS + 1
+    assert client.get(f"/events/{event_id}", headers=auth_headers(admin_token)).status_code == 200
@@ -5,7 +5,7 @@ import io
 import pytest
 from fastapi.testclient import TestClient
 
-from tests.conftest import auth_headers
+from tests.conftest import auth_headers, wait_for_import
 
 CSV = b"display_name,group_name\nAlice,Group1\nBob,Group2\n"
 
@@ -17,7 +17,7 @@ def _create_event(client: TestClient, admin_token: str) -> int:
         files={"file": ("p.csv", io.BytesIO(CSV), "text/csv")},
         data={"event_name": "Pool Test"},
     )
-    return resp.json()["event_id"]
+    return wait_for_import(client, admin_token, resp)["result"]["event_id"]
 
 
 def _get_eval_id(client: TestClient, eval_token: str) -> int:
@@ -5,7 +5,7 @@ import io
 import pytest
 from fastapi.testclient import TestClient
 
-from tests.conftest import auth_headers
+from tests.conftest import auth_headers, wait_for_import
 
 VALID_CSV = b"display_name,group_name\nAlice,TeamA\nBob,TeamA\nCarol,TeamB\n"
 BAD_CSV = b"name,team\nAlice,TeamA\n"  # missing required columns
@@ -20,12 +20,17 @@ def _import_event(client: TestClient, token: str, csv_bytes: bytes = VALID_CSV,
     )
 
 
+def _import_event_id(client: TestClient, token: str) -> int:
+    return wait_for_import(client, token, _import_event(client, token))["result"]["event_id"]
+
+
 # ── Import ──────────────────────────────────────────────────────────────────
 
 def test_import_event_success(client: TestClient, admin_token: str):
-    resp = _import_event(client, admin_token)
-    assert resp.status_code == 201
-    data = resp.json()
+    job = wait_for_import(client, admin_token, _import_event(client, admin_token))
+    assert job["status"] == "DONE"
+    assert job["rows_parsed"] == job["rows_inserted"] == 3
+    data = job["result"]
     assert data["groups_created"] == 2
     assert data["participants_created"] == 3
     assert data["event_name"] == "Test Event"
@@ -44,14 +49,14 @@ def test_import_event_non_admin_403(client: TestClient, evaluator_token: str):
 # ── List / Get ───────────────────────────────────────────────────────────────
 
 def test_list_events(client: TestClient, admin_token: str):
-    _import_event(client, admin_token)
+    _import_event_id(client, admin_token)
     resp = client.get("/events", headers=auth_headers(admin_token))
     assert resp.status_code == 200
     assert len(resp.json()) == 1
 
 
 def test_get_event_detail(client: TestClient, admin_token: str):
-    event_id = _import_event(client, admin_token).json()["event_id"]
+    event_id = _import_event_id(client, admin_token)
     resp = client.get(f"/events/{event_id}", headers=auth_headers(admin_token))
     assert resp.status_code == 200
     data = resp.json()
@@ -66,7 +71,7 @@ def test_get_event_not_found_404(client: TestClient, admin_token: str):
 # ── Delete ───────────────────────────────────────────────────────────────────
 
 def test_delete_event(client: TestClient, admin_token: str):
-    event_id = _import_event(client, admin_token).json()["event_id"]
+    event_id = _import_event_id(client, admin_token)
     resp = client.delete(f"/events/{event_id}", headers=auth_headers(admin_token))
     assert resp.status_code == 204
     # Should be 404 after deletion
@@ -82,7 +87,7 @@ def test_delete_event_not_found_404(client: TestClient, admin_token: str):
 # ── Age categories ───────────────────────────────────────────────────────────
 
 def test_age_category_crud(client: TestClient, admin_token: str):
-    event_id = _import_event(client, admin_token).json()["event_id"]
+    event_id = _import_event_id(client, admin_token)
     base_url = f"/events/{event_id}/age-categories"
 
     # Create
@@ -109,7 +114,7 @@ def test_age_category_crud(client: TestClient, admin_token: str):
 
 
 def test_update_age_category(client: TestClient, admin_token: str):
-    event_id = _import_event(client, admin_token).json()["event_id"]
+    event_id = _import_event_id(client, admin_token)
     base_url = f"/events/{event_id}/age-categories"
     cat_id = client.post(
         base_url, headers=auth_headers(admin_token),
@@ -131,7 +136,7 @@ def test_update_age_category(client: TestClient, admin_token: str):
 
 def test_update_age_category_invalid_range_400(client: TestClient, admin_token: str):
     """Merged min_age must not exceed max_age."""
-    event_id = _import_event(client, admin_token).json()["event_id"]
+    event_id = _import_event_id(client, admin_token)
     base_url = f"/events/{event_id}/age-categories"
     cat_id = client.post(
         base_url, headers=auth_headers(admin_token),
@@ -147,7 +152,7 @@ def test_update_age_category_invalid_range_400(client: TestClient, admin_token:
 
 
 def test_update_age_category_wrong_event_404(client: TestClient, admin_token: str):
-    event_id = _import_event(client, admin_token).json()["event_id"]
+    event_id = _import_event_id(client, admin_token)
     cat_id = client.post(
         f"/events/{event_id}/age-categories",
         headers=auth_headers(admin_token),
@@ -163,7 +168,7 @@ def test_update_age_category_wrong_event_404(client: TestClient, admin_token: st
 
 
 def test_update_age_category_non_admin_403(client: TestClient, admin_token: str, evaluator_token: str):
-    event_id = _import_event(client, admin_token).json()["event_id"]
+    event_id = _import_event_id(client, admin_token)
     cat_id = client.post(
         f"/events/{event_id}/age-categories",
         headers=auth_headers(admin_token),
@@ -179,7 +184,7 @@ def test_update_age_category_non_admin_403(client: TestClient, admin_token: str,
 
 
 def test_delete_age_category_wrong_event_404(client: TestClient, admin_token: str):
-    event_id = _import_event(client, admin_token).json()["event_id"]
+    event_id = _import_event_id(client, admin_token)
     cat_id = client.post(
         f"/events/{event_id}/age-categories",
         headers=auth_headers(admin_token),
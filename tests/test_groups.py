@@ -5,7 +5,7 @@ import io
 import pytest
 from fastapi.testclient import TestClient
 
-from tests.conftest import auth_headers
+from tests.conftest import auth_headers, wait_for_import
 
 
 CSV = b"display_name,group_name\nAlice,Group1\nBob,Group2\n"
@@ -18,7 +18,7 @@ def _import_event(client: TestClient, token: str):
         files={"file": ("p.csv", io.BytesIO(CSV), "text/csv")},
         data={"event_name": "Group Test Event"},
     )
-    event_id = resp.json()["event_id"]
+    event_id = wait_for_import(client, token, resp)["result"]["event_id"]
     event = client.get(f"/events/{event_id}", headers=auth_headers(token)).json()
     return event_id, event
 
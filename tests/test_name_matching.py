@@ -0,0 +1,62 @@
+"""Unit tests for the OCR name matcher."""
+
+import itertools
+import random
+import unicodedata
+
+from app.core.name_matching import NameIndex, _components, normalize_name
+
+
+def test_normalize_name_deaccents_and_sorts_tokens():
+    assert normalize_name("Nováková  Jana") == "jana novakova"
+    assert normalize_name("JANA-NOVÁKOVÁ") == normalize_name("Nováková Jana")
+
+
+def test_match_ignores_diacritics_and_word_order():
+    index = NameIndex([(1, "Jana Nováková"), (2, "Petr Dvořák"), (3, "Jan Novák")])
+    matches = index.match(["novakova jana", "Dvorak Petr", "Jan Novak"])
+    assert [(m.row, m.key, m.confidence) for m in matches] == [(0, 1, 1.0), (1, 2, 1.0), (2, 3, 1.0)]
+
+
+def test_match_is_one_to_one_and_order_independent():
+    """Substring matching sent both rows to the first 'Jan'; the assignment keeps them apart."""
+    roster = [(1, "Jan"), (2, "Jana"), (3, "Janek")]
+    names = ["Janek", "Jan", "Jana"]
+    forward = {m.row: m.key for m in NameIndex(roster).match(names)}
+    backward = {m.row: m.key for m in NameIndex(list(reversed(roster))).match(names)}
+    assert forward == backward == {0: 3, 1: 1, 2: 2}
+
+
+def test_match_leaves_unknown_names_out():
+    index = NameIndex([(1, "Alice Smith"), (2, "Bob Jones")])
+    matches = index.match(["Zdeněk Xu", "alice smth"])
+    assert [(m.row, m.key) for m in matches] == [(1, 1)]
+    assert 0 < matches[0].confidence < 1
+
+
+def test_500_name_group_is_matched_in_small_components():
+    firsts = ["Jan", "Jana", "Petr", "Petra", "Karel", "Karla", "Tomáš", "Tereza", "Lukáš", "Lucie",
+              "Martin", "Martina", "Jiří", "Jitka", "Pavel", "Pavla", "David", "Dana", "Ondřej", "Olga"]
+    lasts = ["Novák", "Svoboda", "Novotný", "Dvořák", "Černý", "Procházka", "Kučera", "Veselý",
+             "Horák", "Němec", "Marek", "Pospíšil", "Hájek", "Jelínek", "Král", "Růžička",
+             "Beneš", "Fiala", "Sedláček", "Doležal", "Zeman", "Kolář", "Navrátil", "Čermák", "Urban"]
+    roster = [(i, f"{first} {last}") for i, (first, last) in enumerate(itertools.product(firsts, lasts))]
+    assert len(roster) == 500
+
+    def unaccented(name: str) -> str:
+        return "".join(c for c in unicodedata.normalize("NFKD", name) if not unicodedata.combining(c))
+
+    rng = random.Random(7)
+    sheet = rng.sample(roster, len(roster))
+    # OCR output: unaccented, reordered words, lower case
+    ocr_names = [unaccented(" ".join(reversed(name.split()))).lower() for _, name in sheet]
+
+    index = NameIndex(roster)
+    matches = index.match(ocr_names)
+    assert [(m.row, m.key) for m in matches] == [(row, key) for row, (key, _) in enumerate(sheet)]
+
+    # The trigram index keeps a handful of candidates per name, so the
+    # assignment is solved per small component instead of as one 500x500 matrix.
+    edges = [index.candidates(name) for name in ocr_names]
+    assert max(len(candidates) for candidates in edges) <= 4
+    assert max(max(len(rows), len(cols)) for rows, cols in _components(edges)) <= 6
@@ -0,0 +1,94 @@
+"""Equivalence tests for the bucket ranking kernel."""
+
+import random
+
+import pytest
+
+from app.core import ranking
+from app.core.ranking import rank_scores
+from app.models.activity import EvaluationType
+from app.services.leaderboard_service import BucketRanking, _sort_key
+
+EVALUATION_TYPES = [EvaluationType.NUMERIC_HIGH, EvaluationType.NUMERIC_LOW, EvaluationType.TIME_LOW]
+
+
+def _reference(scores, ids, evaluation_type):
+    """Order and ranks as the incremental bucket computes them from ``_sort_key`` tuples."""
+    bucket = BucketRanking([(_sort_key(s, evaluation_type), pid) for s, pid in zip(scores, ids)])
+    return list(bucket.ranked())
+
+
+def _random_bucket(rng: random.Random, size: int):
+    # Few distinct values so ties, zeros and negatives are common.
+    pool = [None, 0.0, -0.0, -3.5, 1.0, 2.5, 7.25, 100.0, 1e9]
+    scores = [rng.choice(pool) for _ in range(size)]
+    ids = rng.sample(range(1, size * 10 + 1), size)
+    return scores, ids
+
+
+def _as_pairs(scores, ids, order, ranks):
+    return [(rank, ids[i]) for i, rank in zip(order, ranks)]
+
+
+@pytest.mark.parametrize(
+    "lower_is_better,expected",
+    [
+        (False, [(1, 2), (1, 3), (3, 1), (4, 5), (5, 4)]),
+        (True, [(1, 5), (2, 1), (3, 2), (3, 3), (5, 4)]),
+    ],
+)
+def test_competition_ranks(lower_is_better, expected):
+    scores, ids = [5.0, 9.0, None, 9.0, 1.0], [1, 3, 4, 2, 5]
+    order, ranks = rank_scores(scores, ids, lower_is_better)
+    assert _as_pairs(scores, ids, order, ranks) == expected
+
+
+def test_empty_and_mismatched_input():
+    assert rank_scores([], [], True) == ([], [])
+    with pytest.raises(ValueError):
+        rank_scores([1.0], [], True)
+
+
+@pytest.mark.parametrize("evaluation_type", EVALUATION_TYPES)
+@pytest.mark.parametrize("size", [1, 2, 17, 63, 64, 500])
+def test_python_kernel_matches_bucket(evaluation_type, size):
+    rng = random.Random(size)
+    lower = evaluation_type != EvaluationType.NUMERIC_HIGH
+    for _ in range(20):
+        scores, ids = _random_bucket(rng, size)
+        order, ranks = ranking._rank_python(scores, ids, lower)
+        assert _as_pairs(scores, ids, order, ranks) == _reference(scores, ids, evaluation_type)
+
+
+@pytest.mark.parametrize("evaluation_type", EVALUATION_TYPES)
+@pytest.mark.parametrize("size", [1, 2, 17, 64, 500, 5000])
+def test_numpy_kernel_matches_python(evaluation_type, size):
+    # numpy is a declared dependency: a missing install must fail here, not skip the kernel's only check.
+    assert ranking.np is not None, "numpy is not installed; pip install -r requirements.txt"
+    rng = random.Random(size)
+    lower = evaluation_type != EvaluationType.NUMERIC_HIGH
+    for _ in range(10):
+        scores, ids = _random_bucket(rng, size)
+        assert ranking._rank_numpy(scores, ids, lower) == ranking._rank_python(scores, ids, lower)
+
+
+def test_rank_scores_without_numpy(monkeypatch):
+    monkeypatch.setattr(ranking, "np", None)
+    rng = random.Random(0)
+    scores, ids = _random_bucket(rng, 300)
+    order, ranks = rank_scores(scores, ids, False)
+    assert _as_pairs(scores, ids, order, ranks) == _reference(scores, ids, EvaluationType.NUMERIC_HIGH)
+
+
+@pytest.mark.parametrize("evaluation_type", EVALUATION_TYPES)
+def test_bucket_from_scores_matches_incremental_bucket(evaluation_type):
+    rng = random.Random(7)
+    scores, ids = _random_bucket(rng, 200)
+    bucket = BucketRanking.from_scores(scores, ids, evaluation_type)
+    assert list(bucket.ranked()) == _reference(scores, ids, evaluation_type)
+
+    # Incremental updates after a bulk build still rank like a fresh bucket.
+    bucket.remove(_sort_key(scores[0], evaluation_type), ids[0])
+    bucket.add(_sort_key(2.5, evaluation_type), ids[0])
+    scores[0] = 2.5
+    assert list(bucket.ranked()) == _reference(scores, ids, evaluation_type)
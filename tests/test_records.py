@@ -5,7 +5,7 @@ import io
 import pytest
 from fastapi.testclient import TestClient
 
-from tests.conftest import auth_headers
+from tests.conftest import auth_headers, wait_for_import
 
 CSV = b"display_name,group_name\nAlice,Group1\nBob,Group2\n"
 
@@ -15,12 +15,12 @@ def _setup(client: TestClient, admin_token: str, eval_token: str):
     Import 2-group event. Assign evaluator to Group1 only.
     Returns (event_id, activity_id, alice_id, bob_id, eval_id).
     """
-    event_id = client.post(
+    event_id = wait_for_import(client, admin_token, client.post(
         "/events/import",
         headers=auth_headers(admin_token),
         files={"file": ("p.csv", io.BytesIO(CSV), "text/csv")},
         data={"event_name": "Records Test"},
-    ).json()["event_id"]
+    ))["result"]["event_id"]
 
     event = client.get(f"/events/{event_id}", headers=auth_headers(admin_token)).json()
     group1 = next(g for g in event["groups"] if g["name"] == "Group1")
@@ -121,6 +121,41 @@ def test_submit_bulk_records(client: TestClient, admin_token: str, evaluator_tok
     assert len(resp.json()) == 1
 
 
+def test_submit_bulk_records_upserts_and_audits(client: TestClient, admin_token: str, evaluator_token: str, engine):
+    """The set-based path updates existing rows in place and logs one audit row per entry."""
+    from sqlmodel import Session, select
+    from app.models.audit_log import AuditLog
+
+    _, activity_id, alice_id, bob_id, _ = _setup(client, admin_token, evaluator_token)
+    first = client.post(
+        "/records/bulk",
+        headers=auth_headers(admin_token),
+        json={"activity_id": activity_id, "records": [{"participant_id": alice_id, "value_raw": "10"}]},
+    ).json()
+    resp = client.post(
+        "/records/bulk",
+        headers=auth_headers(admin_token),
+        json={
+            "activity_id": activity_id,
+            "records": [
+                {"participant_id": alice_id, "value_raw": "12"},
+                {"participant_id": bob_id, "value_raw": "9"},
+            ],
+        },
+    )
+    assert resp.status_code == 201
+    body = resp.json()
+    assert [(r["participant_id"], r["value_raw"]) for r in body] == [(alice_id, "12"), (bob_id, "9")]
+    assert body[0]["id"] == first[0]["id"]
+
+    with Session(engine) as session:
+        actions = session.exec(
+            select(AuditLog.action, AuditLog.detail).where(AuditLog.resource_type == "record").order_by(AuditLog.id)
+        ).all()
+    assert [a for a, _ in actions] == ["CREATE_RECORD", "UPDATE_RECORD", "CREATE_RECORD"]
+    assert "'10' -> '12'" in actions[1][1]
+
+
 def test_get_activity_records(client: TestClient, admin_token: str, evaluator_token: str):
     _, activity_id, alice_id, _, _ = _setup(client, admin_token, evaluator_token)
     client.post("/records", headers=auth_headers(evaluator_token),
@@ -185,3 +220,106 @@ def test_submit_record_invalid_activity_404(client: TestClient, admin_token: str
         json={"value_raw": "1", "participant_id": alice_id, "activity_id": 9999},
     )
     assert resp.status_code == 404
+
+
+# ── OCR jobs ────────────────────────────────────────────────────────────────
+
+
+def _upload_sheet(client: TestClient, token: str, activity_id: int, group_id: int):
+    return client.post(
+        "/records/process-image",
+        headers=auth_headers(token),
+        files={"file": ("sheet.jpg", io.BytesIO(b"fake-jpeg"), "image/jpeg")},
+        data={"activity_id": str(activity_id), "group_id": str(group_id)},
+    )
+
+
+def _wait_for_job(client: TestClient, token: str, job_id: str) -> dict:
+    import time
+
+    for _ in range(100):
+        job = client.get(f"/records/ocr-jobs/{job_id}", headers=auth_headers(token)).json()
+        if job["status"] in ("DONE", "FAILED"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError("OCR job did not finish")
+
+
+def test_process_image_returns_job_and_result(client: TestClient, admin_token: str, evaluator_token: str, monkeypatch):
+    from app.services import ocr_service
+
+    monkeypatch.setattr(ocr_service, "_call_gemini_ocr", lambda *_args: [{"name": "alice", "value": 42}])
+    event_id, activity_id, alice_id, _, _ = _setup(client, admin_token, evaluator_token)
+    group1 = next(g for g in client.get(f"/events/{event_id}", headers=auth_headers(admin_token)).json()["groups"]
+                  if g["name"] == "Group1")
+
+    resp = _upload_sheet(client, evaluator_token, activity_id, group1["id"])
+    assert resp.status_code == 202
+    assert resp.json()["status"] == "QUEUED"
+
+    job = _wait_for_job(client, evaluator_token, resp.json()["job_id"])
+    assert job["status"] == "DONE"
+    assert job["result"] == [{"participant_id": alice_id, "value": "42", "name": "Alice", "confidence": 1.0}]
+
+    events = client.get(f"/records/ocr-jobs/{job['job_id']}/events", headers=auth_headers(evaluator_token))
+    assert events.headers["content-type"].startswith("text/event-stream")
+    assert "event: status" in events.text and '"DONE"' in events.text
+
+
+def test_process_image_reupload_served_from_cache(client: TestClient, admin_token: str, evaluator_token: str, monkeypatch):
+    from app.core import metrics
+    from app.services import ocr_service
+
+    calls = []
+    monkeypatch.setattr(ocr_service, "_call_gemini_ocr", lambda *args: calls.append(args) or [{"name": "Alice", "value": 7}])
+    event_id, activity_id, alice_id, _, _ = _setup(client, admin_token, evaluator_token)
+    group_id = next(g for g in client.get(f"/events/{event_id}", headers=auth_headers(admin_token)).json()["groups"]
+                    if g["name"] == "Group1")["id"]
+
+    first = _upload_sheet(client, admin_token, activity_id, group_id).json()
+    assert _wait_for_job(client, admin_token, first["job_id"])["status"] == "DONE"
+    hits = metrics.snapshot().get("ocr.cache_hits", 0)
+
+    again = _upload_sheet(client, evaluator_token, activity_id, group_id).json()
+    assert again["status"] == "DONE"
+    assert again["result"] == [{"participant_id": alice_id, "value": "7", "name": "Alice", "confidence": 1.0}]
+    assert len(calls) == 1
+    assert metrics.snapshot()["ocr.cache_hits"] == hits + 1
+
+
+def test_process_image_failure_is_reported_on_job(client: TestClient, admin_token: str, evaluator_token: str, monkeypatch):
+    from app.services import ocr_service
+
+    def quota_exceeded(*_args):
+        raise RuntimeError("429 quota exceeded")
+
+    monkeypatch.setattr(ocr_service, "_call_gemini_ocr", quota_exceeded)
+    event_id, activity_id, _, _, _ = _setup(client, admin_token, evaluator_token)
+    group_id = client.get(f"/events/{event_id}", headers=auth_headers(admin_token)).json()["groups"][0]["id"]
+
+    job = _wait_for_job(client, admin_token, _upload_sheet(client, admin_token, activity_id, group_id).json()["job_id"])
+    assert job["status"] == "FAILED"
+    assert job["error_status"] == 429
+    # Jobs are private to the uploader (and admins)
+    resp = client.get(f"/records/ocr-jobs/{job['job_id']}", headers=auth_headers(evaluator_token))
+    assert resp.status_code == 404
+
+
+def test_process_image_per_event_limit(client: TestClient, admin_token: str, evaluator_token: str, monkeypatch):
+    import threading
+
+    from app.config import settings
+    from app.services import ocr_service
+
+    release = threading.Event()
+    monkeypatch.setattr(settings, "OCR_MAX_JOBS_PER_EVENT", 1)
+    monkeypatch.setattr(ocr_service, "_call_gemini_ocr", lambda *_args: release.wait(5) and [])
+    event_id, activity_id, _, _, _ = _setup(client, admin_token, evaluator_token)
+    group_id = client.get(f"/events/{event_id}", headers=auth_headers(admin_token)).json()["groups"][0]["id"]
+
+    first = _upload_sheet(client, admin_token, activity_id, group_id)
+    assert first.status_code == 202
+    assert _upload_sheet(client, admin_token, activity_id, group_id).status_code == 429
+    release.set()
+    assert _wait_for_job(client, admin_token, first.json()["job_id"])["status"] == "DONE"
+